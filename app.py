@@ -1,14 +1,25 @@
-from flask import Flask, request, render_template, jsonify, flash, redirect, url_for
+from flask import Flask, Response, request, render_template, jsonify, flash, redirect, url_for, stream_with_context
 from werkzeug.utils import secure_filename
 import os
+import gzip
+import hashlib
+import json
 import logging
 import zipfile
 import tempfile
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterator, Optional
 
 from package.agents.orchestrator import ReviewOrchestrator
+from package.agents.job_manager import ReviewJobManager
+from package.agents.deadline import Deadline
+from package.agents.limiter import OverloadedError
+from package.agents.scheduler import INTERACTIVE, BULK
 from package.utils.file_processor import FileProcessor
-from package.config import DEBUG, ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+from package.utils.metrics import REGISTRY
+from package.config import (
+    DEBUG, ALLOWED_EXTENSIONS, MAX_FILE_SIZE, MAX_UPLOAD_SIZE, REVIEW_MODE, REVIEW_MODES, AGENT_TIMEOUT,
+    RESULTS_PAGE_SIZE, RESULTS_MAX_PAGE_SIZE, GZIP_MIN_SIZE
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,20 +28,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_SIZE
 app.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
 
 orchestrator = ReviewOrchestrator()
 file_processor = FileProcessor()
+job_manager = ReviewJobManager(orchestrator)
+job_manager.resume_unfinished()
 
 @app.route('/')
 def index():
     return render_template('index.html', 
                          allowed_extensions=list(ALLOWED_EXTENSIONS),
-                         max_size_mb=MAX_FILE_SIZE // (1024 * 1024))
+                         max_size_mb=MAX_FILE_SIZE // (1024 * 1024),
+                         max_upload_mb=MAX_UPLOAD_SIZE // (1024 * 1024))
 
 @app.route('/review', methods=['POST'])
 def review():
+    orchestrator.check_capacity(INTERACTIVE)
     try:
         if 'file' in request.files:
             file = request.files['file']
@@ -40,7 +55,7 @@ def review():
         if 'code' in request.form:
             code = request.form['code']
             if code.strip():
-                results = orchestrator.review_code(code)
+                results = orchestrator.review_code(code, client=request_client())
                 return render_template('results.html', 
                                      results=results,
                                      code=code,
@@ -56,6 +71,7 @@ def review():
 
 @app.route('/review-repository', methods=['POST'])
 def review_repository():
+    orchestrator.check_capacity(BULK)
     try:
         if 'repository' not in request.files:
             flash('No repository file uploaded', 'error')
@@ -66,10 +82,10 @@ def review_repository():
             flash('No file selected', 'error')
             return redirect(url_for('index'))
         
-        if file and file.filename.endswith('.zip'):
-            return handle_repository_upload(file)
+        if file and file_processor.is_archive(file.filename):
+            return handle_repository_upload()
         else:
-            flash('Please upload a ZIP file', 'error')
+            flash('Please upload a ZIP or tar.gz archive', 'error')
             return redirect(url_for('index'))
             
     except Exception as e:
@@ -79,6 +95,7 @@ def review_repository():
 
 @app.route('/api/review', methods=['POST'])
 def api_review():
+    orchestrator.check_capacity(INTERACTIVE)
     try:
         data = request.get_json()
         if not data or 'code' not in data:
@@ -87,13 +104,222 @@ def api_review():
         code = data['code']
         context = data.get('context', None)
         
-        results = orchestrator.review_code(code, context)
+        results = orchestrator.review_code(code, context, mode=data.get('mode'),
+                                           deadline=request_deadline(data),
+                                           client=request_client())
         return jsonify(results)
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"API error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/review/diff', methods=['POST'])
+def api_review_diff():
+    orchestrator.check_capacity(INTERACTIVE)
+    try:
+        data = request.get_json()
+        if not data or 'base' not in data or not ('head' in data or 'diff' in data):
+            return jsonify({'error': 'Provide base plus either head or diff'}), 400
+        
+        results = orchestrator.review_diff(
+            data['base'],
+            head_code=data.get('head'),
+            diff=data.get('diff'),
+            context=data.get('context', None),
+            previous=data.get('previous', None),
+            mode=data.get('mode'),
+            deadline=request_deadline(data),
+            client=request_client()
+        )
+        return jsonify(results)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"API error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/review/stream', methods=['POST'])
+def api_review_stream():
+    orchestrator.check_capacity(INTERACTIVE)
+    data = request.get_json(silent=True)
+    if not data or 'code' not in data:
+        return jsonify({'error': 'No code provided'}), 400
+    
+    mode = data.get('mode') or REVIEW_MODE
+    if mode not in REVIEW_MODES:
+        return jsonify({'error': f"Unknown review mode '{mode}'"}), 400
+    try:
+        deadline = request_deadline(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    events = orchestrator.iter_review_code(
+        data['code'],
+        data.get('context', None),
+        stream_tokens=bool(data.get('stream_tokens', False)),
+        mode=mode,
+        deadline=deadline,
+        client=request_client()
+    )
+    return sse_response(events)
+
+@app.route('/api/review-repository/stream', methods=['POST'])
+def api_review_repository_stream():
+    orchestrator.check_capacity(BULK)
+    files, file_list, error = load_repository_upload()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    return sse_response(orchestrator.iter_review_repository(files, file_list=file_list,
+                                                            client=request_client()))
+
+@app.route('/api/jobs', methods=['POST'])
+def api_create_job():
+    files, _, error = load_repository_upload()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    job_id = job_manager.submit(files, client=request_client())
+    return jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': url_for('api_get_job', job_id=job_id),
+        'results_url': url_for('repository_results', result_id=job_id)
+    }), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/results/<result_id>', methods=['GET'])
+def repository_results(result_id):
+    overview = job_manager.overview(result_id)
+    if overview is None:
+        flash('Review results not found', 'error')
+        return redirect(url_for('index'))
+    return render_template('repository_results.html',
+                         result_id=result_id,
+                         overview=overview,
+                         page_size=RESULTS_PAGE_SIZE)
+
+@app.route('/api/results/<result_id>', methods=['GET'])
+def api_result_overview(result_id):
+    return cached_json(result_id, lambda: job_manager.overview(result_id))
+
+@app.route('/api/results/<result_id>/files', methods=['GET'])
+def api_result_files(result_id):
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(max(1, request.args.get('per_page', RESULTS_PAGE_SIZE, type=int)), RESULTS_MAX_PAGE_SIZE)
+    
+    def build():
+        overview = job_manager.overview(result_id)
+        if overview is None:
+            return None
+        total = overview['progress']['total']
+        return {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': max(1, -(-total // per_page)),
+            'files': job_manager.list_files(result_id, (page - 1) * per_page, per_page)
+        }
+    return cached_json(result_id, build)
+
+@app.route('/api/results/<result_id>/files/<path:filepath>', methods=['GET'])
+def api_result_file(result_id, filepath):
+    return cached_json(result_id, lambda: job_manager.get_file(result_id, filepath))
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(REGISTRY.render(), content_type=REGISTRY.CONTENT_TYPE)
+
+def request_client() -> str:
+    """Who a review is for, so bulk reviews are shared fairly between clients"""
+    return request.headers.get('X-Client-ID') or request.remote_addr or 'anonymous'
+
+def request_deadline(data: Dict[str, Any]):
+    """The optional ``deadline`` (seconds) from a JSON request, capped at AGENT_TIMEOUT"""
+    if data.get('deadline') is None:
+        return None
+    try:
+        seconds = float(data['deadline'])
+    except (TypeError, ValueError):
+        raise ValueError('deadline must be a number of seconds')
+    if seconds <= 0:
+        raise ValueError('deadline must be positive')
+    return Deadline(min(seconds, AGENT_TIMEOUT))
+
+def load_repository_upload():
+    """Open the uploaded archive, returning (files, file_list, error).
+    
+    ``files`` decodes members lazily, one at a time, from a private spooled
+    copy of the upload, since the request's own stream is closed before a
+    streamed response or background job gets to read it.
+    """
+    file = request.files.get('repository')
+    if not file or not file_processor.is_archive(file.filename):
+        return None, None, 'Please upload a ZIP or tar.gz archive'
+    
+    try:
+        stream = file_processor.spool(file.stream, copy=True)
+        file_list = file_processor.archive_names(stream, file.filename)
+    except ValueError as e:
+        return None, None, str(e)
+    
+    if not file_list:
+        return None, None, 'No valid code files found in archive'
+    return file_processor.iter_archive(stream, file.filename), file_list, None
+
+def cached_json(result_id: str, build: Callable[[], Optional[Dict[str, Any]]]) -> Response:
+    """JSON for stored results, revalidated by ETag and gzipped for clients that accept it.
+    
+    The ETag follows the job's status and last update, so a revisit (or a
+    poll while nothing changed) gets a 304 without ``build`` running.
+    """
+    version = job_manager.version(result_id)
+    if version is None:
+        return jsonify({'error': 'Results not found'}), 404
+    
+    etag = hashlib.sha1(f"{result_id}:{version}:{request.full_path}".encode('utf-8')).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        payload = build()
+        if payload is None:
+            return jsonify({'error': 'Not found'}), 404
+        response = compressed_json(payload)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+def compressed_json(payload: Dict[str, Any]) -> Response:
+    data = json.dumps(payload, default=str).encode('utf-8')
+    response = Response(data, mimetype='application/json')
+    if len(data) >= GZIP_MIN_SIZE and 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def sse_response(events: Iterator[Dict[str, Any]]) -> Response:
+    return Response(stream_with_context(format_sse(events)),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def format_sse(events: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    try:
+        for event in events:
+            yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+    except Exception as e:
+        logger.error(f"Streaming error: {str(e)}")
+        yield f"event: error\ndata: {json.dumps({'event': 'error', 'error': str(e)})}\n\n"
+
 def handle_file_upload(file):
     filename = secure_filename(file.filename)
     
@@ -102,7 +328,11 @@ def handle_file_upload(file):
         flash(f'File type {ext} not supported', 'error')
         return redirect(url_for('index'))
     
-    code = file.read().decode('utf-8', errors='ignore')
+    content = file.read(MAX_FILE_SIZE + 1)
+    if len(content) > MAX_FILE_SIZE:
+        flash('File too large. Maximum size is {} MB'.format(MAX_FILE_SIZE // (1024 * 1024)), 'error')
+        return redirect(url_for('index'))
+    code = content.decode('utf-8', errors='ignore')
     
     context = {
         "filename": filename,
@@ -110,7 +340,7 @@ def handle_file_upload(file):
         "file_size": len(code)
     }
     
-    results = orchestrator.review_code(code, context)
+    results = orchestrator.review_code(code, context, client=request_client())
     
     return render_template('results.html',
                          results=results,
@@ -118,30 +348,31 @@ def handle_file_upload(file):
                          filename=filename,
                          mode='file')
 
-def handle_repository_upload(file):
-    with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp_file:
-        file.save(tmp_file.name)
-        tmp_path = tmp_file.name
+def handle_repository_upload():
+    """Queue the repository as a background job and send the browser to its results page.
     
-    try:
-        files = file_processor.extract_zip(tmp_path)
-        
-        if not files:
-            flash('No valid code files found in ZIP', 'error')
-            return redirect(url_for('index'))
-        
-        results = orchestrator.review_repository(files)
-        
-        return render_template('results.html',
-                             results=results,
-                             files=files,
-                             mode='repository')
-    finally:
-        os.unlink(tmp_path)
+    Members are decoded one at a time straight into the job store. The page
+    loads a compact summary and fetches each file's code and reviews on
+    demand, rather than receiving every file in one response.
+    """
+    files, _, error = load_repository_upload()
+    if error:
+        flash(error, 'error')
+        return redirect(url_for('index'))
+    
+    job_id = job_manager.submit(files, client=request_client())
+    return redirect(url_for('repository_results', result_id=job_id))
+
+@app.errorhandler(OverloadedError)
+def overloaded(e):
+    response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
 
 @app.errorhandler(413)
 def file_too_large(e):
-    flash('File too large. Maximum size is {} MB'.format(MAX_FILE_SIZE // (1024 * 1024)), 'error')
+    flash('Upload too large. Maximum size is {} MB'.format(MAX_UPLOAD_SIZE // (1024 * 1024)), 'error')
     return redirect(url_for('index'))
 
 if __name__ == '__main__':
@@ -0,0 +1,110 @@
+"""Throughput of the small/large model cascade against its escalation rate.
+
+Reviews a synthetic repository against a stub Ollama server where the small
+model answers in ``--small-latency`` seconds and the large one in
+``--large-latency``. The stub's small model reports a high severity finding
+(and so escalates) for a given fraction of the calls; each rate is compared
+with reviewing everything on the large model alone.
+
+    python -m benchmarks.cascade --files 40 --rates 0,0.25,0.5,0.75,1
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_ollama import StubOllama  # noqa: E402
+from benchmarks.synthetic import synthetic_repository  # noqa: E402
+
+SMALL_MODEL = "stub-small"
+LARGE_MODEL = "stub-large"
+
+
+class CascadeStub(StubOllama):
+    """Stub whose small model flags a high severity finding for ``escalation_rate`` of its reviews"""
+
+    escalation_rate = 0.0
+
+    def respond(self, request: Dict[str, Any]) -> Optional[str]:
+        text = super().respond(request)
+        if text is None or request.get("model") != SMALL_MODEL:
+            return text
+        with self._lock:
+            escalate = self.random.random() < self.escalation_rate
+        severity = "high" if escalate else "low"
+        data = json.loads(text)
+        for finding in data["findings"]:
+            finding["severity"] = severity
+        return json.dumps(data)
+
+
+def run(orchestrator: Any, stub: CascadeStub, files: Dict[str, str], cascade: Any) -> Dict[str, Any]:
+    orchestrator.cascade = cascade
+    requests_before = stub.requests
+    started = time.perf_counter()
+    results = orchestrator.review_repository(files)
+    elapsed = time.perf_counter() - started
+    summary = results["repository_summary"].get("cascade", {})
+    return {
+        "seconds": round(elapsed, 2),
+        "files_per_second": round(len(files) / elapsed, 2),
+        "llm_requests": stub.requests - requests_before,
+        "escalation_rate": summary.get("escalation_rate"),
+        "tiers": {tier: summary[tier] for tier in ("small", "large") if tier in summary}
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--rates", default="0,0.25,0.5,0.75,1", help="comma-separated escalation rates")
+    parser.add_argument("--small-latency", type=float, default=0.05)
+    parser.add_argument("--large-latency", type=float, default=0.4)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    stub = CascadeStub(args.large_latency, seed=0,
+                       model_latency={SMALL_MODEL: args.small_latency}).start()
+    workdir = tempfile.mkdtemp(prefix="review_bench_cascade_")
+    os.environ.update({
+        "OLLAMA_BASE_URL": stub.base_url,
+        "OLLAMA_MODEL": LARGE_MODEL,
+        "STRUCTURED_OUTPUT": "true",
+        "REVIEW_CACHE_ENABLED": "false",
+        "TRIAGE_ENABLED": "false",
+        "DEDUP_ENABLED": "false",
+        "JOB_STORE_PATH": os.path.join(workdir, "jobs.sqlite3")
+    })
+
+    # Imported here so the package reads the settings above
+    from package.agents.cascade import ModelCascade
+    from package.agents.orchestrator import ReviewOrchestrator
+
+    orchestrator = ReviewOrchestrator(max_workers=args.workers)
+    files = synthetic_repository(args.files, seed=args.files)
+    report = {"files": args.files, "small_latency": args.small_latency, "large_latency": args.large_latency}
+    try:
+        report["large_only"] = run(orchestrator, stub, files, None)
+        print(f"{'large only':18} {report['large_only']['files_per_second']:8} files/s", flush=True)
+        report["cascade"] = {}
+        for rate in (float(rate) for rate in args.rates.split(",") if rate):
+            stub.escalation_rate = rate
+            result = run(orchestrator, stub, files, ModelCascade(small_model=SMALL_MODEL))
+            result["speedup"] = round(result["files_per_second"] / report["large_only"]["files_per_second"], 2)
+            report["cascade"][str(rate)] = result
+            print(f"{'cascade @ ' + str(rate):18} {result['files_per_second']:8} files/s "
+                  f"(escalated {result['escalation_rate']}, x{result['speedup']})", flush=True)
+    finally:
+        orchestrator.scheduler.shutdown(wait=False)
+        stub.stop()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
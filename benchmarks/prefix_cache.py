@@ -0,0 +1,94 @@
+"""Measure the prefill saved by the shared code-first prompt prefix.
+
+Sends the three agent prompts for the same snippet back to back, once with the
+code-first layout the agents use and once with the persona-first layout they
+used before, and compares Ollama's ``prompt_eval_count`` / ``prompt_eval_duration``.
+
+    python -m benchmarks.prefix_cache --file app.py --rounds 3
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from package.agents.base import CODE_PREFIX  # noqa: E402
+from package.agents.llm import create_llm  # noqa: E402
+from package.agents.performance_agent import PerformanceAgent  # noqa: E402
+from package.agents.security_agent import SecurityAgent  # noqa: E402
+from package.agents.style_agent import StyleAgent  # noqa: E402
+from package.config import OLLAMA_BASE_URL, OLLAMA_KEEP_ALIVE, OLLAMA_MODEL  # noqa: E402
+
+
+def build_prompts(code: str, layout: str, agents: List[Any]) -> List[str]:
+    prompts = []
+    for agent in agents:
+        if layout == "code_first":
+            prompts.append(agent.prompt.format(code=code, context=""))
+        else:
+            instructions = agent._get_instructions()
+            prompts.append(instructions + "\n\n" + CODE_PREFIX.format(code=code, context=""))
+    return prompts
+
+
+def run_layout(client: httpx.Client, model: str, code: str, layout: str,
+               agents: List[Any], rounds: int) -> Dict[str, Any]:
+    stats = {"prompt_eval_count": 0, "prompt_eval_duration_ms": 0.0, "requests": 0}
+    for round_number in range(rounds):
+        # A per-round marker keeps rounds from reusing each other's cache
+        snippet = f"# benchmark round {layout} {round_number}\n{code}"
+        for prompt in build_prompts(snippet, layout, agents):
+            response = client.post("/api/generate", json={
+                "model": model,
+                "prompt": prompt,
+                "stream": False,
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+                "options": {"num_predict": 1, "temperature": 0}
+            })
+            response.raise_for_status()
+            data = response.json()
+            stats["prompt_eval_count"] += data.get("prompt_eval_count", 0)
+            stats["prompt_eval_duration_ms"] += data.get("prompt_eval_duration", 0) / 1e6
+            stats["requests"] += 1
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--file", default=os.path.join(os.path.dirname(__file__), "..", "app.py"))
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--base-url", default=OLLAMA_BASE_URL)
+    parser.add_argument("--model", default=OLLAMA_MODEL)
+    args = parser.parse_args()
+    
+    with open(args.file, encoding="utf-8") as f:
+        code = f.read()
+    
+    llm = create_llm(base_url=args.base_url, model=args.model)
+    agents = [
+        SecurityAgent(llm, "Security Agent"),
+        PerformanceAgent(llm, "Performance Agent"),
+        StyleAgent(llm, "Style Agent")
+    ]
+    
+    with httpx.Client(base_url=args.base_url, timeout=600) as client:
+        # Warm up so model loading is not billed to the first layout
+        client.post("/api/generate", json={"model": args.model, "prompt": "hi", "stream": False,
+                                           "keep_alive": OLLAMA_KEEP_ALIVE, "options": {"num_predict": 1}})
+        results = {
+            layout: run_layout(client, args.model, code, layout, agents, args.rounds)
+            for layout in ("persona_first", "code_first")
+        }
+    
+    before = results["persona_first"]["prompt_eval_duration_ms"]
+    after = results["code_first"]["prompt_eval_duration_ms"]
+    results["prefill_saving_pct"] = round(100 * (before - after) / before, 1) if before else 0.0
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Throughput and latency benchmarks against a stub Ollama server.
+
+Starts ``benchmarks.stub_ollama`` in-process, points the orchestrator at it and
+times the main code paths over synthetic repositories of several sizes:
+``review_code``, ``review_repository``, ``FileProcessor.extract_zip``,
+``create_file_graph`` and the Flask endpoints through the test client. Each
+scenario reports p50/p95/p99 latency, requests per second and peak RSS.
+
+    python -m benchmarks.run --sizes 10,50 --iterations 5 --save baseline
+    python -m benchmarks.run --sizes 10,50 --iterations 5 --compare baseline
+
+Baselines are stored as JSON under ``benchmarks/baselines/``. ``--compare``
+flags scenarios whose p50/p95 latency grew, or whose throughput dropped, by
+more than ``--threshold`` percent.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_ollama import StubOllama  # noqa: E402
+from benchmarks.synthetic import build_zip, synthetic_repository  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of ``values``"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Track the peak RSS while a scenario runs"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "RssSampler":
+        self.peak = current_rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+
+def measure(operation: Callable[[], Any], iterations: int, warmup: int = 1) -> Dict[str, Any]:
+    for _ in range(warmup):
+        operation()
+
+    latencies = []
+    with RssSampler() as sampler:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            begin = time.perf_counter()
+            operation()
+            latencies.append(time.perf_counter() - begin)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "rps": round(iterations / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": round(sampler.peak / (1024 * 1024), 1)
+    }
+
+
+def build_scenarios(sizes: List[int]) -> Dict[str, Callable[[], Any]]:
+    # Imported here so the package reads the stub's URL from the environment
+    from app import app, job_manager, orchestrator
+    from package.utils.file_processor import FileProcessor
+
+    file_processor = FileProcessor()
+    client = app.test_client()
+    scenarios = {}
+
+    small = next(iter(synthetic_repository(1, helpers=2).values()))
+    large = next(iter(synthetic_repository(1, helpers=150).values()))
+    scenarios["review_code:small"] = lambda: orchestrator.review_code(small)
+    scenarios["review_code:chunked"] = lambda: orchestrator.review_code(large)
+    scenarios["api_review"] = lambda: _check(client.post("/api/review", json={"code": small}))
+
+    workdir = tempfile.mkdtemp(prefix="review_bench_")
+    for size in sizes:
+        files = synthetic_repository(size, seed=size)
+        archive = build_zip(files)
+        zip_path = os.path.join(workdir, f"repo_{size}.zip")
+        with open(zip_path, "wb") as f:
+            f.write(archive)
+
+        scenarios[f"review_repository:{size}"] = lambda files=files: orchestrator.review_repository(files)
+        scenarios[f"extract_zip:{size}"] = lambda path=zip_path: file_processor.extract_zip(path)
+        scenarios[f"create_file_graph:{size}"] = lambda files=files: file_processor.create_file_graph(files)
+        scenarios[f"api_repository_stream:{size}"] = lambda archive=archive: _stream_repository(client, archive)
+        scenarios[f"api_jobs:{size}"] = lambda archive=archive: _run_job(client, job_manager, archive)
+
+    graph_files = synthetic_repository(max(sizes) * 20, seed=1)
+    scenarios[f"create_file_graph:{len(graph_files)}"] = lambda: file_processor.create_file_graph(graph_files)
+    return scenarios
+
+
+def _check(response) -> Any:
+    if response.status_code >= 400:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def _upload(archive: bytes) -> Dict[str, Any]:
+    return {"repository": (io.BytesIO(archive), "repository.zip")}
+
+
+def _stream_repository(client, archive: bytes) -> None:
+    response = _check(client.post("/api/review-repository/stream", data=_upload(archive),
+                                  content_type="multipart/form-data"))
+    body = response.get_data(as_text=True)
+    if "event: complete" not in body:
+        raise RuntimeError("Repository stream ended without a complete event")
+
+
+def _run_job(client, job_manager, archive: bytes, timeout: float = 600) -> None:
+    response = _check(client.post("/api/jobs", data=_upload(archive), content_type="multipart/form-data"))
+    job_id = response.get_json()["job_id"]
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = job_manager.get(job_id)
+        if job["status"] in ("completed", "failed"):
+            if job["status"] == "failed":
+                raise RuntimeError(f"Job failed: {job['error']}")
+            return
+        time.sleep(0.01)
+    raise TimeoutError(f"Job {job_id} did not finish within {timeout}s")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed scenarios"""
+    regressions = []
+    print(f"\n{'scenario':36} {'p50 ms':>18} {'p95 ms':>18} {'rps':>16}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:36} {'(new)':>18}")
+            continue
+
+        cells = []
+        regressed = False
+        for key, higher_is_worse in (("p50_ms", True), ("p95_ms", True), ("rps", False)):
+            before, after = previous[key], current[key]
+            change = 100 * (after - before) / before if before else 0.0
+            if (change > threshold) if higher_is_worse else (change < -threshold):
+                regressed = True
+            cells.append(f"{after:>9} ({change:+5.1f}%)")
+        if regressed:
+            regressions.append(name)
+        print(f"{name:36} {cells[0]:>18} {cells[1]:>18} {cells[2]:>16}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="10,50", help="comma-separated repository sizes (files)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--only", default="", help="run scenarios whose name starts with this prefix")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--token-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="keep the review cache enabled")
+    parser.add_argument("--save", metavar="NAME", help="save results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    stub = StubOllama(args.latency, args.token_rate, args.error_rate, seed=0).start()
+    workdir = tempfile.mkdtemp(prefix="review_bench_state_")
+    os.environ.update({
+        "OLLAMA_BASE_URL": stub.base_url,
+        "REVIEW_CACHE_ENABLED": "true" if args.cache else "false",
+        "REVIEW_CACHE_PATH": os.path.join(workdir, "cache.sqlite3"),
+        "JOB_STORE_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "FLASK_DEBUG": "false"
+    })
+
+    results = {}
+    try:
+        for name, operation in build_scenarios(sizes).items():
+            if not name.startswith(args.only):
+                continue
+            requests_before = stub.requests
+            results[name] = measure(operation, args.iterations)
+            results[name]["llm_requests"] = (stub.requests - requests_before) // (args.iterations + 1)
+            print(f"{name:36} p50={results[name]['p50_ms']}ms p95={results[name]['p95_ms']}ms "
+                  f"p99={results[name]['p99_ms']}ms rps={results[name]['rps']} "
+                  f"rss={results[name]['peak_rss_mb']}MB", flush=True)
+    finally:
+        stub.stop()
+
+    report = {
+        "commit": git_commit(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "params": {key: value for key, value in vars(args).items()
+                   if key in ("sizes", "iterations", "latency", "token_rate", "error_rate", "cache")},
+        "results": results
+    }
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save}.json")
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {path}")
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json")) as f:
+            baseline = json.load(f)
+        if baseline.get("params") != report["params"]:
+            print(f"\nWarning: baseline was recorded with different parameters: {baseline.get('params')}")
+        print(f"Comparing against {args.compare} (commit {baseline.get('commit')})")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
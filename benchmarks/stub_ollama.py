@@ -0,0 +1,216 @@
+"""A fake Ollama server for benchmarks and local development.
+
+Answers ``/api/generate`` (streamed NDJSON or ``stream: false``) with a canned
+review after ``latency`` seconds (or the request model's entry in
+``model_latency``), emitting ``token_rate`` tokens per second, and fails
+``error_rate`` of the requests with HTTP 500. Text reviews end with the
+completion marker followed by some chatter, so the ``stop`` option matters,
+and ``num_predict`` truncates output the way Ollama does.
+
+    python -m benchmarks.stub_ollama --port 11434 --latency 0.2 --token-rate 200
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+REVIEW_TEXT = """1. Potential issue: input is used without validation on line 3.
+2. Inefficient loop on line 7; consider a set lookup instead.
+3. Naming problem: prefer descriptive variable names.
+"""
+
+COMPLETION_MARKER = "END_OF_REVIEW"
+CHATTER = "Let me know if you would like me to go into more detail on any of these points. " * 8
+
+FUSED_TEXT = """### SECURITY
+1. Potential issue: input is used without validation on line 3.
+### PERFORMANCE
+1. Inefficient loop on line 7; consider a set lookup instead.
+### STYLE
+Nothing to report.
+"""
+
+JSON_TEXT = json.dumps({
+    "findings": [{
+        "line_start": 3,
+        "line_end": 3,
+        "severity": "medium",
+        "category": "input validation",
+        "message": "Input is used without validation",
+        "suggestion": "Validate the value before use"
+    }],
+    "confidence": 0.7
+})
+
+FUSED_JSON_TEXT = json.dumps({
+    "findings": [dict(json.loads(JSON_TEXT)["findings"][0], concern="security")],
+    "confidence": 0.7
+})
+
+
+class StubOllama:
+    """Threaded fake Ollama endpoint; use as a context manager or call start/stop"""
+
+    def __init__(self, latency: float = 0.05, token_rate: float = 0.0, error_rate: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None,
+                 model_latency: Optional[Dict[str, float]] = None):
+        self.latency = latency
+        self.model_latency = dict(model_latency or {})
+        self.token_rate = token_rate
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubOllama":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubOllama":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def respond(self, request: Dict[str, Any]) -> Optional[str]:
+        """Text to generate for ``request``, or None to fail it"""
+        with self._lock:
+            self.requests += 1
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if failed:
+            return None
+        if request.get("format"):
+            return FUSED_JSON_TEXT if '"concern"' in request.get("prompt", "") else JSON_TEXT
+        text = FUSED_TEXT if "one section per concern" in request.get("prompt", "") else REVIEW_TEXT
+        if COMPLETION_MARKER in request.get("prompt", ""):
+            text += f"{COMPLETION_MARKER}\n{CHATTER}"
+        return text
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self._send_json(200, {"models": []})
+
+            def do_HEAD(self) -> None:
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/api/generate":
+                    self._send_json(404, {"error": f"unsupported path {self.path}"})
+                    return
+
+                latency = stub.model_latency.get(request.get("model"), stub.latency)
+                time.sleep(latency)
+                text = stub.respond(request)
+                if text is None:
+                    self._send_json(500, {"error": "stub error"})
+                    return
+
+                options = request.get("options") or {}
+                done_reason = "stop"
+                for marker in options.get("stop") or []:
+                    text = text.split(marker, 1)[0]
+                tokens = text.split(" ")
+                tokens = [token + " " for token in tokens[:-1]] + tokens[-1:]
+                if (options.get("num_predict") or 0) > 0 and len(tokens) > options["num_predict"]:
+                    tokens = tokens[:options["num_predict"]]
+                    done_reason = "length"
+                text = "".join(tokens)
+                final = {
+                    "model": request.get("model", ""),
+                    "response": "",
+                    "done": True,
+                    "done_reason": done_reason,
+                    "prompt_eval_count": len(request.get("prompt", "")) // 4,
+                    "prompt_eval_duration": int(latency * 1e9),
+                    "eval_count": len(tokens),
+                    "eval_duration": int(len(tokens) / stub.token_rate * 1e9) if stub.token_rate else 0
+                }
+
+                if request.get("stream") is False:
+                    self._pace(len(tokens))
+                    self._send_json(200, dict(final, response=text))
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for token in tokens:
+                        self._pace(1)
+                        self._write_chunk({"model": final["model"], "response": token, "done": False})
+                    self._write_chunk(final)
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _pace(self, tokens: int) -> None:
+                if stub.token_rate:
+                    time.sleep(tokens / stub.token_rate)
+
+            def _write_chunk(self, payload: Dict[str, Any]) -> None:
+                data = (json.dumps(payload) + "\n").encode()
+                self.wfile.write(b"%x\r\n" % len(data) + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="tokens per second, 0 for no pacing")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    args = parser.parse_args()
+
+    stub = StubOllama(args.latency, args.token_rate, args.error_rate, args.host, args.port)
+    print(f"Stub Ollama listening on {stub.base_url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
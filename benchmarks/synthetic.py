@@ -0,0 +1,112 @@
+"""Synthetic repositories for the benchmarks.
+
+Files are deterministic for a given seed and look enough like real code that
+triage, chunking and the dependency graph all have work to do: Python and
+TypeScript modules with imports between them, loops, queries and the odd
+vendored copy.
+"""
+import io
+import random
+import zipfile
+from typing import Dict
+
+PYTHON_TEMPLATE = '''"""Module {index} of service {service}."""
+import os
+import logging
+{imports}
+
+logger = logging.getLogger(__name__)
+
+
+class Handler{index}:
+    def __init__(self, db):
+        self.db = db
+
+    def load(self, ids):
+        rows = []
+        for item_id in ids:
+            rows.append(self.db.query("SELECT * FROM items WHERE id = %s" % item_id))
+        return rows
+
+    def pairs(self, values):
+        result = []
+        for left in values:
+            for right in values:
+                if left != right:
+                    result.append((left, right))
+        return result
+{helpers}
+'''
+
+PYTHON_HELPER = '''
+
+def helper_{index}_{number}(value):
+    total = 0
+    for step in range(value):
+        total += step * {number}
+    return total
+'''
+
+SCRIPT_TEMPLATE = '''import {{ format }} from './component{other}';
+import React from 'react';
+
+export function render{index}(items) {{
+  let html = '';
+  for (const item of items) {{
+    html += '<li>' + format(item) + '</li>';
+  }}
+  return html;
+}}
+{helpers}
+'''
+
+SCRIPT_HELPER = '''
+export const helper{number} = (values) => values.filter((v) => v > {number}).map((v) => v * 2);
+'''
+
+
+def synthetic_repository(file_count: int, seed: int = 0, helpers: int = 4,
+                         duplicate_ratio: float = 0.1) -> Dict[str, str]:
+    """``{path: code}`` with ``file_count`` files, roughly 80% Python and 20% TypeScript"""
+    rng = random.Random(seed)
+    files = {}
+    python_modules = []
+
+    for index in range(file_count):
+        service = index % 10
+        if files and rng.random() < duplicate_ratio:
+            source_path, source = rng.choice(list(files.items()))
+            files[f"vendor/copy_{index}/{source_path.rsplit('/', 1)[-1]}"] = source
+            continue
+
+        if index % 5 == 4:
+            path = f"web/src/component{index}.ts"
+            files[path] = SCRIPT_TEMPLATE.format(
+                index=index,
+                other=5 * rng.randrange(max(1, file_count // 5)) + 4,
+                helpers="".join(SCRIPT_HELPER.format(number=n) for n in range(helpers))
+            )
+            continue
+
+        imports = "\n".join(
+            f"from services.svc{module % 10}.module{module} import Handler{module}"
+            for module in rng.sample(python_modules, min(3, len(python_modules)))
+        )
+        path = f"services/svc{service}/module{index}.py"
+        files[path] = PYTHON_TEMPLATE.format(
+            index=index,
+            service=service,
+            imports=imports,
+            helpers="".join(PYTHON_HELPER.format(index=index, number=n) for n in range(helpers))
+        )
+        python_modules.append(index)
+
+    return files
+
+
+def build_zip(files: Dict[str, str]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path, code in files.items():
+            archive.writestr(path, code)
+    return buffer.getvalue()
@@ -2,12 +2,30 @@ from .base import BaseReviewAgent
 from .security_agent import SecurityAgent
 from .performance_agent import PerformanceAgent
 from .style_agent import StyleAgent
+from .fused_agent import FusedReviewAgent
+from .deadline import Deadline
+from .limiter import AdaptiveLimiter, OverloadedError
+from .scheduler import ReviewScheduler, INTERACTIVE, BULK, PRIORITIES
+from .backend_pool import BackendPool
+from .cascade import ModelCascade
 from .orchestrator import ReviewOrchestrator
+from .job_manager import ReviewJobManager
 
 __all__ = [
     'BaseReviewAgent',
     'SecurityAgent',
     'PerformanceAgent',
     'StyleAgent',
-    'ReviewOrchestrator'
+    'FusedReviewAgent',
+    'Deadline',
+    'AdaptiveLimiter',
+    'OverloadedError',
+    'ReviewScheduler',
+    'INTERACTIVE',
+    'BULK',
+    'PRIORITIES',
+    'BackendPool',
+    'ModelCascade',
+    'ReviewOrchestrator',
+    'ReviewJobManager'
 ]
@@ -0,0 +1,201 @@
+import contextlib
+import logging
+import threading
+import time
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from langchain_ollama import OllamaLLM
+
+from .llm import create_llm
+from ..config import (
+    OLLAMA_BASE_URLS, OLLAMA_HEALTH_CHECK_INTERVAL, OLLAMA_MAX_ATTEMPTS, OLLAMA_FAILURE_THRESHOLD
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Backend:
+    """One Ollama server: its LLM client plus routing and health state"""
+
+    def __init__(self, url: str, llm: OllamaLLM):
+        self.url = url
+        self.llm = llm
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self.last_error: Optional[str] = None
+        self._variants: Dict[Tuple, OllamaLLM] = {}
+
+    def variant(self, **update: Any) -> OllamaLLM:
+        """This backend's LLM with some parameters changed; shares the HTTP client"""
+        if not update:
+            return self.llm
+        key = tuple(sorted(update.items()))
+        llm = self._variants.get(key)
+        if llm is None:
+            llm = self._variants[key] = self.llm.model_copy(update=update)
+        return llm
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "average_latency": round(self.busy_seconds / self.requests, 3) if self.requests else None,
+            "last_error": self.last_error
+        }
+
+
+class BackendPool:
+    """Routes LLM calls across several Ollama servers.
+
+    Each call goes to the healthy backend with the fewest outstanding calls
+    (queued for a slot or running). A call that fails is retried on another
+    backend, up to ``max_attempts`` backends in total. Backends that fail
+    ``failure_threshold`` times in a row are taken out of rotation until the
+    periodic health check sees them answer again; if every backend is down,
+    calls are still attempted rather than refused.
+    """
+
+    def __init__(self, urls: Sequence[str] = OLLAMA_BASE_URLS,
+                 slot: Optional[Callable[[str, Optional[str]], ContextManager]] = None,
+                 health_check_interval: float = OLLAMA_HEALTH_CHECK_INTERVAL,
+                 max_attempts: int = OLLAMA_MAX_ATTEMPTS,
+                 failure_threshold: int = OLLAMA_FAILURE_THRESHOLD,
+                 llm_factory: Callable[[str], OllamaLLM] = create_llm):
+        if not urls:
+            raise ValueError("At least one Ollama backend URL is required")
+
+        self.backends = [Backend(url, llm_factory(url)) for url in dict.fromkeys(urls)]
+        self.slot = slot or (lambda url, model=None: contextlib.nullcontext())
+        self.max_attempts = max(1, min(max_attempts, len(self.backends)))
+        self.failure_threshold = failure_threshold
+        self.health_check_interval = health_check_interval
+
+        self._lock = threading.Lock()
+        self._next = 0
+        self._stop = threading.Event()
+        self._health_thread = None
+        if len(self.backends) > 1 and health_check_interval > 0:
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True,
+                                                   name="ollama-health-check")
+            self._health_thread.start()
+
+        logger.info(f"Backend pool with {len(self.backends)} Ollama servers: "
+                    f"{', '.join(b.url for b in self.backends)}")
+
+    @property
+    def primary(self) -> Backend:
+        return self.backends[0]
+
+    def run(self, call: Callable[[Backend], Dict[str, Any]],
+            model: Optional[str] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Run ``call`` on the least-loaded backend, failing over to others.
+
+        ``model`` names the model ``call`` uses, when it is not the backend's
+        default, so it is given a concurrency slot for that model.
+
+        ``call`` returns a review result; a result with an ``error`` key (or an
+        exception) counts as a failure, unless the review was ``cancelled`` by
+        its deadline, which is not retried. Returns the last result and one
+        ``{backend, ok, latency, queue_wait}`` record per attempt.
+        """
+        attempts = []
+        result = None
+        for _ in range(self.max_attempts):
+            backend = self._acquire(exclude=[a["backend"] for a in attempts])
+            if backend is None:
+                break
+
+            start_time = time.time()
+            waited = 0.0
+            try:
+                with self.slot(backend.url, model) as slot:
+                    start_time = time.time()
+                    waited = slot.waited if slot is not None else 0.0
+                    result = call(backend)
+                    if slot is not None:
+                        # Agents report failures as results, so tell the limiter
+                        if result.get("cancelled"):
+                            slot.ignore()
+                        elif "error" in result:
+                            slot.fail()
+                        else:
+                            slot.size = result.get("generation", {}).get("output_tokens")
+            except Exception as e:
+                result = {"error": str(e), "raw_feedback": f"Review failed: {str(e)}"}
+            finally:
+                latency = time.time() - start_time
+                ok = result is not None and ("error" not in result or bool(result.get("cancelled")))
+                self._release(backend, ok, latency, None if ok or result is None else result.get("error"))
+
+            attempts.append({"backend": backend.url, "ok": ok, "latency": round(latency, 3),
+                             "queue_wait": round(waited, 3)})
+            if ok:
+                break
+            logger.warning(f"Backend {backend.url} failed: {result.get('error')}")
+
+        return result, attempts
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {backend.url: backend.snapshot() for backend in self.backends}
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def _acquire(self, exclude: Sequence[str] = ()) -> Optional[Backend]:
+        with self._lock:
+            candidates = [b for b in self.backends if b.url not in exclude]
+            if not candidates:
+                return None
+            healthy = [b for b in candidates if b.healthy] or candidates
+
+            # Rotate the starting point so ties do not always go to the first backend
+            offset = self._next % len(healthy)
+            self._next += 1
+            rotated = healthy[offset:] + healthy[:offset]
+            backend = min(rotated, key=lambda b: b.outstanding)
+            backend.outstanding += 1
+            return backend
+
+    def _release(self, backend: Backend, ok: bool, latency: float, error: Optional[str]) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+            backend.requests += 1
+            backend.busy_seconds += latency
+            if ok:
+                backend.consecutive_failures = 0
+                return
+
+            backend.failures += 1
+            backend.consecutive_failures += 1
+            backend.last_error = error
+            if backend.healthy and backend.consecutive_failures >= self.failure_threshold:
+                backend.healthy = False
+                logger.warning(f"Marking backend {backend.url} unhealthy after "
+                               f"{backend.consecutive_failures} consecutive failures")
+
+    def _health_loop(self) -> None:
+        with httpx.Client(timeout=5) as client:
+            while not self._stop.wait(self.health_check_interval):
+                for backend in self.backends:
+                    self._check(client, backend)
+
+    def _check(self, client: httpx.Client, backend: Backend) -> None:
+        try:
+            healthy = client.get(f"{backend.url.rstrip('/')}/api/tags").status_code == 200
+        except httpx.HTTPError:
+            healthy = False
+
+        with self._lock:
+            if healthy != backend.healthy:
+                logger.info(f"Backend {backend.url} is {'healthy' if healthy else 'unreachable'}")
+            backend.healthy = healthy
+            if healthy:
+                backend.consecutive_failures = 0
@@ -1,14 +1,129 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from collections import Counter
+from typing import Dict, Any, Callable, List, Optional
 from langchain_ollama import OllamaLLM
 from langchain.prompts import PromptTemplate
 from langchain.schema import BaseOutputParser
+from langchain_core.runnables import Runnable
+import json
 import logging
+import time
+
+from .deadline import Deadline, ReviewCancelled
+from .llm import LLMMetricsCallback
+from ..config import STRUCTURED_OUTPUT
+from ..utils.metrics import AGENT_LATENCY, AGENT_ERRORS
 
 logger = logging.getLogger(__name__)
 
+# Every agent shares this prefix verbatim so the backend can reuse the prefill
+# of the code across agents; agent-specific instructions come after it.
+CODE_PREFIX = """You are an expert code reviewer.
+
+Code to review:
+{code}
+
+{context}
+
+"""
+
+# Text reviews end with this line; it is also the stop sequence, so the model
+# stops there instead of padding the review out to its token limit.
+COMPLETION_MARKER = "END_OF_REVIEW"
+COMPLETION_INSTRUCTION = f"When the review is complete, write {COMPLETION_MARKER} on its own line and stop."
+
+DEFAULT_CONFIDENCE = 0.8
+SEVERITIES = ("critical", "high", "medium", "low", "info")
+MAX_MESSAGE_CHARS = 300
+
+# Appended to an agent's list of concerns in structured mode. Braces are
+# doubled for PromptTemplate.
+STRUCTURED_FORMAT = """
+
+Respond with JSON only, no prose, in this shape:
+{{"findings": [{{"line_start": 12, "line_end": 14, "severity": "high", "category": "sql injection", "message": "Query built by string formatting", "suggestion": "Use a parameterized query"}}], "confidence": 0.8}}
+
+Rules:
+- One finding per distinct problem; "findings" is [] when there is nothing to report
+- severity is one of critical, high, medium, low, info
+- message and suggestion are one short sentence each; suggestion may be omitted
+- confidence is how sure you are of the review as a whole, from 0 to 1
+
+JSON:"""
+
+
+def findings_schema(concerns: Optional[List[str]] = None) -> Dict[str, Any]:
+    """JSON schema Ollama constrains structured reviews to"""
+    finding = {
+        "type": "object",
+        "properties": {
+            "line_start": {"type": "integer"},
+            "line_end": {"type": "integer"},
+            "severity": {"type": "string", "enum": list(SEVERITIES)},
+            "category": {"type": "string"},
+            "message": {"type": "string"},
+            "suggestion": {"type": "string"}
+        },
+        "required": ["line_start", "severity", "category", "message"]
+    }
+    if concerns:
+        finding["properties"]["concern"] = {"type": "string", "enum": list(concerns)}
+        finding["required"].append("concern")
+    return {
+        "type": "object",
+        "properties": {
+            "findings": {"type": "array", "items": finding},
+            "confidence": {"type": "number"}
+        },
+        "required": ["findings", "confidence"]
+    }
+
+
+def severity_counts(findings: List[Dict[str, Any]]) -> Dict[str, int]:
+    counts = Counter(finding["severity"] for finding in findings)
+    return {severity: counts[severity] for severity in SEVERITIES if counts[severity]}
+
+
+def summarize_findings(findings: List[Dict[str, Any]], confidence: Any = None) -> Dict[str, Any]:
+    """Review result for structured ``findings``, with feedback text rendered from them"""
+    if isinstance(confidence, (int, float)) and not isinstance(confidence, bool):
+        confidence = confidence / 100 if 1 < confidence <= 100 else confidence
+        confidence = min(1.0, max(0.0, float(confidence)))
+    else:
+        confidence = DEFAULT_CONFIDENCE
+    return {
+        "raw_feedback": render_findings(findings),
+        "findings": findings,
+        "confidence": confidence,
+        "issues_found": len(findings),
+        "severity_counts": severity_counts(findings),
+        "structured": True
+    }
+
+
+def render_findings(findings: List[Dict[str, Any]]) -> str:
+    if not findings:
+        return "No issues found."
+    lines = []
+    for number, finding in enumerate(findings, 1):
+        start, end = finding.get("line_start"), finding.get("line_end")
+        if start and end and end != start:
+            location = f"Lines {start}-{end}: "
+        elif start:
+            location = f"Line {start}: "
+        else:
+            location = ""
+        line = f"{number}. [{finding['severity']}] {location}{finding['category']}: {finding['message']}"
+        if finding.get("suggestion"):
+            line += f" (fix: {finding['suggestion']})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
 class CodeReviewParser(BaseOutputParser):
     def parse(self, text: str) -> Dict[str, Any]:
+        # Backends that ignore the stop sequence leave the marker in
+        text = text.split(COMPLETION_MARKER, 1)[0]
         return {
             "raw_feedback": text.strip(),
             "confidence": self._extract_confidence(text),
@@ -18,47 +133,191 @@ class CodeReviewParser(BaseOutputParser):
     def _extract_confidence(self, text: str) -> float:
         """Extract confidence score from review (future enhancement)"""
         # TODO: Implement confidence extraction from LLM response
-        return 0.8  # Default confidence for now
+        return DEFAULT_CONFIDENCE  # Default confidence for now
     
     def _count_issues(self, text: str) -> int:
         indicators = ['issue', 'problem', 'vulnerability', 'inefficient', 'violation']
         return sum(1 for indicator in indicators if indicator.lower() in text.lower())
 
 
+class StructuredReviewParser(BaseOutputParser):
+    """Validates the JSON findings of a structured review.
+    
+    Findings without a message are dropped and unknown severities become
+    ``medium``. Output cut off by ``num_predict`` keeps the findings that
+    were complete; anything that is not JSON at all goes through the text
+    parser instead, marked ``structured: False``.
+    """
+    
+    def parse(self, text: str) -> Dict[str, Any]:
+        data = self._load(text)
+        if data is None:
+            logger.warning("Structured review was not valid JSON; parsing it as text")
+            result = CodeReviewParser().parse(text)
+            result["structured"] = False
+            return result
+        
+        findings = [self.validate_finding(item) for item in data.get("findings") or []]
+        return summarize_findings([f for f in findings if f is not None], data.get("confidence"))
+    
+    @staticmethod
+    def validate_finding(item: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(item, dict) or not isinstance(item.get("message"), str) or not item["message"].strip():
+            return None
+        
+        line_start = _positive_int(item.get("line_start"))
+        line_end = _positive_int(item.get("line_end"))
+        severity = str(item.get("severity", "")).lower()
+        finding = {
+            "line_start": line_start,
+            "line_end": max(line_end, line_start) if line_start and line_end else line_start,
+            "severity": severity if severity in SEVERITIES else "medium",
+            "category": str(item.get("category") or "general").strip()[:60],
+            "message": item["message"].strip()[:MAX_MESSAGE_CHARS]
+        }
+        if isinstance(item.get("suggestion"), str) and item["suggestion"].strip():
+            finding["suggestion"] = item["suggestion"].strip()[:MAX_MESSAGE_CHARS]
+        if isinstance(item.get("concern"), str):
+            finding["concern"] = item["concern"].lower()
+        return finding
+    
+    def _load(self, text: str) -> Optional[Dict[str, Any]]:
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.strip("`").split("\n", 1)[-1] if "\n" in text else ""
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return self._salvage(text)
+        if isinstance(data, list):
+            return {"findings": data}
+        return data if isinstance(data, dict) else None
+    
+    def _salvage(self, text: str) -> Optional[Dict[str, Any]]:
+        """Complete findings from output that was cut off mid-way"""
+        key = text.find('"findings"')
+        start = text.find("[", key) if key >= 0 else -1
+        if start < 0:
+            return None
+        
+        decoder = json.JSONDecoder()
+        findings = []
+        position = start + 1
+        while True:
+            position = text.find("{", position)
+            if position < 0:
+                break
+            try:
+                item, position = decoder.raw_decode(text, position)
+            except ValueError:
+                break
+            findings.append(item)
+        return {"findings": findings}
+
+
+def _positive_int(value: Any) -> Optional[int]:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
 class BaseReviewAgent(ABC):
     """Base class for all review agents"""
     
-    def __init__(self, llm: OllamaLLM, name: str):
+    def __init__(self, llm: OllamaLLM, name: str, structured: bool = STRUCTURED_OUTPUT):
         self.llm = llm
         self.name = name
-        self.parser = CodeReviewParser()
+        self.structured = structured
+        self.parser = StructuredReviewParser() if structured else CodeReviewParser()
         self.prompt = self._create_prompt()
-        self.chain = self.prompt | self.llm | self.parser
+        self.chain = self.prompt | self._bind(self.llm) | self.parser
     
-    @abstractmethod
     def _create_prompt(self) -> PromptTemplate:
+        if self.structured:
+            instructions = self._get_structured_instructions()
+        else:
+            # The completion instruction goes before the closing "Review:" cue
+            body, _, cue = self._get_instructions().rpartition("\n")
+            instructions = f"{body}\n{COMPLETION_INSTRUCTION}\n\n{cue}" if body else f"{COMPLETION_INSTRUCTION}\n\n{cue}"
+        return PromptTemplate(
+            input_variables=["code", "context"],
+            template=CODE_PREFIX + instructions,
+            partial_variables={"context": ""}
+        )
+    
+    def _bind(self, llm: OllamaLLM) -> Runnable:
+        """``llm``, constrained to the findings schema in structured mode or
+        stopping at the completion marker otherwise"""
+        if self.structured:
+            return llm.bind(format=self.output_schema())
+        return llm.bind(stop=[COMPLETION_MARKER])
+    
+    @abstractmethod
+    def _get_instructions(self) -> str:
+        """Agent-specific instructions appended after the shared code prefix"""
         pass
     
+    def _get_structured_instructions(self) -> str:
+        """Instructions for structured mode: the agent's concerns, answered as JSON findings"""
+        return (f"Act as the {self.name} and review the code above for these concerns only: "
+                f"{', '.join(self.get_focus_areas())}." + STRUCTURED_FORMAT)
+    
+    def output_schema(self) -> Dict[str, Any]:
+        return findings_schema()
+    
     @abstractmethod
     def get_focus_areas(self) -> list:
         pass
     
-    def review(self, code: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def review(self, code: str, context: Optional[Dict[str, Any]] = None,
+               on_token: Optional[Callable[[str], None]] = None,
+               llm: Optional[OllamaLLM] = None,
+               deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Review ``code``, optionally with a different ``llm`` than the agent's own.
+        
+        With a ``deadline`` the response is streamed so the call can be
+        abandoned, closing the request to Ollama, once the deadline is done.
+        """
+        if deadline is not None and deadline.done:
+            return self.interrupted_result(deadline)
+        
+        llm = llm or self.llm
+        callback = LLMMetricsCallback(self.name, llm.base_url)
+        config = {"callbacks": [callback]}
+        start_time = time.time()
         try:
             input_data = {"code": code}
             
             if context:
                 input_data["context"] = self._format_context(context)
             
-            result = self.chain.invoke(input_data)
+            if on_token is None and deadline is None:
+                chain = self.chain if llm is self.llm else self.prompt | self._bind(llm) | self.parser
+                result = chain.invoke(input_data, config=config)
+            else:
+                result = self._stream_review(input_data, on_token, llm, config, deadline)
             
             result["agent_name"] = self.name
             result["focus_areas"] = self.get_focus_areas()
+            result["generation"] = {
+                "num_predict": llm.num_predict,
+                "output_tokens": callback.output_tokens,
+                "stop_reason": callback.done_reason
+            }
             
+            AGENT_LATENCY.observe(time.time() - start_time, agent=self.name)
             logger.info(f"{self.name} completed review successfully")
             return result
             
+        except ReviewCancelled:
+            AGENT_LATENCY.observe(time.time() - start_time, agent=self.name)
+            logger.info(f"{self.name} review stopped after {time.time() - start_time:.1f}s")
+            return self.interrupted_result(deadline)
         except Exception as e:
+            AGENT_LATENCY.observe(time.time() - start_time, agent=self.name)
+            AGENT_ERRORS.inc(agent=self.name)
             logger.error(f"Error in {self.name} review: {str(e)}")
             return {
                 "agent_name": self.name,
@@ -68,10 +327,60 @@ class BaseReviewAgent(ABC):
                 "issues_found": 0
             }
     
+    def interrupted_result(self, deadline: Deadline) -> Dict[str, Any]:
+        """Result for a review stopped because ``deadline`` ran out or was cancelled"""
+        reason = "did not finish before the deadline" if deadline.expired else "was cancelled"
+        return {
+            "agent_name": self.name,
+            "error": f"Review {reason}",
+            "timed_out": deadline.expired,
+            "cancelled": True,
+            "raw_feedback": f"The review {reason}.",
+            "confidence": 0.0,
+            "issues_found": 0
+        }
+    
+    def _stream_review(self, input_data: Dict[str, Any],
+                       on_token: Optional[Callable[[str], None]],
+                       llm: OllamaLLM, config: Dict[str, Any],
+                       deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Generate token by token, forwarding each chunk before parsing the full text.
+        
+        Stops with ``ReviewCancelled`` once ``deadline`` is done; closing the
+        stream closes the HTTP response, which makes Ollama stop generating.
+        """
+        chunks = []
+        stream = (self.prompt | self._bind(llm)).stream(input_data, config=config)
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                if on_token is not None:
+                    on_token(chunk)
+                if deadline is not None and deadline.done:
+                    raise ReviewCancelled()
+        finally:
+            stream.close()
+        return self.parser.parse("".join(chunks))
+    
     def _format_context(self, context: Dict[str, Any]) -> str:
         context_str = ""
-        if "related_files" in context:
+        if context.get("related_context"):
+            context_str += f"\nRelated code elsewhere in the repository (most relevant first):\n{context['related_context']}"
+        elif "related_files" in context:
             context_str += f"\nRelated files: {', '.join(context['related_files'])}"
         if "project_type" in context:
             context_str += f"\nProject type: {context['project_type']}"
+        if "chunk" in context:
+            chunk = context["chunk"]
+            context_str += (
+                f"\nThis is part {chunk['index']} of {chunk['count']} of the file "
+                f"(original lines {chunk['start_line']}-{chunk['end_line']}). "
+                "Count line numbers from the first line of this part."
+            )
+            if chunk.get("changed_lines"):
+                context_str += f"\nOnly lines {chunk['changed_lines']} of this part changed; focus the review on them."
+            if chunk.get("header"):
+                context_str += f"\nFile outline (imports and signatures):\n{chunk['header']}"
+        if context.get("review_depth") == "short":
+            context_str += "\nKeep this review short: report only the most important issues, at most three, in a sentence or two each."
         return context_str
@@ -0,0 +1,70 @@
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from .base import SEVERITIES
+from ..config import (
+    CASCADE_MODEL, CASCADE_ESCALATION_SEVERITY, CASCADE_MAX_ISSUES, CASCADE_MIN_CONFIDENCE
+)
+
+logger = logging.getLogger(__name__)
+
+SMALL = "small"
+LARGE = "large"
+
+
+class ModelCascade:
+    """Decides when a small model's first-pass review needs the large model.
+
+    Every review first runs on ``small_model``. It is kept unless it reports
+    a finding at ``severity`` or worse, more than ``max_issues`` issues (text
+    reviews, which have no severities), a confidence below
+    ``min_confidence``, or failed outright; those are re-run on the agent's
+    own model. Reviews record the ``tier`` that produced them: ``small`` for
+    a kept first pass, ``large`` for the agent's own model.
+    """
+
+    def __init__(self, small_model: str = CASCADE_MODEL,
+                 severity: str = CASCADE_ESCALATION_SEVERITY,
+                 max_issues: int = CASCADE_MAX_ISSUES,
+                 min_confidence: float = CASCADE_MIN_CONFIDENCE):
+        if severity not in SEVERITIES:
+            raise ValueError(f"Unknown escalation severity '{severity}', expected one of {', '.join(SEVERITIES)}")
+        self.small_model = small_model
+        self.severities = SEVERITIES[:SEVERITIES.index(severity) + 1]
+        self.max_issues = max_issues
+        self.min_confidence = min_confidence
+
+    def cache_tag(self, model: str) -> str:
+        """Stands in for the model in cache keys, since the settings shape the result too"""
+        return (f"{self.small_model}>{model}:{self.severities[-1]}"
+                f":{self.max_issues}:{self.min_confidence}")
+
+    def escalation_reason(self, review: Dict[str, Any]) -> Optional[str]:
+        """Why ``review`` needs the large model, or None to keep it"""
+        if "error" in review:
+            # A review stopped by its deadline would not fare better on a slower model
+            return None if review.get("cancelled") else "first pass failed"
+        if "findings" in review:
+            severe = [finding for finding in review["findings"] if finding["severity"] in self.severities]
+            if severe:
+                return f"{len(severe)} {self.severities[-1]} or worse findings"
+        elif review.get("issues_found", 0) > self.max_issues:
+            return f"{review['issues_found']} issues reported"
+        if review.get("confidence", 1.0) < self.min_confidence:
+            return f"confidence {review['confidence']:.2f}"
+        return None
+
+    def summary(self, results: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Reviews per tier over per-file ``results``, and the share that escalated"""
+        counts = {SMALL: 0, LARGE: 0, "escalated": 0}
+        for result in results:
+            if result.get("metadata", {}).get("duplicate_of"):
+                continue
+            for review in result.get("reviews", {}).values():
+                if review.get("tier") in counts:
+                    counts[review["tier"]] += 1
+                if review.get("tier") == LARGE and review.get("escalation"):
+                    counts["escalated"] += 1
+        cascaded = counts[SMALL] + counts["escalated"]
+        counts["escalation_rate"] = round(counts["escalated"] / cascaded, 3) if cascaded else 0.0
+        return counts
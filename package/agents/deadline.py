@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Optional
+
+
+class ReviewCancelled(Exception):
+    """Raised inside an agent when its deadline runs out or is cancelled mid-call"""
+
+
+class Deadline:
+    """Time budget shared by the tasks of one review request.
+
+    Running out of time or calling ``cancel()`` tells every task holding the
+    deadline to stop; agents check it between streamed chunks and close their
+    request to Ollama, which stops generating. A child deadline ends no later
+    than its parent and is cancelled with it. With ``start=False`` the clock
+    only starts at the first ``start()`` call, so queued work does not use up
+    its budget.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, parent: Optional["Deadline"] = None,
+                 start: bool = True):
+        self.seconds = seconds
+        self.parent = parent
+        self.expires_at: Optional[float] = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        if start:
+            self.start()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.expires_at is None and self.seconds is not None:
+                self.expires_at = time.time() + self.seconds
+
+    def child(self, seconds: Optional[float] = None, start: bool = True) -> "Deadline":
+        return Deadline(seconds, parent=self, start=start)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None when neither this deadline nor a parent is running"""
+        remaining = None if self.expires_at is None else max(0.0, self.expires_at - time.time())
+        if self.parent is not None:
+            inherited = self.parent.remaining()
+            if inherited is not None:
+                remaining = inherited if remaining is None else min(remaining, inherited)
+        return remaining
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    @property
+    def done(self) -> bool:
+        return self.cancelled or self.expired
+
+    def cancel(self) -> None:
+        self._cancelled.set()
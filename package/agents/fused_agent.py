@@ -0,0 +1,114 @@
+import logging
+import re
+from typing import Any, Dict
+
+from langchain_ollama import OllamaLLM
+from .base import BaseReviewAgent, STRUCTURED_FORMAT, findings_schema, summarize_findings
+
+logger = logging.getLogger(__name__)
+
+SECTION_HEADING = r'^[#*\s]*{name}[*:\s]*$'
+
+
+class FusedReviewAgent(BaseReviewAgent):
+    """Single-call agent that covers every specialised agent's focus in one generation"""
+    
+    def __init__(self, llm: OllamaLLM, name: str, agents: Dict[str, BaseReviewAgent]):
+        self.section_agents = agents
+        super().__init__(llm, name)
+    
+    def _get_instructions(self) -> str:
+        sections = "\n".join(
+            f"### {agent_name.upper()}\nFocus on: {', '.join(agent.get_focus_areas())}"
+            for agent_name, agent in self.section_agents.items()
+        )
+        return f"""Review the code above once for several concerns and report one section per concern, each starting with its heading line exactly as written:
+
+{sections}
+
+For each issue:
+1. Identify the problem
+2. Explain its impact
+3. Suggest a specific fix
+
+Write "Nothing to report." under a heading with no findings.
+
+Review:"""
+    
+    def _get_structured_instructions(self) -> str:
+        concerns = "\n".join(
+            f"- {agent_name}: {', '.join(agent.get_focus_areas())}"
+            for agent_name, agent in self.section_agents.items()
+        )
+        return (f"Review the code above once for several concerns:\n{concerns}\n\n"
+                "Give every finding a \"concern\" field naming the concern it belongs to." + STRUCTURED_FORMAT)
+    
+    def output_schema(self) -> Dict[str, Any]:
+        return findings_schema(list(self.section_agents))
+    
+    def get_focus_areas(self) -> list:
+        return [area for agent in self.section_agents.values() for area in agent.get_focus_areas()]
+    
+    def split_review(self, result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Split a fused result back into the per-agent result shape"""
+        if "error" in result:
+            return {
+                agent_name: dict(result, agent_name=agent.name)
+                for agent_name, agent in self.section_agents.items()
+            }
+        
+        if result.get("structured"):
+            return self._split_findings(result)
+        
+        text = result.get("raw_feedback", "")
+        positions = []
+        for agent_name in self.section_agents:
+            pattern = re.compile(SECTION_HEADING.format(name=re.escape(agent_name)),
+                                 re.IGNORECASE | re.MULTILINE)
+            match = pattern.search(text)
+            if match:
+                positions.append((match.start(), match.end(), agent_name))
+        positions.sort()
+        
+        sections = {}
+        for i, (_, body_start, agent_name) in enumerate(positions):
+            body_end = positions[i + 1][0] if i + 1 < len(positions) else len(text)
+            sections[agent_name] = text[body_start:body_end].strip()
+        
+        reviews = {}
+        for agent_name, agent in self.section_agents.items():
+            if agent_name not in sections:
+                reviews[agent_name] = {
+                    "agent_name": agent.name,
+                    "error": "Section missing from fused review",
+                    "raw_feedback": f"The fused review did not include a {agent_name} section",
+                    "confidence": 0.0,
+                    "issues_found": 0
+                }
+                continue
+            
+            review = self.parser.parse(sections[agent_name])
+            review["agent_name"] = agent.name
+            review["focus_areas"] = agent.get_focus_areas()
+            review["fused"] = True
+            reviews[agent_name] = review
+        return reviews
+    
+    def _split_findings(self, result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Group a structured fused result's findings by their ``concern``"""
+        reviews = {}
+        for agent_name, agent in self.section_agents.items():
+            findings = [
+                {key: value for key, value in finding.items() if key != "concern"}
+                for finding in result["findings"] if finding.get("concern") == agent_name
+            ]
+            review = summarize_findings(findings, result["confidence"])
+            review["agent_name"] = agent.name
+            review["focus_areas"] = agent.get_focus_areas()
+            review["fused"] = True
+            reviews[agent_name] = review
+        
+        unassigned = sum(1 for finding in result["findings"] if finding.get("concern") not in self.section_agents)
+        if unassigned:
+            logger.warning(f"Dropped {unassigned} fused findings without a known concern")
+        return reviews
@@ -0,0 +1,144 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .orchestrator import ReviewOrchestrator
+from .scheduler import BULK
+from ..config import JOB_WORKERS, JOB_LEASE_SECONDS
+from ..utils.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewJobManager:
+    """Runs repository reviews in the background and records progress in a JobStore.
+    
+    Queued jobs wait in one queue per client, and idle workers take the next
+    job from each client in turn, so one client's backlog of uploads does
+    not hold up another client's first job. Each job is claimed in the store before it runs, so when several
+    processes share the store (a reloader, several WSGI workers) every job
+    runs in exactly one of them. Claims are leases of ``lease`` seconds,
+    renewed while the job runs.
+    """
+    
+    def __init__(self, orchestrator: ReviewOrchestrator, store: Optional[JobStore] = None,
+                 max_workers: int = JOB_WORKERS, lease: float = JOB_LEASE_SECONDS):
+        self.orchestrator = orchestrator
+        self.store = store or JobStore()
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Condition()
+        self._running = set()
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._last_client: Optional[str] = None
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True, name=f"review-job_{i}")
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._lease_thread = threading.Thread(target=self._renew_leases, daemon=True,
+                                              name="review-job-lease")
+        self._lease_thread.start()
+    
+    def submit(self, files: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+               client: Optional[str] = None) -> str:
+        """Queue a review of ``files`` for ``client``, who gets a fair share of the workers"""
+        job_id = self.store.create_job(files, client)
+        self._enqueue(job_id, client)
+        logger.info(f"Queued review job {job_id} for {client or 'anonymous'}")
+        return job_id
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get_job(job_id)
+    
+    def version(self, job_id: str) -> Optional[str]:
+        return self.store.get_version(job_id)
+    
+    def overview(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get_overview(job_id)
+    
+    def list_files(self, job_id: str, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        return self.store.list_files(job_id, offset, limit)
+    
+    def get_file(self, job_id: str, filepath: str) -> Optional[Dict[str, Any]]:
+        return self.store.get_file(job_id, filepath)
+    
+    def resume_unfinished(self) -> int:
+        """Re-queue jobs interrupted by a restart; finished files are not reviewed again"""
+        job_ids = self.store.unfinished_jobs()
+        for job_id in job_ids:
+            self._enqueue(job_id, self.store.get_client(job_id))
+        if job_ids:
+            logger.info(f"Resuming {len(job_ids)} unfinished review jobs")
+        return len(job_ids)
+    
+    def _enqueue(self, job_id: str, client: Optional[str]) -> None:
+        with self._lock:
+            # A job without a client is its own client
+            client = client or job_id
+            jobs = self._queues.get(client)
+            if jobs is None:
+                jobs = self._queues[client] = deque()
+                # A client that was idle goes ahead of the one served last
+                if self._last_client in self._queues:
+                    self._queues.move_to_end(self._last_client)
+            jobs.append(job_id)
+            self._lock.notify()
+    
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queues:
+                    self._lock.wait()
+                # Take the first client's oldest job, then send that client to the back
+                client, jobs = next(iter(self._queues.items()))
+                job_id = jobs.popleft()
+                self._last_client = client
+                if jobs:
+                    self._queues.move_to_end(client)
+                else:
+                    del self._queues[client]
+            self._run_job(job_id, client)
+    
+    def _run_job(self, job_id: str, client: str) -> None:
+        if not self.store.claim_job(job_id, self.owner, self.lease):
+            logger.info(f"Review job {job_id} is already claimed elsewhere")
+            return
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            files = self.store.get_files(job_id)
+            completed = self.store.get_results(job_id)
+            
+            # Concurrent jobs of one client share that client's slice of the bulk workers
+            for event in self.orchestrator.iter_review_repository(files, completed=completed,
+                                                                  priority=BULK, client=client):
+                if event["event"] == "file":
+                    self.store.save_file_result(job_id, event["filepath"], event["result"])
+                elif event["event"] == "complete":
+                    self.store.save_summary(job_id, event["repository_summary"])
+            
+            self.store.set_status(job_id, "completed")
+            logger.info(f"Review job {job_id} completed")
+            
+        except Exception as e:
+            logger.error(f"Review job {job_id} failed: {str(e)}")
+            self.store.set_status(job_id, "failed", str(e))
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+    
+    def _renew_leases(self) -> None:
+        while True:
+            time.sleep(self.lease / 3)
+            with self._lock:
+                running = list(self._running)
+            for job_id in running:
+                if not self.store.renew_lease(job_id, self.owner, self.lease):
+                    logger.warning(f"Lost the lease on review job {job_id}")
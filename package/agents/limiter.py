@@ -0,0 +1,144 @@
+import contextlib
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+
+class OverloadedError(RuntimeError):
+    """Raised when new work would wait longer than the queue-time budget"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+# Calls generating fewer tokens than this are costed as if they generated
+# this many, since their latency is mostly prompt processing
+MIN_CALL_SIZE = 32
+
+
+class Slot:
+    """Handed to the holder of a limiter slot to report how the call went.
+
+    ``fail()`` counts the call as failed, for callers whose failures come
+    back as results rather than exceptions; ``ignore()`` leaves the limiter
+    unchanged (say, for a call cut short by its deadline); ``size`` is the
+    call's output tokens, when known.
+    """
+
+    def __init__(self):
+        self.ok = True
+        self.ignored = False
+        self.waited = 0.0
+        self.size: Optional[int] = None
+
+    def fail(self) -> None:
+        self.ok = False
+
+    def ignore(self) -> None:
+        self.ignored = True
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for calls to one backend.
+
+    The limit grows by roughly one slot per round of calls while they are all
+    in use and latency holds steady, and shrinks by ``backoff`` when a call
+    fails or takes more than ``tolerance`` times the baseline. Calls that
+    report their size are compared per output token, so longer generations
+    do not look like congestion; the baseline is a slow moving average over
+    calls that did not trigger a decrease, so it does not drift upward with
+    the queue. ``latency``, which queue time estimates use, follows every
+    successful call, slow or not.
+
+    Free slots go to waiting callers in ascending ``order``; callers without
+    one queue behind those with one, first come first served.
+    """
+
+    def __init__(self, initial: int, min_limit: int = 1, max_limit: Optional[int] = None,
+                 tolerance: float = 2.0, backoff: float = 0.75, smoothing: float = 0.05):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit if max_limit is not None else initial)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+
+        self.inflight = 0
+        self.waiting = 0
+        self.baseline: Optional[float] = None
+        self.latency: Optional[float] = None
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+
+    @property
+    def capacity(self) -> int:
+        return int(self.limit)
+
+    @contextlib.contextmanager
+    def slot(self, order: Optional[Tuple] = None) -> Iterator[Slot]:
+        """Hold a slot; the call counts as failed if it raises or calls ``fail()`` on the yielded Slot"""
+        self.acquire(order)
+        start_time = time.time()
+        slot = Slot()
+        ok = False
+        try:
+            yield slot
+            ok = slot.ok
+        finally:
+            self.release(None if slot.ignored else time.time() - start_time, ok, slot.size)
+
+    def acquire(self, order: Optional[Tuple] = None) -> None:
+        ticket = (0, order, next(self._sequence)) if order is not None else (1, (), next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            self.waiting += 1
+            try:
+                while self.inflight >= self.capacity or self._waiters[0] != ticket:
+                    self._condition.wait()
+            except BaseException:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+                raise
+            finally:
+                self.waiting -= 1
+            heapq.heappop(self._waiters)
+            self.inflight += 1
+            # The next waiter may fit too if the limit grew
+            self._condition.notify_all()
+
+    def release(self, latency: Optional[float], ok: bool = True, size: Optional[int] = None) -> None:
+        """Free a slot; a ``latency`` of None leaves the limit and estimates unchanged"""
+        with self._condition:
+            saturated = self.inflight >= self.capacity
+            self.inflight -= 1
+            if latency is not None:
+                self._update(latency, ok, saturated, size)
+            self._condition.notify_all()
+
+    def expected_wait(self) -> float:
+        """Rough time a call queued now would wait for a slot"""
+        with self._condition:
+            if not self.latency:
+                return 0.0
+            return self.waiting * self.latency / self.capacity
+
+    def _update(self, latency: float, ok: bool, saturated: bool, size: Optional[int] = None) -> None:
+        if not ok:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            return
+
+        self.latency = latency if self.latency is None else self.latency + 0.3 * (latency - self.latency)
+        cost = latency / max(size, MIN_CALL_SIZE) if size else latency
+        if self.baseline is not None and cost > self.baseline * self.tolerance:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            return
+
+        self.baseline = cost if self.baseline is None else self.baseline + self.smoothing * (cost - self.baseline)
+        if saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
@@ -0,0 +1,75 @@
+from typing import Any
+
+import httpx
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain_ollama import OllamaLLM
+
+from ..config import (
+    OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE,
+    OLLAMA_HTTP_POOL_SIZE, OLLAMA_HTTP_KEEPALIVE_EXPIRY, GENERATION_MAX_TOKENS
+)
+from ..utils.metrics import (
+    LLM_INFLIGHT, LLM_PROMPT_TOKENS, LLM_OUTPUT_TOKENS, LLM_PROMPT_SECONDS,
+    LLM_OUTPUT_SECONDS, LLM_LOAD_SECONDS, LLM_DURATION
+)
+
+
+def create_llm(base_url: str = OLLAMA_BASE_URL, model: str = OLLAMA_MODEL, **overrides) -> OllamaLLM:
+    """Build an OllamaLLM with a pooled, keep-alive HTTP client.
+    
+    All agents share the returned instance, so every call to ``base_url`` reuses
+    the same connection pool, and ``keep_alive`` keeps the model (and its
+    prompt cache) loaded between reviews.
+    """
+    params = {
+        "model": model,
+        "base_url": base_url,
+        "temperature": 0.3,
+        "num_predict": GENERATION_MAX_TOKENS,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "client_kwargs": {
+            "limits": httpx.Limits(
+                max_connections=OLLAMA_HTTP_POOL_SIZE,
+                max_keepalive_connections=OLLAMA_HTTP_POOL_SIZE,
+                keepalive_expiry=OLLAMA_HTTP_KEEPALIVE_EXPIRY
+            )
+        }
+    }
+    params.update(overrides)
+    return OllamaLLM(**params)
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Records in-flight calls and Ollama's token counts and durations for one agent.
+    
+    The last call's output token count and ``done_reason`` (``stop`` or
+    ``length``) are kept on the instance.
+    """
+    
+    def __init__(self, agent: str, backend: str):
+        self.agent = agent
+        self.backend = backend
+        self.output_tokens = None
+        self.done_reason = None
+    
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        LLM_INFLIGHT.inc(backend=self.backend)
+    
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        LLM_INFLIGHT.dec(backend=self.backend)
+    
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        LLM_INFLIGHT.dec(backend=self.backend)
+        for generations in response.generations:
+            for generation in generations:
+                info = generation.generation_info or {}
+                self.output_tokens = info.get("eval_count")
+                self.done_reason = info.get("done_reason")
+                LLM_PROMPT_TOKENS.inc(info.get("prompt_eval_count") or 0, agent=self.agent)
+                LLM_OUTPUT_TOKENS.inc(info.get("eval_count") or 0, agent=self.agent)
+                # Ollama reports durations in nanoseconds
+                LLM_PROMPT_SECONDS.inc((info.get("prompt_eval_duration") or 0) / 1e9, agent=self.agent)
+                LLM_OUTPUT_SECONDS.inc((info.get("eval_duration") or 0) / 1e9, agent=self.agent)
+                LLM_LOAD_SECONDS.inc((info.get("load_duration") or 0) / 1e9, agent=self.agent)
+                if info.get("total_duration"):
+                    LLM_DURATION.observe(info["total_duration"] / 1e9, agent=self.agent)
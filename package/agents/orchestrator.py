@@ -1,26 +1,48 @@
 import concurrent.futures
-from typing import Dict, List, Any, Optional
-from langchain_ollama import OllamaLLM
+import copy
+import hashlib
+import queue
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
 import logging
 import time
 
 from .security_agent import SecurityAgent
 from .performance_agent import PerformanceAgent
 from .style_agent import StyleAgent
-from ..config import OLLAMA_BASE_URL, OLLAMA_MODEL, MAX_WORKERS, AGENT_TIMEOUT
+from .fused_agent import FusedReviewAgent
+from .base import SEVERITIES, CodeReviewParser, render_findings, severity_counts
+from .backend_pool import BackendPool
+from .cascade import ModelCascade, SMALL, LARGE
+from .deadline import Deadline
+from .scheduler import ReviewScheduler, INTERACTIVE, BULK
+from ..config import (
+    AGENT_TIMEOUT, MAX_WORKERS, REVIEW_CACHE_ENABLED, DIFF_CONTEXT_LINES,
+    REVIEW_MODE, REVIEW_MODES, MAX_INFLIGHT_FILES, TRIAGE_ENABLED,
+    DEDUP_ENABLED, REPOSITORY_TIMEOUT, AGENT_MODELS, CASCADE_ENABLED
+)
+from ..utils.code_chunker import (
+    CodeChunker, format_line_ranges, remap_line_references, remap_findings, split_feedback
+)
+from ..utils.context_builder import ContextBuilder
+from ..utils.diff_processor import DiffProcessor
+from ..utils.generation_budget import GenerationBudget
+from ..utils.dedup import DuplicateIndex
+from ..utils.pattern_analyzer import PatternAnalyzer
+from ..utils.review_cache import ReviewCache
+from ..utils.triage import StaticTriage, SKIP, SHORT, FULL
+from ..utils.metrics import AGENT_TIMEOUTS, REVIEW_TIERS, CASCADE_ESCALATIONS
 
 logger = logging.getLogger(__name__)
 
+FUSED_TASK = "fused"
+
 class ReviewOrchestrator:
     """Orchestrates multiple review agents"""
     
-    def __init__(self):
-        self.llm = OllamaLLM(
-            model=OLLAMA_MODEL,
-            base_url=OLLAMA_BASE_URL,
-            temperature=0.3,
-            num_predict=1000
-        )
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.scheduler = ReviewScheduler(max_workers=max_workers)
+        self.backends = BackendPool(slot=self.scheduler.slot)
+        self.llm = self.backends.primary.llm
         
         self.agents = {
             "security": SecurityAgent(self.llm, "Security Agent"),
@@ -28,96 +50,1045 @@ class ReviewOrchestrator:
             "style": StyleAgent(self.llm, "Style Agent")
         }
         
+        self.cache = ReviewCache() if REVIEW_CACHE_ENABLED else None
+        self.chunker = CodeChunker()
+        self.diff_processor = DiffProcessor()
+        self.triage = StaticTriage() if TRIAGE_ENABLED else None
+        self.budget = GenerationBudget()
+        
+        self.fused_agent = FusedReviewAgent(self.llm, "Fused Agent", self.agents)
+        
+        self.models = {
+            task_name: AGENT_MODELS.get(task_name, self.llm.model)
+            for task_name in [*self.agents, FUSED_TASK]
+        }
+        self.cascade = ModelCascade() if CASCADE_ENABLED else None
+        
         logger.info(f"Initialized {len(self.agents)} review agents")
     
-    def review_code(self, code: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def check_capacity(self, priority: str = BULK) -> None:
+        """Raise ``OverloadedError`` rather than queue new ``priority`` work behind too long a backlog"""
+        self.scheduler.check_capacity(priority)
+    
+    def review_code(self, code: str, context: Optional[Dict[str, Any]] = None,
+                    mode: Optional[str] = None,
+                    deadline: Optional[Deadline] = None,
+                    priority: str = INTERACTIVE,
+                    client: Optional[str] = None,
+                    triage: bool = False) -> Dict[str, Any]:
+        for event in self.iter_review_code(code, context, mode=mode, deadline=deadline,
+                                           priority=priority, client=client, triage=triage):
+            if event["event"] == "complete":
+                return event["results"]
+    
+    def iter_review_code(self, code: str, context: Optional[Dict[str, Any]] = None,
+                         stream_tokens: bool = False,
+                         mode: Optional[str] = None,
+                         deadline: Optional[Deadline] = None,
+                         priority: str = INTERACTIVE,
+                         client: Optional[str] = None,
+                         triage: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield a ``review`` event per agent as it finishes, then a ``complete`` event.
+        
+        With ``stream_tokens`` the generated text is also forwarded as ``token``
+        events while the agents are still running. ``mode`` is ``separate`` (one
+        call per agent) or ``fused`` (one call covering every agent).
+        
+        The review gets ``deadline`` (AGENT_TIMEOUT by default). Agents still
+        running when it passes are stopped and reported as timed out alongside
+        the reviews that did finish; closing the generator early stops them too.
+        
+        Agent calls are scheduled at ``priority`` (interactive by default) on
+        behalf of ``client``; see ``ReviewScheduler``.
+        
+        Static triage only runs with ``triage=True``: a pasted snippet has too
+        little context to safely skip or shorten a review, so only repository
+        reviews use it by default.
+        """
         start_time = time.time()
-        results = {
+        events = queue.Queue()
+        deadline = deadline.child() if deadline is not None else Deadline(AGENT_TIMEOUT)
+        state = self._new_file_state(code, context, mode=mode, deadline=deadline,
+                                     priority=priority, client=client, triage=triage)
+        
+        try:
+            tasks = self._submit_file(state, events if stream_tokens else None)
+            for agent_name, review in state["reviews"].items():
+                yield {"event": "review", "agent": agent_name, "review": review}
+            for future in tasks:
+                future.add_done_callback(events.put)
+            
+            while len(state["reviews"]) < len(self.agents):
+                try:
+                    item = events.get(timeout=deadline.remaining())
+                except queue.Empty:
+                    for agent_name, review in self._expire_file(state, tasks):
+                        yield {"event": "review", "agent": agent_name, "review": review}
+                    break
+                
+                if isinstance(item, concurrent.futures.Future):
+                    task_name, index = tasks.pop(item)
+                    for agent_name, review in self._record_task(state, task_name, index, item):
+                        yield {"event": "review", "agent": agent_name, "review": review}
+                else:
+                    yield item
+        finally:
+            deadline.cancel()
+        
+        results = self._finish_file(state, start_time)
+        
+        logger.info(f"Completed all reviews in {results['metadata']['execution_time']:.2f} seconds")
+        yield {"event": "complete", "results": results}
+    
+    def _new_file_state(self, code: str, context: Optional[Dict[str, Any]],
+                        units: Optional[List[Dict[str, Any]]] = None,
+                        kept: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                        mode: Optional[str] = None,
+                        deadline: Optional[Deadline] = None,
+                        priority: str = INTERACTIVE,
+                        client: Optional[str] = None,
+                        triage: bool = False) -> Dict[str, Any]:
+        mode = mode or REVIEW_MODE
+        if mode not in REVIEW_MODES:
+            raise ValueError(f"Unknown review mode '{mode}', expected one of {', '.join(REVIEW_MODES)}")
+        
+        return {
+            "code": code,
+            "context": context,
+            "mode": mode,
+            "units": self._plan_units(code, context) if units is None else units,
+            "kept": kept,
+            "partials": {agent_name: {} for agent_name in self.agents},
             "reviews": {},
-            "summary": {},
-            "metadata": {}
+            "cache": self._new_cache_stats(),
+            "backends": {},
+            "triage": self._triage(code, context) if triage else None,
+            "llm_tasks": 0,
+            "deadline": deadline,
+            "priority": priority,
+            "client": client,
+            "queue_waits": [],
+            "generation": []
         }
+    
+    def _triage(self, code: str, context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if self.triage is None:
+            return None
+        filepath = (context or {}).get("current_file") or (context or {}).get("filename")
+        assessment = self.triage.assess(code, filepath)
+        if assessment["kind"] or SKIP in assessment["decisions"].values():
+            logger.info(f"Triage for {filepath or 'code'}: {assessment['decisions']}")
+        return assessment
+    
+    def _plan_units(self, code: str, context: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Split a file into the units every agent reviews: the whole file, or its chunks"""
+        line_count = code.count('\n') + 1
+        if not self.chunker.needs_chunking(code):
+            return [{"code": code, "context": context, "start_line": 1, "end_line": line_count}]
+        
+        filepath = (context or {}).get("current_file") or (context or {}).get("filename")
+        header = self.chunker.build_header(code, filepath)
+        chunks = self.chunker.chunk(code, filepath)
+        
+        units = []
+        for index, chunk in enumerate(chunks, 1):
+            chunk_context = dict(context or {})
+            chunk_context["chunk"] = {
+                "index": index,
+                "count": len(chunks),
+                "start_line": chunk["start_line"],
+                "end_line": chunk["end_line"],
+                "header": header
+            }
+            units.append({
+                "code": chunk["code"],
+                "context": chunk_context,
+                "start_line": chunk["start_line"],
+                "end_line": chunk["end_line"]
+            })
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            future_to_agent = {
-                executor.submit(
-                    agent.review, 
-                    code, 
-                    context
-                ): agent_name
-                for agent_name, agent in self.agents.items()
+        logger.info(f"Split {filepath or 'code'} ({line_count} lines) into {len(units)} chunks")
+        return units
+    
+    def _submit_file(self, state: Dict[str, Any],
+                     events: Optional[queue.Queue] = None) -> Dict[concurrent.futures.Future, Tuple[str, int]]:
+        """Queue one task per (agent, unit) and map each future back to it.
+        
+        In fused mode there is a single ``fused`` task per unit instead. Agents
+        that triage skips get their review straight away, without a task;
+        agents it downsizes get a short review. Each task's generation cap
+        comes from ``GenerationBudget``.
+        """
+        depths = {agent_name: self._review_depth(state, agent_name) for agent_name in self.agents}
+        if state["mode"] == "fused":
+            if all(depth == SKIP for depth in depths.values()):
+                task_depths = {}
+            else:
+                task_depths = {FUSED_TASK: FULL if FULL in depths.values() else SHORT}
+        else:
+            task_depths = {name: depth for name, depth in depths.items() if depth != SKIP}
+        
+        for agent_name, depth in depths.items():
+            if depth == SKIP and FUSED_TASK not in task_depths:
+                state["reviews"][agent_name] = self._skipped_review(state, agent_name)
+        
+        tasks = {}
+        for task_name, depth in task_depths.items():
+            # The fused prompt asks for a section per agent, skipped or not
+            concerns = list(self.agents) if task_name == FUSED_TASK else [task_name]
+            structured = self._task_agent(task_name).structured
+            for index, unit in enumerate(state["units"]):
+                context = unit["context"]
+                if depth == SHORT:
+                    context = dict(context or {}, review_depth=SHORT)
+                on_token = self._token_forwarder(events, task_name, index) if events else None
+                num_predict = self.budget.num_predict(concerns, unit["code"], state["triage"], depth, structured)
+                future = self._submit_agent(task_name, unit["code"], context, on_token, state["deadline"],
+                                            state["priority"], state["client"], num_predict)
+                tasks[future] = (task_name, index)
+        state["llm_tasks"] = len(tasks)
+        return tasks
+    
+    def _review_depth(self, state: Dict[str, Any], agent_name: str) -> str:
+        if state["triage"] is None:
+            return FULL
+        return state["triage"]["decisions"].get(agent_name, FULL)
+    
+    def _skipped_review(self, state: Dict[str, Any], agent_name: str) -> Dict[str, Any]:
+        """Stand-in review for an agent that triage skipped; diff reviews keep earlier findings"""
+        agent = self.agents[agent_name]
+        triage = state["triage"]["agents"][agent_name]
+        if state["kept"] is not None:
+            review = self._reduce_chunk_reviews([], {}, state["kept"].get(agent_name, []))
+        else:
+            review = {
+                "raw_feedback": f"Skipped by static triage ({', '.join(triage['reasons'])}).",
+                "confidence": 0.0,
+                "issues_found": 0
             }
+        review.update(agent_name=agent.name, focus_areas=agent.get_focus_areas(), skipped=True)
+        return review
+    
+    def _record_task(self, state: Dict[str, Any], task_name: str, index: int,
+                     future: concurrent.futures.Future) -> List[Tuple[str, Dict[str, Any]]]:
+        """Store one finished task; return the agent reviews it completed"""
+        return self._record_result(state, task_name, index, self._collect_review(future, task_name, state))
+    
+    def _expire_file(self, state: Dict[str, Any],
+                     tasks: Dict[concurrent.futures.Future, Tuple[str, int]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Stop a file's outstanding ``tasks`` at its deadline and record them as timed out.
+        
+        Tasks that finished in the meantime keep their result. Returns the agent
+        reviews this completed.
+        """
+        deadline = state["deadline"]
+        deadline.cancel()
+        completed = []
+        for future, (task_name, index) in list(tasks.items()):
+            future.cancel()
+            if future.done() and not future.cancelled():
+                result = self._collect_review(future, task_name, state)
+            else:
+                result = self._task_agent(task_name).interrupted_result(deadline)
+            completed.extend(self._record_result(state, task_name, index, result))
+        tasks.clear()
+        
+        for agent_name, agent in self.agents.items():
+            if agent_name not in state["reviews"]:
+                state["reviews"][agent_name] = agent.interrupted_result(deadline)
+                completed.append((agent_name, state["reviews"][agent_name]))
+        
+        for agent_name in self._timed_out_agents(state["reviews"]):
+            AGENT_TIMEOUTS.inc(agent=self.agents[agent_name].name)
+        return completed
+    
+    def _timed_out_agents(self, reviews: Dict[str, Any]) -> List[str]:
+        return [
+            agent_name for agent_name, review in reviews.items()
+            if review.get("timed_out") or any(chunk.get("timed_out") for chunk in review.get("chunks", []))
+        ]
+    
+    def _record_result(self, state: Dict[str, Any], task_name: str, index: int,
+                       result: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        if task_name == FUSED_TASK:
+            partial_results = self.fused_agent.split_review(result)
+            tier = {key: result[key] for key in ("model", "tier", "escalation") if key in result}
+            for partial in partial_results.values():
+                partial.update(tier)
+        else:
+            partial_results = {task_name: result}
+        
+        completed = []
+        for agent_name, partial in partial_results.items():
+            partials = state["partials"][agent_name]
+            partials[index] = partial
+            if len(partials) < len(state["units"]):
+                continue
             
-            for future in concurrent.futures.as_completed(future_to_agent, timeout=AGENT_TIMEOUT):
-                agent_name = future_to_agent[future]
-                try:
-                    review_result = future.result()
-                    results["reviews"][agent_name] = review_result
-                    logger.info(f"Completed review from {agent_name}")
-                except Exception as e:
-                    logger.error(f"Agent {agent_name} failed: {str(e)}")
-                    results["reviews"][agent_name] = {
-                        "error": str(e),
-                        "agent_name": agent_name,
-                        "raw_feedback": f"Review failed: {str(e)}"
-                    }
+            kept = state["kept"].get(agent_name, []) if state["kept"] is not None else None
+            if len(state["units"]) == 1 and kept is None:
+                review = partials[0]
+            else:
+                review = self._reduce_chunk_reviews(state["units"], partials, kept)
+            state["reviews"][agent_name] = review
+            completed.append((agent_name, review))
+        return completed
+    
+    def _reduce_chunk_reviews(self, units: List[Dict[str, Any]],
+                              partials: Dict[int, Dict[str, Any]],
+                              kept: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Merge per-chunk reviews into one result with line numbers mapped to the file.
+        
+        ``kept`` holds findings reused from an earlier review (already in file
+        coordinates); they are merged in line order with the new chunks.
+        """
+        chunks = [dict(chunk, reused=True) for chunk in kept or []]
+        successful = []
+        for index, unit in enumerate(units):
+            review = partials[index]
+            chunk = {
+                "start_line": unit["start_line"],
+                "end_line": unit["end_line"],
+                "issues_found": review.get("issues_found", 0),
+                "confidence": review.get("confidence", 0.0),
+                "raw_feedback": remap_line_references(review.get("raw_feedback", ""), unit["start_line"] - 1)
+            }
+            if "findings" in review:
+                chunk["findings"] = remap_findings(review["findings"], unit["start_line"] - 1)
+            if "tier" in review:
+                chunk["model"] = review["model"]
+                chunk["tier"] = review["tier"]
+                if review.get("escalation"):
+                    chunk["escalation"] = review["escalation"]
+            if "error" in review:
+                chunk["error"] = review["error"]
+                if review.get("timed_out"):
+                    chunk["timed_out"] = True
+            else:
+                successful.append(review)
+            chunks.append(chunk)
         
-        results["summary"] = self._calculate_summary(results["reviews"])
+        if units and not successful:
+            return partials[0]
         
-        results["metadata"] = {
-            "execution_time": time.time() - start_time,
-            "agents_count": len(self.agents),
-            "successful_reviews": sum(1 for r in results["reviews"].values() if "error" not in r),
-            "code_length": len(code),
-            "has_context": context is not None
+        chunks.sort(key=lambda chunk: chunk["start_line"])
+        valid = [chunk for chunk in chunks if "error" not in chunk]
+        first = successful[0] if successful else {}
+        merged = {
+            "agent_name": first.get("agent_name", kept[0].get("agent_name") if kept else None),
+            "focus_areas": first.get("focus_areas", []),
+            "raw_feedback": "\n\n".join(
+                f"Lines {chunk['start_line']}-{chunk['end_line']}:\n{chunk['raw_feedback']}"
+                for chunk in valid
+            ),
+            "confidence": sum(c.get("confidence", 0.0) for c in valid) / len(valid) if valid else 0.0,
+            "issues_found": sum(c.get("issues_found", 0) for c in valid),
+            "chunks": chunks,
+            "chunk_errors": len(units) - len(successful)
         }
+        if any("findings" in chunk for chunk in valid):
+            findings = [finding for chunk in valid for finding in chunk.get("findings", [])]
+            merged.update(findings=findings, severity_counts=severity_counts(findings), structured=True)
+        tiers = {chunk["tier"] for chunk in valid if "tier" in chunk}
+        if tiers:
+            # A file is as large a tier as its largest chunk
+            merged["tier"] = LARGE if LARGE in tiers else SMALL
+            merged["model"] = next(chunk["model"] for chunk in valid if chunk.get("tier") == merged["tier"])
+            escalated = sum(1 for chunk in valid if chunk.get("tier") == LARGE and chunk.get("escalation"))
+            if escalated:
+                merged["escalation"] = {"reason": f"{escalated} of {len(units)} chunks escalated"}
+        return merged
+    
+    def _token_forwarder(self, events: queue.Queue, agent_name: str,
+                         chunk_index: int = 0) -> Callable[[str], None]:
+        def forward(text: str) -> None:
+            events.put({"event": "token", "agent": agent_name, "chunk": chunk_index, "text": text})
+        return forward
+    
+    def _submit_agent(self, agent_name: str, code: str,
+                      context: Optional[Dict[str, Any]],
+                      on_token: Optional[Callable[[str], None]] = None,
+                      deadline: Optional[Deadline] = None,
+                      priority: str = INTERACTIVE,
+                      client: Optional[str] = None,
+                      num_predict: Optional[int] = None) -> concurrent.futures.Future:
+        return self.scheduler.submit(self._run_agent, agent_name, code, context, on_token, deadline, num_predict,
+                                     priority=priority, client=client)
+    
+    def _task_agent(self, task_name: str):
+        return self.fused_agent if task_name == FUSED_TASK else self.agents[task_name]
+    
+    def _run_agent(self, agent_name: str, code: str,
+                   context: Optional[Dict[str, Any]],
+                   on_token: Optional[Callable[[str], None]] = None,
+                   deadline: Optional[Deadline] = None,
+                   num_predict: Optional[int] = None
+                   ) -> Tuple[Dict[str, Any], Optional[str], List[Dict[str, Any]]]:
+        """Run one agent, going through the review cache when it is enabled.
         
-        logger.info(f"Completed all reviews in {results['metadata']['execution_time']:.2f} seconds")
+        The backend is picked when the call is made, so cache hits never
+        occupy one. Returns the review, the cache status and the backend
+        attempts made (none on a cache hit). Work whose ``deadline`` is already
+        done by the time it leaves the queue is not started.
+        
+        The agent runs on its model from AGENT_MODELS; with the cascade
+        enabled, on the small model first, escalating when ``ModelCascade``
+        says so. The review records its ``model`` and ``tier``. ``num_predict``
+        caps its generation; without one the backend's default applies.
+        """
+        agent = self._task_agent(agent_name)
+        if deadline is not None and deadline.done:
+            return agent.interrupted_result(deadline), None, []
+        
+        overrides = {"num_predict": num_predict} if num_predict else {}
+        model = self.models[agent_name]
+        cascade = self.cascade if self.cascade is not None and self.cascade.small_model != model else None
+        attempts = []
+        
+        def run(model_name: str, tier: str) -> Dict[str, Any]:
+            def call(backend) -> Dict[str, Any]:
+                if deadline is not None:
+                    deadline.start()
+                llm = backend.variant(**overrides) if model_name == backend.llm.model else \
+                    backend.variant(model=model_name, **overrides)
+                return agent.review(code, context, on_token, llm, deadline)
+            
+            result, calls = self.backends.run(call, model=None if model_name == self.llm.model else model_name)
+            attempts.extend(calls)
+            result["model"] = model_name
+            result["tier"] = tier
+            REVIEW_TIERS.inc(agent=agent.name, tier=tier)
+            return result
+        
+        def review() -> Dict[str, Any]:
+            if cascade is None:
+                return run(model, SMALL if self.cascade is not None else LARGE)
+            
+            first = run(cascade.small_model, SMALL)
+            reason = cascade.escalation_reason(first)
+            if reason is None:
+                return first
+            
+            escalation = {
+                "reason": reason,
+                "from_model": cascade.small_model,
+                "first_pass_issues": first.get("issues_found", 0),
+                "first_pass_confidence": first.get("confidence", 0.0)
+            }
+            logger.info(f"Escalating {agent.name} review to {model}: {reason}")
+            CASCADE_ESCALATIONS.inc(agent=agent.name)
+            result = run(model, LARGE)
+            if result.get("cancelled") and "error" not in first:
+                # Out of time: the first pass is better than nothing, but it
+                # is marked cancelled so it is neither cached nor shared
+                first["escalation"] = dict(escalation, completed=False)
+                first["cancelled"] = True
+                return first
+            result["escalation"] = escalation
+            return result
+        
+        if self.cache is None:
+            return review(), None, attempts
+        
+        key = ReviewCache.make_key(code, context, agent.prompt.template,
+                                   cascade.cache_tag(model) if cascade is not None else model,
+                                   self.llm.temperature, num_predict or self.llm.num_predict)
+        review_result, cache_status = self.cache.get_or_compute(key, review)
+        return review_result, cache_status, attempts
+    
+    def _collect_review(self, future: concurrent.futures.Future, agent_name: str,
+                        state: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            review_result, cache_status, attempts = future.result()
+            self._count_cache_status(state["cache"], cache_status)
+            self._count_backend_calls(state["backends"], attempts)
+            if attempts:
+                state["queue_waits"].append(attempts[0]["queue_wait"])
+                if "generation" in review_result:
+                    state["generation"].append(dict(review_result["generation"], task=agent_name))
+            logger.info(f"Completed review from {agent_name}")
+            return review_result
+        except Exception as e:
+            logger.error(f"Agent {agent_name} failed: {str(e)}")
+            return {
+                "error": str(e),
+                "agent_name": agent_name,
+                "raw_feedback": f"Review failed: {str(e)}"
+            }
+    
+    def _finish_file(self, state: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """Build a file's results and remember its findings for later diff reviews"""
+        results = self._build_results(state, start_time)
+        if self.cache is not None:
+            findings = self._extract_findings(state["code"], results["reviews"], state["context"])
+            if findings:
+                self.cache.put(self._findings_key(state["code"]), findings)
         return results
     
-    def review_repository(self, files: Dict[str, str]) -> Dict[str, Any]:
-        # TODO: Implement sophisticated repository analysis
-        # For now, review each file with awareness of others
+    def _build_results(self, state: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        reviews = {name: state["reviews"][name] for name in self.agents if name in state["reviews"]}
+        results = {
+            "reviews": reviews,
+            "summary": self._calculate_summary(reviews),
+            "metadata": {
+                "execution_time": time.time() - start_time,
+                "agents_count": len(self.agents),
+                "successful_reviews": sum(1 for r in reviews.values() if "error" not in r),
+                "code_length": len(state["code"]),
+                "has_context": state["context"] is not None,
+                "chunks": len(state["units"]),
+                "review_mode": state["mode"],
+                "llm_tasks": state["llm_tasks"],
+                "timed_out": self._timed_out_agents(reviews),
+                "cache": state["cache"],
+                "backends": self._backend_stats(state["backends"]),
+                "queue": self._queue_stats(state),
+                "generation": self.budget.summary(state["generation"]),
+                "triage": state["triage"]
+            }
+        }
+        if self.cascade is not None:
+            results["metadata"]["cascade"] = self.cascade.summary([results])
+        return results
+    
+    def _new_cache_stats(self) -> Dict[str, int]:
+        return {"hits": 0, "misses": 0, "coalesced": 0}
+    
+    def _count_cache_status(self, cache_stats: Dict[str, int], status: Optional[str]) -> None:
+        if status in ("memory", "disk"):
+            cache_stats["hits"] += 1
+        elif status == "coalesced":
+            cache_stats["coalesced"] += 1
+        elif status == "miss":
+            cache_stats["misses"] += 1
+    
+    def _count_backend_calls(self, usage: Dict[str, Dict[str, int]],
+                             attempts: List[Dict[str, Any]]) -> None:
+        for attempt in attempts:
+            stats = usage.setdefault(attempt["backend"], {"requests": 0, "failures": 0})
+            stats["requests"] += 1
+            if not attempt["ok"]:
+                stats["failures"] += 1
+    
+    def _queue_stats(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """How long this review's agent calls queued, alongside the scheduler's per-priority state"""
+        waits = state["queue_waits"]
+        return {
+            "priority": state["priority"],
+            "client": state["client"],
+            "average_wait": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "max_wait": round(max(waits), 3) if waits else 0.0,
+            "priorities": self.scheduler.stats()
+        }
+    
+    def _backend_stats(self, usage: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, Any]]:
+        """This review's calls per backend, alongside each backend's current pool state"""
+        return {
+            url: {
+                "requests": usage.get(url, {}).get("requests", 0),
+                "failures": usage.get(url, {}).get("failures", 0),
+                "healthy": pool["healthy"],
+                "outstanding": pool["outstanding"],
+                "average_latency": pool["average_latency"]
+            }
+            for url, pool in self.backends.stats().items()
+        }
+    
+    def review_diff(self, base_code: str, head_code: Optional[str] = None,
+                    diff: Optional[str] = None, context: Optional[Dict[str, Any]] = None,
+                    previous: Optional[Dict[str, Any]] = None,
+                    mode: Optional[str] = None,
+                    deadline: Optional[Deadline] = None,
+                    priority: str = INTERACTIVE,
+                    client: Optional[str] = None) -> Dict[str, Any]:
+        """Re-review only the regions that changed between ``base_code`` and head.
         
-        all_results = {}
-        file_list = list(files.keys())
-        
-        for filepath, code in files.items():
-            context = {
-                "current_file": filepath,
-                "related_files": [f for f in file_list if f != filepath],
-                "total_files": len(files),
-                "project_type": self._detect_project_type(files)
+        The head version is ``head_code`` or ``base_code`` with ``diff`` applied.
+        Findings for unchanged regions come from ``previous`` (an earlier result
+        for ``base_code``) or from the findings stored when the base was reviewed;
+        without either, the head is reviewed in full. ``deadline``, ``priority``
+        and ``client`` work as in ``iter_review_code``.
+        """
+        start_time = time.time()
+        if head_code is None:
+            if diff is None:
+                raise ValueError("Either head_code or diff is required")
+            head_code = self._apply_diff(base_code, diff, context)
+        
+        previous_findings = self._previous_findings(base_code, previous, context)
+        if not previous_findings:
+            logger.info("No stored findings for base version, running a full review")
+            results = self.review_code(head_code, context, mode=mode, deadline=deadline,
+                                       priority=priority, client=client)
+            results["metadata"]["diff"] = {"mode": "full"}
+            return results
+        
+        comparison = self.diff_processor.compare(base_code, head_code)
+        units = self._plan_diff_units(head_code, comparison["changed_lines"], context)
+        kept = self._carry_over_findings(previous_findings, comparison, units)
+        deadline = deadline.child() if deadline is not None else Deadline(AGENT_TIMEOUT)
+        state = self._new_file_state(head_code, context, units=units, kept=kept, mode=mode, deadline=deadline,
+                                     priority=priority, client=client)
+        
+        tasks = self._submit_file(state)
+        try:
+            for future in concurrent.futures.as_completed(dict(tasks), timeout=deadline.remaining()):
+                task_name, index = tasks.pop(future)
+                self._record_task(state, task_name, index, future)
+        except concurrent.futures.TimeoutError:
+            self._expire_file(state, tasks)
+        finally:
+            deadline.cancel()
+        if not units:
+            for agent_name in self.agents:
+                state["reviews"][agent_name] = self._reduce_chunk_reviews([], {}, kept.get(agent_name, []))
+        
+        results = self._finish_file(state, start_time)
+        results["metadata"]["diff"] = {
+            "mode": "incremental",
+            "changed_lines": len(comparison["changed_lines"]),
+            "total_lines": comparison["head_lines"],
+            "reviewed_lines": sum(u["end_line"] - u["start_line"] + 1 for u in units),
+            "reviewed_regions": len(units),
+            "reused_regions": sum(len(chunks) for chunks in kept.values()),
+            "dropped_regions": sum(len(chunks) for chunks in previous_findings.values())
+                               - sum(len(chunks) for chunks in kept.values())
+        }
+        
+        logger.info(f"Diff review of {len(units)} regions completed in {results['metadata']['execution_time']:.2f} seconds")
+        return results
+    
+    def _apply_diff(self, base_code: str, diff: str, context: Optional[Dict[str, Any]]) -> str:
+        patches = self.diff_processor.parse_unified_diff(diff)
+        if not patches:
+            raise ValueError("No hunks found in diff")
+        
+        filename = (context or {}).get("current_file") or (context or {}).get("filename")
+        if filename in patches:
+            hunks = patches[filename]
+        elif len(patches) == 1:
+            hunks = next(iter(patches.values()))
+        else:
+            raise ValueError("Diff touches several files; pass the target file name in context")
+        return self.diff_processor.apply_patch(base_code, hunks)
+    
+    def _plan_diff_units(self, code: str, changed_lines: Set[int],
+                         context: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Units for the changed functions/hunks plus DIFF_CONTEXT_LINES around them"""
+        lines = code.split('\n')
+        filepath = (context or {}).get("current_file") or (context or {}).get("filename")
+        
+        ranges = []
+        for start, end in self.chunker.regions(code, filepath):
+            if not any(start <= line <= end for line in changed_lines):
+                continue
+            start = max(1, start - DIFF_CONTEXT_LINES)
+            end = min(len(lines), end + DIFF_CONTEXT_LINES)
+            if ranges and start <= ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], max(end, ranges[-1][1]))
+            else:
+                ranges.append((start, end))
+        
+        header = self.chunker.build_header(code, filepath) if ranges else ""
+        units = []
+        for index, (start, end) in enumerate(ranges, 1):
+            unit_context = dict(context or {})
+            unit_context["chunk"] = {
+                "index": index,
+                "count": len(ranges),
+                "start_line": start,
+                "end_line": end,
+                "header": header,
+                "changed_lines": format_line_ranges(
+                    sorted(line - start + 1 for line in changed_lines if start <= line <= end)
+                )
             }
-            
-            all_results[filepath] = self.review_code(code, context)
+            units.append({
+                "code": '\n'.join(lines[start - 1:end]),
+                "context": unit_context,
+                "start_line": start,
+                "end_line": end
+            })
+        return units
+    
+    def _previous_findings(self, base_code: str, previous: Optional[Dict[str, Any]],
+                           context: Optional[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        if previous is not None:
+            return self._extract_findings(base_code, previous.get("reviews", {}), context)
+        if self.cache is not None:
+            return self.cache.get(self._findings_key(base_code)) or {}
+        return {}
+    
+    def _carry_over_findings(self, findings: Dict[str, List[Dict[str, Any]]],
+                             comparison: Dict[str, Any],
+                             units: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Keep findings whose base region is unchanged, moved to head line numbers.
+        
+        Units take in some unchanged lines around each change; findings on
+        those lines come from the new review, so they are left out here.
+        """
+        reviewed = [(unit["start_line"], unit["end_line"]) for unit in units]
+        kept = {}
+        for agent_name, chunks in findings.items():
+            kept[agent_name] = []
+            for chunk in chunks:
+                mapped = self.diff_processor.map_range(
+                    comparison["line_map"], chunk["start_line"], chunk["end_line"]
+                )
+                if mapped is None:
+                    continue
+                offset = mapped[0] - chunk["start_line"]
+                moved = dict(
+                    chunk,
+                    start_line=mapped[0],
+                    end_line=mapped[1],
+                    raw_feedback=remap_line_references(chunk.get("raw_feedback", ""), offset)
+                )
+                if "findings" in chunk:
+                    moved["findings"] = remap_findings(chunk["findings"], offset)
+                if any(start <= moved["end_line"] and end >= moved["start_line"] for start, end in reviewed):
+                    moved = self._without_reviewed(moved, reviewed)
+                if moved is not None:
+                    kept[agent_name].append(moved)
+        return kept
+    
+    def _without_reviewed(self, chunk: Dict[str, Any],
+                          reviewed: List[Tuple[int, int]]) -> Optional[Dict[str, Any]]:
+        """``chunk`` minus the findings on ``reviewed`` lines, or None if nothing is left"""
+        if "findings" in chunk:
+            remaining = [
+                finding for finding in chunk["findings"]
+                if not any(start <= (finding.get("line_start") or 0) <= end for start, end in reviewed)
+            ]
+            if not remaining:
+                return None
+            return self._region_chunk(chunk, chunk["start_line"], chunk["end_line"], findings=remaining)
+        
+        _, rest = split_feedback(chunk.get("raw_feedback", ""), reviewed)
+        if not rest.strip():
+            return None
+        return self._region_chunk(chunk, chunk["start_line"], chunk["end_line"], raw_feedback=rest)
+    
+    def _extract_findings(self, code: str, reviews: Dict[str, Any],
+                          context: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Region-level findings per agent, as stored for incremental reviews.
         
-        all_results["repository_summary"] = self._analyze_repository_patterns(all_results)
+        Each review (or chunk of one) is split at the chunker's function and
+        class regions, so an edit only invalidates the findings of the regions
+        it touches.
+        """
+        line_count = code.count('\n') + 1
+        filepath = (context or {}).get("current_file") or (context or {}).get("filename")
+        regions = self.chunker.regions(code, filepath)
+        findings = {}
+        for agent_name, review in reviews.items():
+            if "error" in review:
+                continue
+            chunks = review.get("chunks")
+            if not chunks:
+                chunk = {
+                    "start_line": 1,
+                    "end_line": line_count,
+                    "issues_found": review.get("issues_found", 0),
+                    "confidence": review.get("confidence", 0.0),
+                    "raw_feedback": review.get("raw_feedback", "")
+                }
+                if "findings" in review:
+                    chunk["findings"] = review["findings"]
+                chunks = [chunk]
+            findings[agent_name] = [
+                region
+                for chunk in chunks if "error" not in chunk
+                for region in self._split_regions({key: value for key, value in chunk.items() if key != "reused"},
+                                                  regions)
+            ]
+        return findings
+    
+    def _split_regions(self, chunk: Dict[str, Any], regions: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """One chunk per region its findings point at, plus one for the whole chunk holding the rest.
         
+        Structured findings go to the region of their ``line_start`` (and the
+        region is widened to their ``line_end``); text feedback is split by the
+        first line each item mentions. Findings without a usable line stay on
+        the whole chunk's range, so any edit in it drops them.
+        """
+        bounds = [
+            (max(start, chunk["start_line"]), min(end, chunk["end_line"]))
+            for start, end in regions if start <= chunk["end_line"] and end >= chunk["start_line"]
+        ]
+        if len(bounds) <= 1:
+            return [chunk]
+        
+        pieces = []
+        if "findings" in chunk:
+            grouped, rest = {}, []
+            for finding in chunk["findings"]:
+                line = finding.get("line_start")
+                index = next((i for i, (start, end) in enumerate(bounds) if line and start <= line <= end), None)
+                if index is None:
+                    rest.append(finding)
+                else:
+                    grouped.setdefault(index, []).append(finding)
+            for index, region_findings in sorted(grouped.items()):
+                start, end = bounds[index]
+                end = min(chunk["end_line"], max([end] + [finding.get("line_end") or 0 for finding in region_findings]))
+                pieces.append(self._region_chunk(chunk, start, end, findings=region_findings))
+            if rest:
+                pieces.append(self._region_chunk(chunk, chunk["start_line"], chunk["end_line"], findings=rest))
+            return pieces
+        
+        parts, rest = split_feedback(chunk.get("raw_feedback", ""), bounds)
+        for index, text in sorted(parts.items()):
+            pieces.append(self._region_chunk(chunk, *bounds[index], raw_feedback=text))
+        if rest.strip():
+            pieces.append(self._region_chunk(chunk, chunk["start_line"], chunk["end_line"], raw_feedback=rest))
+        return pieces
+    
+    def _region_chunk(self, chunk: Dict[str, Any], start: int, end: int,
+                      findings: Optional[List[Dict[str, Any]]] = None,
+                      raw_feedback: Optional[str] = None) -> Dict[str, Any]:
+        if findings is not None:
+            return dict(chunk, start_line=start, end_line=end, findings=findings,
+                        issues_found=len(findings), raw_feedback=render_findings(findings))
+        return dict(chunk, start_line=start, end_line=end, raw_feedback=raw_feedback,
+                    issues_found=CodeReviewParser().parse(raw_feedback)["issues_found"])
+    
+    def _findings_key(self, code: str) -> str:
+        return "findings:" + hashlib.sha256(code.encode('utf-8')).hexdigest()
+    
+    def review_repository(self, files: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+                          mode: Optional[str] = None,
+                          file_list: Optional[List[str]] = None,
+                          client: Optional[str] = None) -> Dict[str, Any]:
+        all_results = {}
+        for event in self.iter_review_repository(files, mode=mode, file_list=file_list, client=client):
+            if event["event"] == "file":
+                all_results[event["filepath"]] = event["result"]
+            elif event["event"] == "complete":
+                if isinstance(files, Mapping):
+                    all_results = {f: all_results[f] for f in files if f in all_results}
+                all_results["repository_summary"] = event["repository_summary"]
         return all_results
     
+    def iter_review_repository(self, files: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+                               completed: Optional[Dict[str, Any]] = None,
+                               mode: Optional[str] = None,
+                               file_list: Optional[List[str]] = None,
+                               deadline: Optional[Deadline] = None,
+                               priority: str = BULK,
+                               client: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Queue every (file, agent) task on the shared scheduler and yield a
+        ``file`` event as each file's reviews complete, then a ``complete`` event.
+        
+        ``files`` is a dict or an iterable of ``(path, code)`` pairs that is
+        consumed lazily: at most MAX_INFLIGHT_FILES files are held at once, so an
+        archive can be decoded while earlier files are being reviewed. Pass
+        ``file_list`` with an iterable so every prompt sees the full file list.
+        
+        Files already present in ``completed`` are not reviewed again but still
+        count towards the repository summary. Exact and near-duplicate files
+        are not reviewed either: they receive their cluster representative's
+        result, annotated with ``metadata["duplicate_of"]``.
+        
+        Each file gets its own deadline, which starts when its first agent
+        call does: AGENT_TIMEOUT, or less when the repository ``deadline``
+        (REPOSITORY_TIMEOUT by default) is spread over the files still to
+        review. A file that runs out of time is reported with its finished
+        reviews and the rest marked timed out, without holding up other files.
+        
+        Agent calls are scheduled at ``priority`` (bulk by default) and share
+        it fairly with other ``client``s' repository reviews.
+        """
+        start_time = time.time()
+        deadline = deadline.child() if deadline is not None else Deadline(REPOSITORY_TIMEOUT)
+        if isinstance(files, Mapping):
+            file_list = list(files.keys())
+            file_iter = iter(files.items())
+        else:
+            file_list = list(file_list or [])
+            file_iter = iter(files)
+        project_type = self._detect_project_type(file_list)
+        total_files = len(file_list) or None
+        all_results = dict(completed or {})
+        patterns = PatternAnalyzer()
+        for filepath, result in all_results.items():
+            patterns.add(filepath, result)
+        duplicates = DuplicateIndex() if DEDUP_ENABLED else None
+        followers = {}
+        related = ContextBuilder(file_list, chunker=self.chunker)
+        if isinstance(files, Mapping):
+            for filepath, code in files.items():
+                related.add(filepath, code)
+        
+        pending = {}
+        future_to_task = {}
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < MAX_INFLIGHT_FILES:
+                    try:
+                        filepath, code = next(file_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    related.add(filepath, code)
+                    if filepath in all_results:
+                        continue
+                    
+                    match = duplicates.match(filepath, code) if duplicates is not None else None
+                    if match is not None:
+                        representative = match["filepath"]
+                        if representative in all_results:
+                            yield from self._file_events(filepath, self._duplicate_result(all_results[representative], match),
+                                                         all_results, followers, total_files, patterns)
+                        else:
+                            followers.setdefault(representative, []).append((filepath, match))
+                        continue
+                    
+                    context = {
+                        "current_file": filepath,
+                        "total_files": total_files,
+                        "project_type": project_type,
+                        **related.build(filepath)
+                    }
+                    files_left = total_files - len(all_results) if total_files else None
+                    file_deadline = deadline.child(self._file_budget(deadline, files_left), start=False)
+                    state = self._new_file_state(code, context, mode=mode, deadline=file_deadline,
+                                                 priority=priority, client=client, triage=True)
+                    tasks = {} if file_deadline.expired else self._submit_file(state)
+                    if not tasks:
+                        if file_deadline.expired:
+                            logger.warning(f"Repository deadline passed before {filepath} was reviewed")
+                            self._expire_file(state, tasks)
+                        else:
+                            logger.info(f"Completed reviews for {filepath} (skipped by triage)")
+                        yield from self._file_events(filepath, self._finish_file(state, start_time),
+                                                     all_results, followers, total_files, patterns)
+                        continue
+                    
+                    pending[filepath] = state
+                    for future, (task_name, index) in tasks.items():
+                        future_to_task[future] = (filepath, task_name, index)
+                
+                if not future_to_task:
+                    break
+                
+                timeouts = [state["deadline"].remaining() for state in pending.values()]
+                timeouts = [timeout for timeout in timeouts if timeout is not None]
+                done, _ = concurrent.futures.wait(
+                    future_to_task, timeout=min(timeouts) if timeouts else None,
+                    return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                
+                for future in done:
+                    filepath, task_name, index = future_to_task.pop(future)
+                    state = pending[filepath]
+                    self._record_task(state, task_name, index, future)
+                    
+                    if len(state["reviews"]) == len(self.agents):
+                        del pending[filepath]
+                        logger.info(f"Completed reviews for {filepath}")
+                        yield from self._file_events(filepath, self._finish_file(state, start_time),
+                                                     all_results, followers, total_files, patterns)
+                
+                for filepath, state in list(pending.items()):
+                    if not state["deadline"].expired:
+                        continue
+                    outstanding = {
+                        future: (task_name, index)
+                        for future, (path, task_name, index) in future_to_task.items() if path == filepath
+                    }
+                    for future in outstanding:
+                        del future_to_task[future]
+                    self._expire_file(state, outstanding)
+                    del pending[filepath]
+                    logger.warning(f"Review of {filepath} ran out of time; "
+                                   f"timed out: {', '.join(self._timed_out_agents(state['reviews']))}")
+                    yield from self._file_events(filepath, self._finish_file(state, start_time),
+                                                 all_results, followers, total_files, patterns)
+        finally:
+            deadline.cancel()
+        
+        repository_summary = patterns.summary(related.graph())
+        if duplicates is not None:
+            repository_summary["deduplication"] = duplicates.summary()
+        repository_summary["backends"] = self.backends.stats()
+        if self.cascade is not None:
+            repository_summary["cascade"] = self.cascade.summary(all_results.values())
+        yield {
+            "event": "complete",
+            "repository_summary": repository_summary
+        }
+    
+    def _file_budget(self, deadline: Deadline, files_left: Optional[int]) -> float:
+        """A file's share of what remains of the repository deadline, capped at AGENT_TIMEOUT"""
+        remaining = deadline.remaining()
+        if remaining is None or not files_left:
+            return AGENT_TIMEOUT
+        return min(AGENT_TIMEOUT, remaining * min(MAX_INFLIGHT_FILES, files_left) / files_left)
+    
+    def _file_events(self, filepath: str, result: Dict[str, Any], all_results: Dict[str, Any],
+                     followers: Dict[str, List[Tuple[str, Dict[str, Any]]]],
+                     total_files: Optional[int], patterns: PatternAnalyzer) -> Iterator[Dict[str, Any]]:
+        """Record a finished file and yield its ``file`` event, then those of its duplicates"""
+        finished = [(filepath, result)]
+        finished.extend((duplicate, self._duplicate_result(result, match))
+                        for duplicate, match in followers.pop(filepath, []))
+        
+        for path, path_result in finished:
+            all_results[path] = path_result
+            patterns.add(path, path_result)
+            yield {
+                "event": "file",
+                "filepath": path,
+                "result": path_result,
+                "completed": len(all_results),
+                "total": total_files
+            }
+    
+    def _duplicate_result(self, result: Dict[str, Any], match: Dict[str, Any]) -> Dict[str, Any]:
+        """A representative's result, reused for a file in its duplicate cluster"""
+        duplicate = copy.deepcopy(result)
+        duplicate["metadata"]["duplicate_of"] = match
+        duplicate["metadata"]["llm_tasks"] = 0
+        for stats in duplicate["metadata"].get("backends", {}).values():
+            stats.update(requests=0, failures=0)
+        return duplicate
+    
     def _calculate_summary(self, reviews: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate summary statistics from all reviews"""
         total_issues = 0
         avg_confidence = 0.0
         critical_findings = []
+        severities = {}
         
         for agent_name, review in reviews.items():
             if "error" not in review:
                 total_issues += review.get("issues_found", 0)
-                avg_confidence += review.get("confidence", 0.0)
-
-                if review.get("issues_found", 0) > 2:
+                if not review.get("skipped"):
+                    avg_confidence += review.get("confidence", 0.0)
+                
+                counts = review.get("severity_counts")
+                if counts is not None:
+                    # Structured reviews: critical means a critical or high severity finding
+                    for severity, count in counts.items():
+                        severities[severity] = severities.get(severity, 0) + count
+                    if counts.get("critical") or counts.get("high"):
+                        critical_findings.append(agent_name)
+                elif review.get("issues_found", 0) > 2:
                     critical_findings.append(agent_name)
         
-        num_successful = len([r for r in reviews.values() if "error" not in r])
+        num_successful = len([r for r in reviews.values() if "error" not in r and not r.get("skipped")])
         
-        return {
+        summary = {
             "total_issues": total_issues,
             "average_confidence": avg_confidence / num_successful if num_successful > 0 else 0,
             "critical_agents": critical_findings,
             "review_consensus": self._determine_consensus(reviews)
         }
+        if severities:
+            summary["severity_counts"] = {severity: severities[severity] for severity in SEVERITIES if severity in severities}
+        return summary
     
     def _determine_consensus(self, reviews: Dict[str, Any]) -> str:
         issues_count = sum(r.get("issues_found", 0) for r in reviews.values() if "error" not in r)
@@ -131,8 +1102,8 @@ class ReviewOrchestrator:
         else:
             return "Poor - Significant refactoring recommended"
     
-    def _detect_project_type(self, files: Dict[str, str]) -> str:
-        extensions = {filepath.split('.')[-1] for filepath in files.keys() if '.' in filepath}
+    def _detect_project_type(self, filepaths: Iterable[str]) -> str:
+        extensions = {filepath.split('.')[-1] for filepath in filepaths if '.' in filepath}
         
         if 'py' in extensions:
             return "Python"
@@ -142,11 +1113,3 @@ class ReviewOrchestrator:
             return "Java"
         else:
             return "Mixed/Unknown"
-    
-    def _analyze_repository_patterns(self, results: Dict[str, Any]) -> Dict[str, Any]:
-        # TODO: Implement cross-file pattern analysis
-        return {
-            "common_issues": [],
-            "architectural_concerns": [],
-            "consistency_score": 0.0
-        }
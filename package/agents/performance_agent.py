@@ -1,16 +1,10 @@
-from langchain.prompts import PromptTemplate
 from .base import BaseReviewAgent
 
 class PerformanceAgent(BaseReviewAgent):
     """Agent specialized in performance optimization"""
     
-    def _create_prompt(self) -> PromptTemplate:
-        template = """You are a performance optimization expert reviewing code.
-
-Code to review:
-{code}
-
-{context}
+    def _get_instructions(self) -> str:
+        return """Act as a performance optimization expert and review the code above.
 
 Focus on:
 - Time complexity issues (O(n²), O(n³) operations)
@@ -28,12 +22,6 @@ For each issue:
 3. Suggest an optimized approach
 
 Performance Review:"""
-        
-        return PromptTemplate(
-            input_variables=["code", "context"],
-            template=template,
-            partial_variables={"context": ""}
-        )
     
     def get_focus_areas(self) -> list:
         return [
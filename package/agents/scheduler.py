@@ -0,0 +1,285 @@
+import concurrent.futures
+import contextlib
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .limiter import AdaptiveLimiter, OverloadedError, Slot
+from ..config import (
+    MAX_WORKERS, BACKEND_CONCURRENCY, DEFAULT_BACKEND_CONCURRENCY,
+    ADAPTIVE_CONCURRENCY, MAX_BACKEND_CONCURRENCY, QUEUE_TIME_BUDGET,
+    INTERACTIVE_RESERVED_WORKERS, CLIENT_WEIGHTS
+)
+from ..utils.metrics import QUEUE_WAIT, BACKEND_LIMIT, REQUESTS_SHED
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+# Highest priority first
+PRIORITIES = (INTERACTIVE, BULK)
+
+
+class _Task:
+    __slots__ = ("fn", "args", "kwargs", "backend", "priority", "client", "order",
+                 "start_tag", "submitted_at", "future")
+
+    def __init__(self, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any],
+                 backend: Optional[str], priority: str, client: Optional[str]):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.backend = backend
+        self.priority = priority
+        self.client = client
+        self.order: Tuple[int, float, int] = (0, 0.0, 0)
+        self.start_tag = 0.0
+        self.submitted_at = time.time()
+        self.future = concurrent.futures.Future()
+
+
+class ReviewScheduler:
+    """Long-lived, globally bounded pool shared by every review task.
+
+    Queued tasks are dispatched by priority: ``interactive`` tasks always go
+    before ``bulk`` ones, and ``reserved_workers`` workers are kept free of
+    bulk work so an interactive task never waits for a worker. Within a
+    priority, tasks from different clients share the workers by weighted
+    fair queuing (start-time fair queuing over task counts), so one large
+    repository review cannot starve another client's.
+
+    Calls to each backend go through an ``AdaptiveLimiter`` that starts at the
+    configured concurrency and adjusts it to the latency the backend shows;
+    its free slots are handed out in the same order. Ollama runs requests in
+    parallel per loaded model, so calls naming a ``model`` get a limiter per
+    backend and model, which also keeps a fast model's latency from being
+    taken as the baseline for a slow one.
+    """
+
+    def __init__(self,
+                 max_workers: int = MAX_WORKERS,
+                 backend_limits: Optional[Dict[str, int]] = None,
+                 default_backend_limit: int = DEFAULT_BACKEND_CONCURRENCY,
+                 adaptive: bool = ADAPTIVE_CONCURRENCY,
+                 max_backend_limit: int = MAX_BACKEND_CONCURRENCY,
+                 queue_time_budget: float = QUEUE_TIME_BUDGET,
+                 reserved_workers: int = INTERACTIVE_RESERVED_WORKERS,
+                 client_weights: Optional[Dict[str, float]] = None):
+        self.max_workers = max_workers
+        self.backend_limits = dict(BACKEND_CONCURRENCY if backend_limits is None else backend_limits)
+        self.default_backend_limit = default_backend_limit
+        self.adaptive = adaptive
+        self.max_backend_limit = max_backend_limit
+        self.queue_time_budget = queue_time_budget
+        self.reserved_workers = min(max(0, reserved_workers), max_workers - 1)
+        self.client_weights = dict(CLIENT_WEIGHTS if client_weights is None else client_weights)
+
+        self._limiters: Dict[Tuple[str, Optional[str]], AdaptiveLimiter] = {}
+        self._lock = threading.Condition()
+        self._local = threading.local()
+        self._pending = []
+        self._sequence = itertools.count()
+        self._virtual_time = {priority: 0.0 for priority in PRIORITIES}
+        self._finish_tags: Dict[Tuple[str, Optional[str]], float] = {}
+        self._queued = {priority: 0 for priority in PRIORITIES}
+        self._running = {priority: 0 for priority in PRIORITIES}
+        self._average_wait = {priority: 0.0 for priority in PRIORITIES}
+        self._shutdown = False
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"review-worker-{index}", daemon=True)
+            for index in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        logger.info(f"Review scheduler started with {max_workers} workers")
+
+    def submit(self, fn: Callable[..., Any], *args: Any,
+               backend: Optional[str] = None, priority: str = BULK,
+               client: Optional[str] = None, **kwargs: Any) -> concurrent.futures.Future:
+        """Queue ``fn`` on the shared pool, bounded by ``backend``'s concurrency limit.
+
+        ``client`` identifies whose work this is for fair queuing within ``priority``.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+
+        task = _Task(fn, args, kwargs, backend, priority, client)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new tasks after shutdown")
+            flow = (priority, client)
+            # A client that was idle starts at the current virtual time rather
+            # than reclaiming the share it did not use.
+            task.start_tag = max(self._virtual_time[priority], self._finish_tags.get(flow, 0.0))
+            finish_tag = task.start_tag + 1.0 / self._weight(client)
+            self._finish_tags[flow] = finish_tag
+            task.order = (PRIORITIES.index(priority), finish_tag, next(self._sequence))
+            heapq.heappush(self._pending, (task.order, task))
+            self._queued[priority] += 1
+            self._lock.notify()
+        return task.future
+
+    def expected_wait(self, priority: str = BULK) -> float:
+        """Rough time a ``priority`` task submitted now would wait before holding a backend slot.
+
+        Only work queued at the same or a higher priority counts.
+        """
+        with self._lock:
+            limiters = list(self._limiters.values())
+            queued = sum(self._queued[p] for p in PRIORITIES[:PRIORITIES.index(priority) + 1])
+        latencies = [limiter.latency for limiter in limiters if limiter.latency]
+        if not latencies:
+            return 0.0
+        capacity = sum(limiter.capacity for limiter in limiters)
+        return queued * (sum(latencies) / len(latencies)) / max(1, min(capacity, self.max_workers))
+
+    def check_capacity(self, priority: str = BULK) -> None:
+        """Raise ``OverloadedError`` when the backlog exceeds the queue-time budget"""
+        if self.queue_time_budget <= 0:
+            return
+        wait = self.expected_wait(priority)
+        if wait > self.queue_time_budget:
+            REQUESTS_SHED.inc()
+            raise OverloadedError(
+                f"Review backlog is about {wait:.0f}s (budget {self.queue_time_budget:.0f}s)",
+                retry_after=wait - self.queue_time_budget
+            )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queued and running tasks and the recent average queue wait, per priority"""
+        with self._lock:
+            return {
+                priority: {
+                    "queued": self._queued[priority],
+                    "running": self._running[priority],
+                    "average_wait": round(self._average_wait[priority], 3)
+                }
+                for priority in PRIORITIES
+            }
+
+    @contextlib.contextmanager
+    def slot(self, backend: str, model: Optional[str] = None) -> Iterator[Slot]:
+        """Hold one of ``backend``'s concurrency slots (for ``model``).
+
+        For tasks that only pick their backend once running. The yielded Slot
+        has the seconds waited for it, and ``fail()`` reports a call that
+        failed without raising. The first slot a task takes records its wait
+        since submission; later ones (failover retries) record only their own
+        wait.
+        """
+        task = getattr(self._local, "task", None)
+        first = task is not None and getattr(self._local, "waiting", False)
+        waiting_since = task.submitted_at if first else time.time()
+        priority = task.priority if task is not None else BULK
+        limiter = self._limiter(backend, model)
+        with limiter.slot(task.order if task is not None else None) as slot:
+            waited = time.time() - waiting_since
+            slot.waited = waited
+            if first:
+                self._local.waiting = False
+                self._dequeued(priority, waited)
+            QUEUE_WAIT.observe(waited, backend=backend, priority=priority)
+            try:
+                yield slot
+            finally:
+                BACKEND_LIMIT.set(limiter.limit, backend=backend, model=model or "")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting tasks; workers finish what is queued and exit"""
+        with self._lock:
+            self._shutdown = True
+            self._lock.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                task = self._next_task()
+                while task is None:
+                    if self._shutdown and not self._pending:
+                        return
+                    self._lock.wait()
+                    task = self._next_task()
+
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    task.future.set_result(self._run(task))
+                except BaseException as e:
+                    task.future.set_exception(e)
+            else:
+                self._dequeued(task.priority, None)
+
+            with self._lock:
+                self._running[task.priority] -= 1
+                # A bulk task held back by the reserve may be able to start now
+                self._lock.notify_all()
+
+    def _next_task(self) -> Optional[_Task]:
+        """Pop the task to run next, or None; call with the lock held"""
+        if not self._pending:
+            return None
+        task = self._pending[0][1]
+        if task.priority != INTERACTIVE and not task.future.cancelled():
+            busy = sum(self._running.values())
+            if busy >= self.max_workers - self.reserved_workers:
+                return None
+
+        heapq.heappop(self._pending)
+        self._virtual_time[task.priority] = max(self._virtual_time[task.priority], task.start_tag)
+        self._running[task.priority] += 1
+        if len(self._finish_tags) > 1024:
+            self._forget_idle_clients()
+        return task
+
+    def _forget_idle_clients(self) -> None:
+        """Drop finish tags already behind the virtual time; they no longer affect ordering"""
+        self._finish_tags = {
+            flow: tag for flow, tag in self._finish_tags.items() if tag > self._virtual_time[flow[0]]
+        }
+
+    def _run(self, task: _Task) -> Any:
+        self._local.task = task
+        self._local.waiting = True
+        try:
+            if task.backend is None:
+                return task.fn(*task.args, **task.kwargs)
+            with self.slot(task.backend) as slot:
+                result = task.fn(*task.args, **task.kwargs)
+                if isinstance(result, dict):
+                    if result.get("cancelled"):
+                        slot.ignore()
+                    elif "error" in result:
+                        slot.fail()
+                    else:
+                        slot.size = result.get("generation", {}).get("output_tokens")
+                return result
+        finally:
+            if self._local.waiting:
+                self._local.waiting = False
+                self._dequeued(task.priority, None)
+            self._local.task = None
+
+    def _dequeued(self, priority: str, waited: Optional[float]) -> None:
+        with self._lock:
+            self._queued[priority] -= 1
+            if waited is not None:
+                self._average_wait[priority] += 0.2 * (waited - self._average_wait[priority])
+
+    def _weight(self, client: Optional[str]) -> float:
+        return max(float(self.client_weights.get(client, 1)), 1e-3) if client is not None else 1.0
+
+    def _limiter(self, backend: str, model: Optional[str] = None) -> AdaptiveLimiter:
+        with self._lock:
+            limiter = self._limiters.get((backend, model))
+            if limiter is None:
+                limit = max(1, self.backend_limits.get(backend, self.default_backend_limit))
+                limiter = AdaptiveLimiter(limit, max_limit=max(limit, self.max_backend_limit) if self.adaptive else limit)
+                self._limiters[(backend, model)] = limiter
+            return limiter
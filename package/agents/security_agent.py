@@ -1,16 +1,10 @@
-from langchain.prompts import PromptTemplate
 from .base import BaseReviewAgent
 
 class SecurityAgent(BaseReviewAgent):
     """Agent specialized in security vulnerability detection"""
     
-    def _create_prompt(self) -> PromptTemplate:
-        template = """You are a security expert reviewing code for vulnerabilities.
-
-Code to review:
-{code}
-
-{context}
+    def _get_instructions(self) -> str:
+        return """Act as a security expert and review the code above for vulnerabilities.
 
 Focus on:
 - SQL injection vulnerabilities
@@ -29,12 +23,6 @@ Format your response with:
 3. Provide a specific fix or mitigation
 
 Security Review:"""
-        
-        return PromptTemplate(
-            input_variables=["code", "context"],
-            template=template,
-            partial_variables={"context": ""}  # Default empty context
-        )
     
     def get_focus_areas(self) -> list:
         return [
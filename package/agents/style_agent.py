@@ -1,16 +1,10 @@
-from langchain.prompts import PromptTemplate
 from .base import BaseReviewAgent
 
 class StyleAgent(BaseReviewAgent):
     """Agent specialized in code style and best practices"""
     
-    def _create_prompt(self) -> PromptTemplate:
-        template = """You are a code quality expert reviewing code style and best practices.
-
-Code to review:
-{code}
-
-{context}
+    def _get_instructions(self) -> str:
+        return """Act as a code quality expert and review the code above for style and best practices.
 
 Focus on:
 - Code readability and clarity
@@ -29,12 +23,6 @@ For each issue:
 3. Show the improved approach
 
 Style Review:"""
-        
-        return PromptTemplate(
-            input_variables=["code", "context"],
-            template=template,
-            partial_variables={"context": ""}
-        )
     
     def get_focus_areas(self) -> list:
         return [
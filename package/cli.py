@@ -0,0 +1,135 @@
+"""Review a local directory from the command line.
+
+Walks the directory with the same filtering rules as uploads (but no file
+cap), reviews it with the orchestrator and writes one JSON line per file as
+its reviews complete, followed by a ``complete`` line with the repository
+summary.
+
+    python -m package.cli path/to/repo --workers 16 --output reviews.jsonl
+    python -m package.cli path/to/repo --output reviews.jsonl --resume
+
+The output file doubles as the checkpoint: with ``--resume``, files that
+already have a line are not reviewed again and new lines are appended. If a
+resumed output ends up with more than one ``complete`` line, the last one
+covers the whole run.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, IO, Tuple
+
+from .agents.orchestrator import ReviewOrchestrator
+from .config import MAX_WORKERS, REVIEW_MODES, REVIEW_MODE
+from .utils.file_processor import FileProcessor
+
+
+def load_checkpoint(path: str) -> Tuple[Dict[str, Any], int]:
+    """Per-file results already in ``path``, and the length of its intact part.
+
+    A line cut short by an interrupted write is not counted; the caller
+    truncates the file to the returned length before appending.
+    """
+    completed = {}
+    intact = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            intact += len(line)
+            if record.get("event") == "file":
+                completed[record["filepath"]] = record["result"]
+    return completed, intact
+
+
+def write_record(output: IO[str], record: Dict[str, Any]) -> None:
+    output.write(json.dumps(record, default=str) + "\n")
+    output.flush()
+
+
+def review_directory(root: str, output: IO[str], orchestrator: ReviewOrchestrator,
+                     completed: Dict[str, Any], mode: str, progress: bool = True) -> Dict[str, Any]:
+    """Review ``root``, writing each file's result to ``output``; returns the repository summary"""
+    processor = FileProcessor()
+    file_list = processor.directory_names(root)
+    finished = sum(1 for filepath in file_list if filepath in completed)
+    if completed and progress:
+        print(f"Resuming: {finished} of {len(file_list)} files already reviewed", file=sys.stderr)
+
+    start_time = time.time()
+    summary = {}
+    events = orchestrator.iter_review_repository(processor.iter_directory(root), completed=completed,
+                                                 mode=mode, file_list=file_list)
+    try:
+        for event in events:
+            if event["event"] == "file":
+                write_record(output, {"event": "file", "filepath": event["filepath"], "result": event["result"]})
+                finished += 1
+                if progress:
+                    print(f"[{finished}/{len(file_list)}] {event['filepath']} "
+                          f"({time.time() - start_time:.1f}s)", file=sys.stderr, flush=True)
+            elif event["event"] == "complete":
+                summary = event["repository_summary"]
+                write_record(output, {"event": "complete", "repository_summary": summary})
+    finally:
+        # Stops outstanding agent calls if we are interrupted
+        events.close()
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("directory", help="directory to review")
+    parser.add_argument("--output", "-o", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--resume", action="store_true", help="skip files already in --output and append to it")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="concurrent agent tasks")
+    parser.add_argument("--mode", choices=REVIEW_MODES, default=REVIEW_MODE)
+    parser.add_argument("--quiet", "-q", action="store_true", help="no per-file progress on stderr")
+    parser.add_argument("--verbose", "-v", action="store_true", help="log at INFO level")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} is not a directory")
+    if args.resume and args.output == "-":
+        parser.error("--resume needs --output")
+
+    completed = {}
+    if args.output == "-":
+        output = sys.stdout
+    elif args.resume and os.path.exists(args.output):
+        completed, intact = load_checkpoint(args.output)
+        with open(args.output, 'r+b') as f:
+            f.truncate(intact)
+        output = open(args.output, 'a', encoding='utf-8')
+    else:
+        output = open(args.output, 'w', encoding='utf-8')
+
+    orchestrator = ReviewOrchestrator(max_workers=args.workers)
+    try:
+        summary = review_directory(args.directory, output, orchestrator, completed,
+                                   args.mode, progress=not args.quiet)
+    except KeyboardInterrupt:
+        print("\nInterrupted; run again with --resume to continue", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        orchestrator.scheduler.shutdown(wait=False)
+        if output is not sys.stdout:
+            output.close()
+
+    if not args.quiet:
+        print(f"Reviewed {args.directory}: {summary.get('findings', 0)} findings, "
+              f"{len(summary.get('common_issues', []))} common issues, "
+              f"consistency {summary.get('consistency_score', 0.0)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
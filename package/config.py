@@ -1,13 +1,96 @@
 import os
+import tempfile
+
+
+def _parse_limits(value: str, cast=int) -> dict:
+    """Parse ``url=limit,url=limit`` into a dict"""
+    limits = {}
+    for item in value.split(','):
+        if '=' in item:
+            key, limit = item.rsplit('=', 1)
+            limits[key.strip()] = cast(limit.strip())
+    return limits
+
 
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "codellama:7b")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_HTTP_POOL_SIZE = int(os.getenv("OLLAMA_HTTP_POOL_SIZE", "16"))
+OLLAMA_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_HTTP_KEEPALIVE_EXPIRY", "60"))
+OLLAMA_BASE_URLS = [url.strip() for url in os.getenv("OLLAMA_BASE_URLS", OLLAMA_BASE_URL).split(",") if url.strip()]
+OLLAMA_HEALTH_CHECK_INTERVAL = float(os.getenv("OLLAMA_HEALTH_CHECK_INTERVAL", "15"))
+OLLAMA_MAX_ATTEMPTS = int(os.getenv("OLLAMA_MAX_ATTEMPTS", "2"))
+OLLAMA_FAILURE_THRESHOLD = int(os.getenv("OLLAMA_FAILURE_THRESHOLD", "3"))
 
-MAX_WORKERS = 3
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "8"))
 AGENT_TIMEOUT = 120
+REPOSITORY_TIMEOUT = float(os.getenv("REPOSITORY_TIMEOUT", "0")) or None
+REVIEW_MODES = ("separate", "fused")
+REVIEW_MODE = os.getenv("REVIEW_MODE", "separate")
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "False").lower() == "true"
+STRUCTURED_NUM_PREDICT = int(os.getenv("STRUCTURED_NUM_PREDICT", "400"))
+GENERATION_MAX_TOKENS = int(os.getenv("GENERATION_MAX_TOKENS", "1000"))
+# Enough for a short review of a few issues plus the completion marker
+GENERATION_MIN_TOKENS = int(os.getenv("GENERATION_MIN_TOKENS", "384"))
+ADAPTIVE_GENERATION = os.getenv("ADAPTIVE_GENERATION", "True").lower() == "true"
+# Per-agent models as ``agent=model,...`` (security, performance, style, fused);
+# agents not listed use OLLAMA_MODEL
+AGENT_MODELS = _parse_limits(os.getenv("AGENT_MODELS", ""), str)
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "False").lower() == "true"
+CASCADE_MODEL = os.getenv("CASCADE_MODEL", "qwen2.5-coder:1.5b")
+CASCADE_ESCALATION_SEVERITY = os.getenv("CASCADE_ESCALATION_SEVERITY", "high")
+CASCADE_MAX_ISSUES = int(os.getenv("CASCADE_MAX_ISSUES", "2"))
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", "0.6"))
+DEFAULT_BACKEND_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+BACKEND_CONCURRENCY = _parse_limits(os.getenv("OLLAMA_BACKEND_CONCURRENCY", ""))
+ADAPTIVE_CONCURRENCY = os.getenv("ADAPTIVE_CONCURRENCY", "True").lower() == "true"
+MAX_BACKEND_CONCURRENCY = int(os.getenv("OLLAMA_MAX_ADAPTIVE_CONCURRENCY", "16"))
+QUEUE_TIME_BUDGET = float(os.getenv("QUEUE_TIME_BUDGET", "30"))
+INTERACTIVE_RESERVED_WORKERS = int(os.getenv("INTERACTIVE_RESERVED_WORKERS", "1"))
+CLIENT_WEIGHTS = _parse_limits(os.getenv("CLIENT_WEIGHTS", ""), cast=float)
 
 MAX_FILE_SIZE = 1024 * 1024
 ALLOWED_EXTENSIONS = {'.py', '.js', '.java', '.cpp', '.c', '.go', '.rs', '.ts'}
 MAX_FILES_PER_UPLOAD = 50
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(50 * 1024 * 1024)))
+MAX_COMPRESSION_RATIO = int(os.getenv("MAX_COMPRESSION_RATIO", "100"))
+MAX_ARCHIVE_UNCOMPRESSED = int(os.getenv("MAX_ARCHIVE_UNCOMPRESSED", str(200 * 1024 * 1024)))
+UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", str(8 * 1024 * 1024)))
+MAX_INFLIGHT_FILES = int(os.getenv("MAX_INFLIGHT_FILES", "16"))
+
+CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "6000"))
+CHUNK_HEADER_MAX_CHARS = int(os.getenv("CHUNK_HEADER_MAX_CHARS", "1500"))
+DIFF_CONTEXT_LINES = int(os.getenv("DIFF_CONTEXT_LINES", "3"))
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "400"))
+CONTEXT_MAX_FILES = int(os.getenv("CONTEXT_MAX_FILES", "8"))
+CONTEXT_OUTLINE_CHARS = int(os.getenv("CONTEXT_OUTLINE_CHARS", "600"))
+
+TRIAGE_ENABLED = os.getenv("TRIAGE_ENABLED", "True").lower() == "true"
+TRIAGE_SHORT_NUM_PREDICT = int(os.getenv("TRIAGE_SHORT_NUM_PREDICT", "300"))
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "True").lower() == "true"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.9"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "5"))
+
+PATTERN_SIMILARITY_THRESHOLD = float(os.getenv("PATTERN_SIMILARITY_THRESHOLD", "0.5"))
+PATTERN_MAX_CLUSTERS = int(os.getenv("PATTERN_MAX_CLUSTERS", "1000"))
+PATTERN_MIN_FILES = int(os.getenv("PATTERN_MIN_FILES", "2"))
+PATTERN_HASH_BITS = int(os.getenv("PATTERN_HASH_BITS", "12"))
+
+REVIEW_CACHE_ENABLED = os.getenv("REVIEW_CACHE_ENABLED", "True").lower() == "true"
+REVIEW_CACHE_PATH = os.getenv("REVIEW_CACHE_PATH", os.path.join(tempfile.gettempdir(), "code_review_cache.sqlite3"))
+REVIEW_CACHE_MEMORY_ITEMS = int(os.getenv("REVIEW_CACHE_MEMORY_ITEMS", "256"))
+REVIEW_CACHE_MAX_ENTRIES = int(os.getenv("REVIEW_CACHE_MAX_ENTRIES", "10000"))
+REVIEW_CACHE_TTL = int(os.getenv("REVIEW_CACHE_TTL", str(7 * 24 * 3600)))
+
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "code_review_jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+RESULTS_PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", "25"))
+RESULTS_MAX_PAGE_SIZE = int(os.getenv("RESULTS_MAX_PAGE_SIZE", "200"))
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
 
 DEBUG = os.getenv("FLASK_DEBUG", "True").lower() == "true"
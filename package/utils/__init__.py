@@ -1,3 +1,13 @@
 from .file_processor import FileProcessor
+from .code_chunker import CodeChunker
+from .diff_processor import DiffProcessor
+from .review_cache import ReviewCache
+from .job_store import JobStore
+from .dependency_graph import DependencyGraph
+from .triage import StaticTriage
+from .dedup import DuplicateIndex
+from .context_builder import ContextBuilder
+from .pattern_analyzer import PatternAnalyzer
+from .metrics import MetricsRegistry, REGISTRY
 
-__all__ = ['FileProcessor']
+__all__ = ['FileProcessor', 'CodeChunker', 'DiffProcessor', 'ReviewCache', 'JobStore', 'DependencyGraph', 'StaticTriage', 'DuplicateIndex', 'ContextBuilder', 'PatternAnalyzer', 'MetricsRegistry', 'REGISTRY']
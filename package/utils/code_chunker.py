@@ -0,0 +1,292 @@
+import ast
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import CHUNK_MAX_CHARS, CHUNK_HEADER_MAX_CHARS
+
+BRACE_EXTENSIONS = {'.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs'}
+
+IMPORT_LINE = re.compile(r'^\s*(import\s|from\s+\S+\s+import\s|#include\s|using\s|use\s|package\s|const\s+\w+\s*=\s*require\()')
+LINE_REFERENCE = re.compile(r'\b(lines?\s+)(\d+)(\s*(?:-|–|to)\s*)?(\d+)?', re.IGNORECASE)
+LIST_ITEM = re.compile(r'^\s*(?:\d+[.)]|[-*•]|#+)\s')
+
+
+class CodeChunker:
+    """Split source files at function and class boundaries for map-reduce reviews"""
+    
+    def __init__(self, max_chars: int = CHUNK_MAX_CHARS,
+                 header_max_chars: int = CHUNK_HEADER_MAX_CHARS):
+        self.max_chars = max_chars
+        self.header_max_chars = header_max_chars
+    
+    def needs_chunking(self, code: str) -> bool:
+        return len(code) > self.max_chars
+    
+    def chunk(self, code: str, filepath: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return chunks as dicts with 1-based ``start_line``/``end_line`` and ``code``"""
+        lines = code.split('\n')
+        segments = self._segments(code, lines, filepath)
+        
+        chunks = []
+        current_start, current_end, current_size = None, None, 0
+        for start, end in segments:
+            size = self._size(lines, start, end)
+            
+            if size > self.max_chars:
+                if current_start is not None:
+                    chunks.append((current_start, current_end))
+                    current_start, current_size = None, 0
+                chunks.extend(self._split_lines(lines, start, end))
+                continue
+            
+            if current_start is not None and current_size + size > self.max_chars:
+                chunks.append((current_start, current_end))
+                current_start, current_size = None, 0
+            
+            if current_start is None:
+                current_start = start
+            current_end = end
+            current_size += size
+        
+        if current_start is not None:
+            chunks.append((current_start, current_end))
+        
+        return [
+            {
+                "start_line": start,
+                "end_line": end,
+                "code": '\n'.join(lines[start - 1:end])
+            }
+            for start, end in chunks
+        ]
+    
+    def regions(self, code: str, filepath: Optional[str] = None) -> List[Tuple[int, int]]:
+        """Function/class-level line ranges covering the file, each within ``max_chars``"""
+        lines = code.split('\n')
+        regions = []
+        for start, end in self._segments(code, lines, filepath):
+            if self._size(lines, start, end) > self.max_chars:
+                regions.extend(self._split_lines(lines, start, end))
+            else:
+                regions.append((start, end))
+        return regions
+    
+    def build_header(self, code: str, filepath: Optional[str] = None) -> str:
+        """Imports and top-level signatures shared by every chunk of a file"""
+        lines = code.split('\n')
+        header_lines = [line.rstrip() for line in lines if IMPORT_LINE.match(line)]
+        
+        tree = self._parse_python(code, filepath)
+        if tree is not None:
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    header_lines.append(lines[node.lineno - 1].rstrip())
+        else:
+            for start, _ in self._brace_segments(lines):
+                signature = lines[start - 1].rstrip()
+                if signature.strip() and not IMPORT_LINE.match(signature):
+                    header_lines.append(signature)
+        
+        header = '\n'.join(dict.fromkeys(header_lines))
+        if len(header) > self.header_max_chars:
+            header = header[:self.header_max_chars].rsplit('\n', 1)[0]
+        return header
+    
+    def _segments(self, code: str, lines: List[str],
+                  filepath: Optional[str]) -> List[Tuple[int, int]]:
+        tree = self._parse_python(code, filepath)
+        if tree is not None:
+            segments = self._python_segments(tree.body, 1, len(lines), lines)
+        elif self._is_brace_language(filepath, code):
+            segments = self._brace_segments(lines)
+        else:
+            segments = self._indent_segments(lines)
+        return segments or [(1, len(lines))]
+    
+    def _parse_python(self, code: str, filepath: Optional[str]) -> Optional[ast.Module]:
+        if filepath and os.path.splitext(filepath)[1] != '.py':
+            return None
+        try:
+            return ast.parse(code)
+        except (SyntaxError, ValueError):
+            return None
+    
+    def _python_segments(self, body: List[ast.stmt], first_line: int,
+                         last_line: int, lines: List[str]) -> List[Tuple[int, int]]:
+        """Contiguous line ranges covering ``first_line``..``last_line``, one per statement.
+        
+        Oversized classes are split further along their own body.
+        """
+        segments = []
+        cursor = first_line
+        for node in body:
+            start = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])])
+            end = getattr(node, 'end_lineno', None) or node.lineno
+            if start > cursor:
+                segments.append((cursor, start - 1))
+            
+            if isinstance(node, ast.ClassDef) and self._size(lines, start, end) > self.max_chars:
+                body_start = max(node.body[0].lineno, start + 1)
+                segments.append((start, body_start - 1))
+                segments.extend(self._python_segments(node.body, body_start, end, lines))
+            else:
+                segments.append((start, end))
+            cursor = end + 1
+        
+        if cursor <= last_line:
+            segments.append((cursor, last_line))
+        return [(start, end) for start, end in segments if start <= end]
+    
+    def _size(self, lines: List[str], start: int, end: int) -> int:
+        return sum(len(line) + 1 for line in lines[start - 1:end])
+    
+    def _is_brace_language(self, filepath: Optional[str], code: str) -> bool:
+        if filepath:
+            return os.path.splitext(filepath)[1] in BRACE_EXTENSIONS
+        return code.count('{') > code.count('\n') / 20
+    
+    def _brace_segments(self, lines: List[str]) -> List[Tuple[int, int]]:
+        """Top-level blocks found by tracking brace depth outside strings and comments"""
+        segments = []
+        depth = 0
+        start = 1
+        in_block_comment = False
+        
+        for number, line in enumerate(lines, 1):
+            stripped, in_block_comment = self._strip_literals(line, in_block_comment)
+            previous_depth = depth
+            depth = max(0, depth + stripped.count('{') - stripped.count('}'))
+            
+            # Top-level statements stay attached to the block that follows them
+            if depth == 0 and previous_depth > 0:
+                segments.append((start, number))
+                start = number + 1
+        
+        if start <= len(lines):
+            segments.append((start, len(lines)))
+        return segments
+    
+    def _strip_literals(self, line: str, in_block_comment: bool) -> Tuple[str, bool]:
+        result = []
+        i = 0
+        quote = None
+        while i < len(line):
+            pair = line[i:i + 2]
+            if in_block_comment:
+                if pair == '*/':
+                    in_block_comment = False
+                    i += 2
+                    continue
+            elif quote:
+                if line[i] == '\\':
+                    i += 2
+                    continue
+                if line[i] == quote:
+                    quote = None
+            elif pair == '//':
+                break
+            elif pair == '/*':
+                in_block_comment = True
+                i += 2
+                continue
+            elif line[i] in '"\'`':
+                quote = line[i]
+            else:
+                result.append(line[i])
+            i += 1
+        return ''.join(result), in_block_comment
+    
+    def _indent_segments(self, lines: List[str]) -> List[Tuple[int, int]]:
+        """Split at non-indented lines that follow an indented block"""
+        segments = []
+        start = 1
+        previous_indented = False
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            indented = line[0] in ' \t'
+            if not indented and previous_indented and number > start:
+                segments.append((start, number - 1))
+                start = number
+            previous_indented = indented
+        segments.append((start, len(lines)))
+        return segments
+    
+    def _split_lines(self, lines: List[str], start: int, end: int) -> List[Tuple[int, int]]:
+        pieces = []
+        piece_start, size = start, 0
+        for number in range(start, end + 1):
+            line_size = len(lines[number - 1]) + 1
+            if size and size + line_size > self.max_chars:
+                pieces.append((piece_start, number - 1))
+                piece_start, size = number, 0
+            size += line_size
+        pieces.append((piece_start, end))
+        return pieces
+
+
+def remap_line_references(text: str, offset: int) -> str:
+    """Shift ``line N`` / ``lines N-M`` mentions in chunk feedback by ``offset`` lines"""
+    if offset == 0:
+        return text
+    
+    def shift(match: re.Match) -> str:
+        first = str(int(match.group(2)) + offset)
+        if match.group(4) is None:
+            return f"{match.group(1)}{first}{match.group(3) or ''}"
+        return f"{match.group(1)}{first}{match.group(3)}{int(match.group(4)) + offset}"
+    
+    return LINE_REFERENCE.sub(shift, text)
+
+
+def remap_findings(findings: List[Dict[str, Any]], offset: int) -> List[Dict[str, Any]]:
+    """Shift the line ranges of structured findings by ``offset`` lines"""
+    if offset == 0:
+        return list(findings)
+    return [
+        dict(finding, **{key: finding[key] + offset for key in ("line_start", "line_end") if finding.get(key)})
+        for finding in findings
+    ]
+
+
+def split_feedback(text: str, regions: List[Tuple[int, int]]) -> Tuple[Dict[int, str], str]:
+    """Split feedback into the parts about each of ``regions`` (by index) and the rest.
+    
+    The text is cut into items at list markers and blank lines. An item goes
+    to the region holding the first line it mentions; items that mention no
+    line, or one outside every region, are returned as the rest.
+    """
+    items, current = [], []
+    for line in text.split('\n'):
+        if not line.strip() or LIST_ITEM.match(line):
+            if current:
+                items.append(current)
+            current = [line] if line.strip() else []
+        else:
+            current.append(line)
+    if current:
+        items.append(current)
+    
+    parts, rest = {}, []
+    for item in items:
+        item_text = '\n'.join(item)
+        match = LINE_REFERENCE.search(item_text)
+        line = int(match.group(2)) if match else None
+        index = next((i for i, (start, end) in enumerate(regions) if line and start <= line <= end), None)
+        if index is None:
+            rest.append(item_text)
+        else:
+            parts.setdefault(index, []).append(item_text)
+    return {index: '\n'.join(texts) for index, texts in parts.items()}, '\n'.join(rest)
+
+
+def format_line_ranges(line_numbers: List[int]) -> str:
+    """Render sorted line numbers compactly, e.g. ``3-5, 9``"""
+    ranges = []
+    for number in line_numbers:
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+    return ', '.join(f"{a}-{b}" if a != b else str(a) for a, b in ranges)
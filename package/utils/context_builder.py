@@ -0,0 +1,174 @@
+import keyword
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .code_chunker import CodeChunker, IMPORT_LINE
+from .dependency_graph import DependencyGraph, ModuleIndex, shared_prefix
+from ..config import CONTEXT_TOKEN_BUDGET, CONTEXT_MAX_FILES, CONTEXT_OUTLINE_CHARS
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt-token estimate; close enough for code and cheap to compute
+CHARS_PER_TOKEN = 4
+
+MAX_GRAPH_DEPTH = 3
+MAX_TERMS = 64
+LEXICAL_WEIGHT = 1.0
+PATH_WEIGHT = 0.05
+MIN_SCORE = 0.05
+
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]{2,}')
+STOP_WORDS = {word.lower() for word in keyword.kwlist} | {
+    'self', 'cls', 'this', 'const', 'let', 'var', 'function', 'return', 'export', 'default',
+    'new', 'null', 'undefined', 'true', 'false', 'none', 'async', 'await', 'typeof',
+    'instanceof', 'void', 'public', 'private', 'protected', 'static', 'string', 'int',
+    'str', 'dict', 'list', 'len', 'print', 'range', 'value', 'values', 'result', 'args', 'kwargs'
+}
+
+
+class ContextBuilder:
+    """Per-file related context for repository reviews, within a token budget.
+
+    Files are registered with ``add()`` as they are read; ``build()`` then ranks
+    the other files for one file by import-graph distance and identifier
+    overlap and returns the signatures of the best ones, most relevant first,
+    stopping at ``token_budget`` estimated tokens. Prompt size therefore stays
+    flat per file however large the repository grows.
+    """
+
+    def __init__(self, file_list: Iterable[str], token_budget: int = CONTEXT_TOKEN_BUDGET,
+                 max_files: int = CONTEXT_MAX_FILES, outline_chars: int = CONTEXT_OUTLINE_CHARS,
+                 chunker: Optional[CodeChunker] = None):
+        self.file_list = list(file_list)
+        self.token_budget = token_budget
+        self.max_files = max_files
+        self.outline_chars = outline_chars
+        self.chunker = chunker or CodeChunker()
+
+        self._resolver = ModuleIndex(self.file_list)
+        self._dependencies: Dict[str, List[str]] = {}
+        self._neighbours: Dict[str, Set[str]] = {}
+        self._outlines: Dict[str, str] = {}
+        self._terms: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, List[str]] = {}
+
+    def add(self, filepath: str, code: str) -> None:
+        """Record a file's imports, outline and identifiers"""
+        if filepath in self._terms:
+            return
+
+        dependencies = self._dependencies[filepath] = []
+        for _, targets in self._resolver.resolve_all(filepath, code):
+            for target in targets:
+                if target != filepath and target not in dependencies:
+                    dependencies.append(target)
+                    self._neighbours.setdefault(filepath, set()).add(target)
+                    self._neighbours.setdefault(target, set()).add(filepath)
+
+        outline = self._outline(filepath, code)
+        if outline:
+            self._outlines[filepath] = outline
+
+        terms = self._extract_terms(code)
+        self._terms[filepath] = terms
+        for term in terms:
+            self._postings.setdefault(term, []).append(filepath)
+
+    def build(self, filepath: str, code: Optional[str] = None) -> Dict[str, Any]:
+        """``related_files`` and ``related_context`` entries for ``filepath``'s review context"""
+        if code is not None:
+            self.add(filepath, code)
+        if self.token_budget <= 0 or self.max_files <= 0:
+            return {}
+
+        related = self.rank(filepath)[:self.max_files * 2]
+        if not related:
+            return {}
+
+        budget = self.token_budget * CHARS_PER_TOKEN
+        sections = []
+        names = []
+        included = set()
+        for path, _ in related:
+            heading = f"{path}:"
+            if len(names) >= self.max_files or len(heading) > budget:
+                break
+            outline = self._outlines.get(path, "")
+            # Copies of a file already shown add nothing but their name
+            if outline in included:
+                continue
+            if outline:
+                included.add(outline)
+            room = budget - len(heading) - 1
+            if outline and len(outline) > room:
+                outline = outline[:room].rsplit('\n', 1)[0] if '\n' in outline[:room] else ""
+            section = f"{heading}\n{outline}" if outline else heading
+            sections.append(section)
+            names.append(path)
+            budget -= len(section) + 1
+
+        return {"related_files": names, "related_context": "\n".join(sections)}
+
+    def graph(self) -> DependencyGraph:
+        """Import graph of the files added so far"""
+        return DependencyGraph({filepath: list(dependencies) for filepath, dependencies in self._dependencies.items()})
+
+    def rank(self, filepath: str) -> List[Tuple[str, float]]:
+        """Other files as ``(path, score)``, best first; unrelated files are left out"""
+        scores: Dict[str, float] = {}
+        for path, distance in self._distances(filepath).items():
+            scores[path] = 1.0 / distance
+
+        terms = self._terms.get(filepath, set())
+        common_limit = max(20, len(self._terms) // 10)
+        overlaps = Counter()
+        for term in terms:
+            posting = self._postings.get(term, ())
+            # Identifiers found in a large share of the repository say little about relevance
+            if len(posting) <= common_limit:
+                overlaps.update(posting)
+        for path, overlap in overlaps.items():
+            if path == filepath:
+                continue
+            similarity = overlap / (len(terms) + len(self._terms[path]) - overlap)
+            scores[path] = scores.get(path, 0.0) + LEXICAL_WEIGHT * similarity
+
+        directory = filepath.split('/')[:-1]
+        for path in scores:
+            other = path.split('/')[:-1]
+            scores[path] += PATH_WEIGHT * shared_prefix(directory, other) / max(1, len(directory), len(other))
+
+        ranked = [(path, score) for path, score in scores.items() if score >= MIN_SCORE]
+        return sorted(ranked, key=lambda item: (-item[1], item[0]))
+
+    def _distances(self, filepath: str) -> Dict[str, int]:
+        seen = {filepath: 0}
+        frontier = [filepath]
+        for depth in range(1, MAX_GRAPH_DEPTH + 1):
+            next_frontier = []
+            for current in frontier:
+                for neighbour in self._neighbours.get(current, ()):
+                    if neighbour not in seen:
+                        seen[neighbour] = depth
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        del seen[filepath]
+        return seen
+
+    def _outline(self, filepath: str, code: str) -> str:
+        """Top-level signatures, without imports"""
+        header = self.chunker.build_header(code, filepath)
+        lines = [line for line in header.split('\n') if line.strip() and not IMPORT_LINE.match(line)]
+        outline = '\n'.join(lines)
+        if len(outline) > self.outline_chars:
+            outline = outline[:self.outline_chars].rsplit('\n', 1)[0]
+        return outline
+
+    def _extract_terms(self, code: str) -> Set[str]:
+        counts = Counter(
+            word for word in (match.lower() for match in IDENTIFIER.findall(code))
+            if word not in STOP_WORDS
+        )
+        return {term for term, _ in counts.most_common(MAX_TERMS)}
@@ -0,0 +1,130 @@
+import hashlib
+import re
+import zlib
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_SHINGLE_SIZE
+
+logger = logging.getLogger(__name__)
+
+COMMENTS = re.compile(r'/\*.*?\*/|//[^\n]*|#[^\n]*', re.DOTALL)
+TOKEN = re.compile(r'\w+|[^\w\s]')
+
+# Largest prime below 2**32; with 32-bit shingle hashes and coefficients the
+# universal hash (a * x + b) % PRIME never overflows uint64.
+PRIME = np.uint64(4294967291)
+# Shingles hashed per step, bounding the (num_perm x block) working array
+SIGNATURE_BLOCK = 4096
+
+
+class DuplicateIndex:
+    """Online exact and near-duplicate detection for repository files.
+
+    Files are offered one at a time with ``match``. The first file of each
+    cluster becomes its representative; later files that are byte-identical,
+    or whose MinHash similarity over normalized token shingles reaches
+    ``threshold``, are reported as duplicates of it. Candidates come from
+    banded LSH buckets, so each lookup only compares against likely matches.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM,
+                 bands: int = DEDUP_BANDS, shingle_size: int = DEDUP_SHINGLE_SIZE,
+                 min_shingles: int = 20):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, int(PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(PRIME), size=num_perm, dtype=np.uint64)
+
+        self._exact: Dict[str, str] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self._token_ids: Dict[str, int] = {}
+        self.clusters: Dict[str, List[str]] = {}
+
+    def match(self, filepath: str, code: str) -> Optional[Dict[str, Any]]:
+        """Return ``{"filepath", "similarity", "exact"}`` for the representative
+        ``filepath`` duplicates, or None after registering it as a new one.
+        """
+        digest = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        representative = self._exact.get(digest)
+        if representative is not None:
+            return self._add_duplicate(filepath, representative, 1.0, True)
+
+        signature = self._signature(code)
+        if signature is not None:
+            best, best_similarity = None, 0.0
+            for candidate in self._candidates(signature):
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+            if best is not None and best_similarity >= self.threshold:
+                return self._add_duplicate(filepath, best, round(best_similarity, 3), False)
+
+        self._exact[digest] = filepath
+        self.clusters[filepath] = []
+        if signature is not None:
+            self._signatures[filepath] = signature
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, []).append(filepath)
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        clusters = {rep: members for rep, members in self.clusters.items() if members}
+        return {
+            "clusters": clusters,
+            "duplicates": sum(len(members) for members in clusters.values())
+        }
+
+    def _add_duplicate(self, filepath: str, representative: str, similarity: float,
+                       exact: bool) -> Dict[str, Any]:
+        self.clusters[representative].append(filepath)
+        logger.info(f"{filepath} duplicates {representative} (similarity {similarity})")
+        return {"filepath": representative, "similarity": similarity, "exact": exact}
+
+    def _candidates(self, signature: np.ndarray) -> List[str]:
+        seen = []
+        for band, key in enumerate(self._band_keys(signature)):
+            for candidate in self._buckets[band].get(key, []):
+                if candidate not in seen:
+                    seen.append(candidate)
+        return seen
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _signature(self, code: str) -> Optional[np.ndarray]:
+        """MinHash signature of the file's token shingles, or None for files too small to compare"""
+        tokens = TOKEN.findall(COMMENTS.sub(' ', code))
+        if len(tokens) < self.shingle_size + self.min_shingles:
+            return None
+
+        ids = np.fromiter((self._token_id(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+        shingles = np.zeros(len(ids) - self.shingle_size + 1, dtype=np.uint64)
+        for offset in range(self.shingle_size):
+            # Polynomial combination of the k token ids, kept to 32 bits
+            shingles = (shingles * np.uint64(1000003) + ids[offset:offset + len(shingles)]) & np.uint64(0xFFFFFFFF)
+        shingles = np.unique(shingles)
+
+        signature = np.full(len(self._a), PRIME, dtype=np.uint64)
+        for start in range(0, len(shingles), SIGNATURE_BLOCK):
+            block = shingles[start:start + SIGNATURE_BLOCK]
+            hashed = (np.outer(self._a, block) + self._b[:, None]) % PRIME
+            np.minimum(signature, hashed.min(axis=1), out=signature)
+        return signature
+
+    def _token_id(self, token: str) -> int:
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            token_id = zlib.crc32(token.encode('utf-8'))
+            self._token_ids[token] = token_id
+        return token_id
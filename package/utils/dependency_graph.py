@@ -0,0 +1,338 @@
+import ast
+import posixpath
+import re
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+PYTHON_EXTENSIONS = ('.py',)
+SCRIPT_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs')
+
+# A complete import statement, including parenthesised and backslash
+# continuations; only these are handed to ast.
+PY_IMPORT = re.compile(
+    r'^[ \t]*(?:from[ \t]+[\w.]+[ \t]+import[ \t]*\([^)]*\)'
+    r'|(?:from[ \t]+[\w.]+[ \t]+)?import[ \t]+\w(?:[^\n\\]|\\.)*)',
+    re.MULTILINE | re.DOTALL
+)
+
+# One pass over the source: comments and plain string literals are matched
+# (and skipped) alongside the import forms, so import-like text inside a
+# comment or string is never mistaken for an import.
+JS_TOKEN = re.compile(
+    # Cheap first-character check so most positions are rejected immediately
+    r'(?=[/"\'`ier])(?:'
+    r'//[^\n]*'
+    r'|/\*.*?\*/'
+    r'|(?<![\w$.])(?:'
+    r'(?:import|export)\s+(?:type\s+)?(?:[\w*{}\s,$]+?\s+from\s*)?'
+    r'|require\s*\(\s*'
+    r'|import\s*\(\s*'
+    r')(?P<quote>[\'"])(?P<specifier>[^\'"\n]+)(?P=quote)'
+    r'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`'
+    r')',
+    re.DOTALL
+)
+
+class DependencyGraph(Mapping[str, List[str]]):
+    """File-level import graph of a repository.
+
+    Behaves as a read-only ``{filepath: [dependency filepaths]}`` mapping and
+    additionally keeps reverse edges, unresolved (external) imports and a
+    topological order. Build it with ``DependencyGraph.build(files)``.
+    """
+
+    def __init__(self, edges: Dict[str, List[str]], external: Optional[Dict[str, List[str]]] = None):
+        self._edges = edges
+        self._external = external or {}
+        self._reverse: Dict[str, List[str]] = {filepath: [] for filepath in edges}
+        for filepath, dependencies in edges.items():
+            for dependency in dependencies:
+                self._reverse.setdefault(dependency, []).append(filepath)
+
+    @classmethod
+    def build(cls, files: Mapping[str, str]) -> 'DependencyGraph':
+        resolver = ModuleIndex(files.keys())
+        edges = {}
+        external = {}
+
+        for filepath, content in files.items():
+            dependencies = []
+            unresolved = []
+            for specifier, targets in resolver.resolve_all(filepath, content):
+                if not targets:
+                    unresolved.append(specifier)
+                for target in targets:
+                    if target != filepath and target not in dependencies:
+                        dependencies.append(target)
+            edges[filepath] = dependencies
+            if unresolved:
+                external[filepath] = sorted(set(unresolved))
+
+        return cls(edges, external)
+
+    def __getitem__(self, filepath: str) -> List[str]:
+        return self._edges[filepath]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._edges)
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def dependencies(self, filepath: str) -> List[str]:
+        return list(self._edges.get(filepath, []))
+
+    def dependents(self, filepath: str) -> List[str]:
+        return list(self._reverse.get(filepath, []))
+
+    def external_imports(self, filepath: str) -> List[str]:
+        return list(self._external.get(filepath, []))
+
+    def topological_order(self) -> List[str]:
+        """Files ordered so that dependencies come before their dependents.
+
+        Files on an import cycle cannot be ordered; they are appended at the
+        end in their original order.
+        """
+        pending = {filepath: len(dependencies) for filepath, dependencies in self._edges.items()}
+        ready = deque(filepath for filepath, count in pending.items() if count == 0)
+        order = []
+
+        while ready:
+            filepath = ready.popleft()
+            order.append(filepath)
+            for dependent in self._reverse.get(filepath, []):
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) < len(self._edges):
+            placed = set(order)
+            order.extend(filepath for filepath in self._edges if filepath not in placed)
+        return order
+
+    def cycles(self) -> List[List[str]]:
+        """Groups of files that import each other, directly or indirectly.
+
+        These are the strongly connected components with more than one file,
+        found with an iterative Tarjan's algorithm.
+        """
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        components = []
+
+        for root in self._edges:
+            if root in index:
+                continue
+            work = [(root, iter(self._edges.get(root, [])))]
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                filepath, dependencies = work[-1]
+                dependency = next(dependencies, None)
+                if dependency is not None:
+                    if dependency not in index:
+                        index[dependency] = lowlink[dependency] = len(index)
+                        stack.append(dependency)
+                        on_stack.add(dependency)
+                        work.append((dependency, iter(self._edges.get(dependency, []))))
+                    elif dependency in on_stack:
+                        lowlink[filepath] = min(lowlink[filepath], index[dependency])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[filepath])
+                if lowlink[filepath] == index[filepath]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == filepath:
+                            break
+                    if len(component) > 1:
+                        components.append(sorted(component))
+
+        return components
+
+    def distances(self, filepath: str, max_depth: Optional[int] = None) -> Dict[str, int]:
+        """Hop distance from ``filepath`` to every file reachable along either edge direction"""
+        seen = {filepath: 0}
+        frontier = deque([filepath])
+
+        while frontier:
+            current = frontier.popleft()
+            depth = seen[current]
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for neighbour in self._edges.get(current, []) + self._reverse.get(current, []):
+                if neighbour not in seen:
+                    seen[neighbour] = depth + 1
+                    frontier.append(neighbour)
+
+        del seen[filepath]
+        return seen
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {filepath: list(dependencies) for filepath, dependencies in self._edges.items()}
+
+
+class ModuleIndex:
+    """Resolves import specifiers to repository paths.
+
+    Python modules are indexed under every dotted suffix of their path, so
+    ``repo/src/pkg/mod.py`` answers to ``pkg.mod`` regardless of which
+    directory the archive was rooted at. Ties go to the candidate sharing
+    the longest directory prefix with the importing file.
+    """
+
+    def __init__(self, filepaths):
+        self.paths: Set[str] = set()
+        self.modules: Dict[str, List[str]] = {}
+
+        for filepath in filepaths:
+            self.paths.add(filepath)
+            if not filepath.endswith(PYTHON_EXTENSIONS):
+                continue
+
+            parts = filepath[:-3].split('/')
+            if parts[-1] == '__init__':
+                parts = parts[:-1]
+            for start in range(len(parts)):
+                self.modules.setdefault('.'.join(parts[start:]), []).append(filepath)
+
+    def resolve_all(self, filepath: str, content: str) -> Iterator[Tuple[str, List[str]]]:
+        """Yield ``(specifier, paths)`` per import; ``paths`` is empty for imports outside the repository"""
+        if filepath.endswith(PYTHON_EXTENSIONS):
+            for level, module, names in python_imports(content):
+                yield '.' * level + module, self._resolve_python(filepath, level, module, names)
+        elif filepath.endswith(SCRIPT_EXTENSIONS):
+            for specifier in script_imports(content):
+                target = self._resolve_script(filepath, specifier)
+                yield specifier, [target] if target else []
+
+    def _resolve_python(self, filepath: str, level: int, module: str, names: Tuple[str, ...]) -> List[str]:
+        """Submodules named in a ``from`` import win over the package they are imported from"""
+        if level:
+            base = posixpath.dirname(filepath)
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            prefix = posixpath.join(base, *module.split('.')) if module else base
+            found = [path for path in (self._python_path(posixpath.join(prefix, name)) for name in names) if path]
+            if not found and self._python_path(prefix):
+                found = [self._python_path(prefix)]
+            return found
+
+        found = [path for path in (self._lookup(f"{module}.{name}", filepath) for name in names) if path]
+        if found:
+            return found
+
+        parts = module.split('.')
+        for end in range(len(parts), 0, -1):
+            path = self._lookup('.'.join(parts[:end]), filepath)
+            if path:
+                return [path]
+        return []
+
+    def _python_path(self, stem: str) -> Optional[str]:
+        for candidate in (stem + '.py', stem + '/__init__.py'):
+            if candidate in self.paths:
+                return candidate
+        return None
+
+    def _lookup(self, module: str, filepath: str) -> Optional[str]:
+        candidates = self.modules.get(module)
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        directory = filepath.split('/')[:-1]
+        return max(candidates, key=lambda candidate: shared_prefix(directory, candidate.split('/')[:-1]))
+
+    def _resolve_script(self, filepath: str, specifier: str) -> Optional[str]:
+        if not specifier.startswith('.'):
+            return None
+
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(filepath), specifier))
+        stem, ext = posixpath.splitext(target)
+        candidates = [target]
+        if ext in ('.js', '.jsx', '.mjs', '.cjs'):
+            # TypeScript sources are imported with the extension of their compiled output
+            candidates.extend(stem + alternative for alternative in ('.ts', '.tsx'))
+        candidates.extend(target + extension for extension in SCRIPT_EXTENSIONS)
+        candidates.extend(f"{target}/index{extension}" for extension in SCRIPT_EXTENSIONS)
+
+        for candidate in candidates:
+            if candidate in self.paths:
+                return candidate
+        return None
+
+
+def shared_prefix(left: List[str], right: List[str]) -> int:
+    """Number of leading path components ``left`` and ``right`` have in common"""
+    shared = 0
+    for a, b in zip(left, right):
+        if a != b:
+            break
+        shared += 1
+    return shared
+
+
+def python_imports(content: str) -> List[Tuple[int, str, Tuple[str, ...]]]:
+    """``(level, module, imported names)`` for each import statement in Python source.
+
+    Only the import statements themselves are parsed, which keeps this fast on
+    large files and tolerant of syntax errors elsewhere in the module.
+    """
+    statements = []
+    position = content.find('import')
+    while position != -1:
+        # Jump between occurrences of "import" and only run the statement
+        # pattern from the start of those lines, instead of scanning every line.
+        line_start = content.rfind('\n', 0, position) + 1
+        match = PY_IMPORT.match(content, line_start)
+        if match and match.end() > position:
+            statements.append(match.group().strip())
+            position = content.find('import', match.end())
+        else:
+            position = content.find('import', position + 6)
+
+    imports = []
+    for statement in statements:
+        imports.extend(_parse_import(statement))
+    return imports
+
+
+@lru_cache(maxsize=16384)
+def _parse_import(statement: str) -> Tuple[Tuple[int, str, Tuple[str, ...]], ...]:
+    """Parse one import statement; cached since the same lines recur across a repository"""
+    try:
+        nodes = ast.parse(statement).body
+    except SyntaxError:
+        return ()
+
+    imports = []
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            imports.extend((0, alias.name, ()) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            names = tuple(alias.name for alias in node.names if alias.name != '*')
+            imports.append((node.level, node.module or '', names))
+    return tuple(imports)
+
+
+def script_imports(content: str) -> List[str]:
+    """Module specifiers from ES ``import``/``export ... from``, dynamic ``import()`` and ``require()``"""
+    if 'import' not in content and 'require' not in content:
+        return []
+    return [match.group('specifier') for match in JS_TOKEN.finditer(content) if match.group('specifier')]
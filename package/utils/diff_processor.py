@@ -0,0 +1,138 @@
+import difflib
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+class DiffProcessor:
+    """Parse unified diffs and map line numbers between a base and head version"""
+    
+    def parse_unified_diff(self, diff: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Return hunks per target path; a bare hunk list without headers maps to ``""``.
+        
+        Each hunk takes exactly the body lines its header counts. An empty
+        line within them is a blank context line whose leading space was
+        lost; ``\\ No newline at end of file`` markers are recorded on the
+        hunk as ``base_no_newline``/``head_no_newline``.
+        """
+        files: Dict[str, List[Dict[str, Any]]] = {}
+        current_path = ""
+        hunk = None
+        old_left = new_left = 0
+        
+        for line in diff.split('\n'):
+            if hunk is not None and (old_left > 0 or new_left > 0) and not line.startswith('\\'):
+                marker = line[:1] or ' '
+                if marker not in (' ', '+', '-'):
+                    raise ValueError(f"Malformed hunk at line {hunk['old_start']}: {line!r}")
+                hunk["lines"].append(marker + line[1:])
+                old_left -= marker != '+'
+                new_left -= marker != '-'
+                continue
+            if hunk is not None and line.startswith('\\') and hunk["lines"]:
+                marker = hunk["lines"][-1][:1]
+                if marker in (' ', '-'):
+                    hunk["base_no_newline"] = True
+                if marker in (' ', '+'):
+                    hunk["head_no_newline"] = True
+                continue
+            
+            if line.startswith('+++ '):
+                current_path = self._strip_path(line[4:])
+                files.setdefault(current_path, [])
+                hunk = None
+                continue
+            if line.startswith('--- ') or line.startswith('diff ') or line.startswith('index '):
+                hunk = None
+                continue
+            
+            match = HUNK_HEADER.match(line)
+            if match:
+                hunk = {
+                    "old_start": int(match.group(1)),
+                    "old_count": int(match.group(2) if match.group(2) is not None else 1),
+                    "new_start": int(match.group(3)),
+                    "new_count": int(match.group(4) if match.group(4) is not None else 1),
+                    "lines": []
+                }
+                old_left, new_left = hunk["old_count"], hunk["new_count"]
+                files.setdefault(current_path, []).append(hunk)
+        
+        return files
+    
+    def apply_patch(self, base: str, hunks: List[Dict[str, Any]]) -> str:
+        """Apply one file's hunks to ``base`` and return the head version"""
+        base_lines = base.split('\n') if base else []
+        head_newline = base.endswith('\n') or not base
+        if base_lines and base_lines[-1] == '':
+            base_lines.pop()
+        head_lines: List[str] = []
+        cursor = 0
+        
+        for hunk in sorted(hunks, key=lambda h: h["old_start"]):
+            # Only a hunk reaching the end of the file carries these markers
+            if hunk.get("head_no_newline"):
+                head_newline = False
+            elif hunk.get("base_no_newline"):
+                head_newline = True
+            start = max(0, hunk["old_start"] - 1 if hunk["old_count"] else hunk["old_start"])
+            if start < cursor:
+                raise ValueError(f"Overlapping hunk at line {hunk['old_start']}")
+            head_lines.extend(base_lines[cursor:start])
+            cursor = start
+            
+            for line in hunk["lines"]:
+                marker, text = line[:1], line[1:]
+                if marker in (' ', '-'):
+                    if cursor >= len(base_lines) or base_lines[cursor] != text:
+                        raise ValueError(f"Diff does not apply at base line {cursor + 1}")
+                    cursor += 1
+                    if marker == ' ':
+                        head_lines.append(text)
+                elif marker == '+':
+                    head_lines.append(text)
+        
+        head_lines.extend(base_lines[cursor:])
+        return '\n'.join(head_lines) + ('\n' if head_newline and head_lines else '')
+    
+    def compare(self, base: str, head: str) -> Dict[str, Any]:
+        """Changed head lines plus a base -> head map for lines that did not change"""
+        base_lines = base.split('\n')
+        head_lines = head.split('\n')
+        matcher = difflib.SequenceMatcher(None, base_lines, head_lines, autojunk=False)
+        
+        changed: Set[int] = set()
+        line_map: Dict[int, int] = {}
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                for offset in range(i2 - i1):
+                    line_map[i1 + offset + 1] = j1 + offset + 1
+            elif j2 > j1:
+                changed.update(range(j1 + 1, j2 + 1))
+            else:
+                # Pure deletion: flag the head lines on either side of the gap
+                changed.update(n for n in (j1, j1 + 1) if 1 <= n <= len(head_lines))
+        
+        return {
+            "changed_lines": changed,
+            "line_map": line_map,
+            "base_lines": len(base_lines),
+            "head_lines": len(head_lines)
+        }
+    
+    def map_range(self, line_map: Dict[int, int], start: int,
+                  end: int) -> Optional[Tuple[int, int]]:
+        """Head range for an unchanged base range, or None if any line in it changed"""
+        mapped = [line_map.get(n) for n in range(start, end + 1)]
+        if any(n is None for n in mapped):
+            return None
+        if mapped[-1] - mapped[0] != end - start:
+            return None
+        return mapped[0], mapped[-1]
+    
+    def _strip_path(self, path: str) -> str:
+        path = path.split('\t')[0].strip()
+        if path.startswith('a/') or path.startswith('b/'):
+            path = path[2:]
+        return path
@@ -1,53 +1,306 @@
+import bz2
+import gzip
+import lzma
 import os
+import shutil
+import tarfile
 import zipfile
 import tempfile
-from typing import Any, Dict, List, Optional
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
 import logging
 
-from ..config import ALLOWED_EXTENSIONS, MAX_FILES_PER_UPLOAD, MAX_FILE_SIZE
+from ..config import (
+    ALLOWED_EXTENSIONS, MAX_FILES_PER_UPLOAD, MAX_FILE_SIZE, MAX_COMPRESSION_RATIO,
+    MAX_ARCHIVE_UNCOMPRESSED, UPLOAD_SPOOL_MAX_MEMORY
+)
+from .metrics import ARCHIVE_SECONDS, ARCHIVE_BYTES, ARCHIVE_FILES
+from .dependency_graph import (
+    DependencyGraph, PYTHON_EXTENSIONS, SCRIPT_EXTENSIONS, python_imports, script_imports
+)
 
 logger = logging.getLogger(__name__)
 
+ARCHIVE_EXTENSIONS = ('.zip', '.tar.gz', '.tgz', '.tar')
+
+# Compressed tar streams by magic bytes
+TAR_COMPRESSIONS = (
+    (b'\x1f\x8b', lambda stream: gzip.GzipFile(fileobj=stream, mode='rb')),
+    (b'BZh', bz2.BZ2File),
+    (b'\xfd7zXZ\x00', lzma.LZMAFile)
+)
+# The whole-archive compression ratio is only checked past this many
+# decompressed bytes, since tiny archives compress unevenly
+RATIO_CHECK_MIN_BYTES = 1024 * 1024
+
+
+class ArchiveLimitExceeded(Exception):
+    pass
+
+
+class _BoundedReader:
+    """Decompressed view of a tar stream that stops at the archive limits.
+    
+    Tar streams are decompressed as a whole, including members that are
+    skipped, so the cap on decompressed bytes and on the overall
+    compression ratio is applied here rather than per member.
+    """
+    
+    def __init__(self, stream: BinaryIO):
+        self.source = stream
+        self.start = stream.tell()
+        self.raw = stream
+        magic = stream.read(6)
+        stream.seek(self.start)
+        for prefix, opener in TAR_COMPRESSIONS:
+            if magic.startswith(prefix):
+                self.raw = opener(stream)
+                break
+        self.compressed = self.raw is not stream
+        self.size = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        try:
+            data = self.raw.read(size)
+        except (OSError, EOFError, zlib.error, lzma.LZMAError):
+            raise tarfile.ReadError("invalid compressed data")
+        self.size += len(data)
+        if self.size > MAX_ARCHIVE_UNCOMPRESSED:
+            raise ArchiveLimitExceeded(f"archive exceeds {MAX_ARCHIVE_UNCOMPRESSED} bytes uncompressed")
+        if self.compressed and self.size > RATIO_CHECK_MIN_BYTES:
+            ratio = self.size / max(self.source.tell() - self.start, 1)
+            if ratio > MAX_COMPRESSION_RATIO:
+                raise ArchiveLimitExceeded(f"compression ratio exceeds {MAX_COMPRESSION_RATIO}")
+        return data
+
+
 class FileProcessor:
     
     def extract_zip(self, zip_path: str) -> Dict[str, str]:
-        files = {}
+        with open(zip_path, 'rb') as stream:
+            files = dict(self.iter_archive(stream, zip_path))
+        
+        logger.info(f"Extracted {len(files)} files from ZIP")
+        return files
+    
+    def is_archive(self, filename: str) -> bool:
+        return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+    
+    def spool(self, stream: BinaryIO, copy: bool = False) -> BinaryIO:
+        """Return a seekable handle on ``stream``, copying it to a spooled file if needed.
         
+        The copy stays in memory up to UPLOAD_SPOOL_MAX_MEMORY and then rolls
+        over to disk. Pass ``copy=True`` when the result must outlive ``stream``.
+        """
+        if not copy and getattr(stream, 'seekable', lambda: False)():
+            stream.seek(0)
+            return stream
+        
+        spooled = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_MEMORY)
+        shutil.copyfileobj(stream, spooled, 1024 * 1024)
+        spooled.seek(0)
+        return spooled
+    
+    def archive_names(self, stream: BinaryIO, filename: str,
+                      max_files: Optional[int] = MAX_FILES_PER_UPLOAD) -> List[str]:
+        """Names of the members ``iter_archive`` will yield, read from headers only"""
+        stream = self.spool(stream)
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                file_list = zip_ref.namelist()
-                
-                valid_files = self._filter_valid_files(file_list)
-                
-                if len(valid_files) > MAX_FILES_PER_UPLOAD:
-                    logger.warning(f"Limiting to first {MAX_FILES_PER_UPLOAD} files")
-                    valid_files = valid_files[:MAX_FILES_PER_UPLOAD]
-                
-                for filepath in valid_files:
+            if self._is_zip(stream, filename):
+                with zipfile.ZipFile(stream) as archive:
+                    members = [(info.filename, info.file_size, info.compress_size)
+                               for info in archive.infolist() if not info.is_dir()]
+            else:
+                members = []
+                with self._open_tar(stream) as archive:
                     try:
-                        with zip_ref.open(filepath) as f:
-                            content = f.read()
-                            
-                            if len(content) > MAX_FILE_SIZE:
-                                logger.warning(f"Skipping {filepath}: file too large")
-                                continue
-                            
-                            files[filepath] = content.decode('utf-8', errors='ignore')
-                            
-                    except Exception as e:
-                        logger.error(f"Error reading {filepath}: {str(e)}")
-                        continue
+                        members.extend((info.name, info.size, None) for info in archive if info.isfile())
+                    except ArchiveLimitExceeded as e:
+                        logger.warning(f"Stopping listing: {str(e)}")
+        except (zipfile.BadZipFile, tarfile.TarError):
+            raise ValueError("Invalid archive format")
+        finally:
+            stream.seek(0)
+        
+        names = [name for name, size, compressed in members
+                 if self._filter_valid_files([name]) and self._accept_member(name, size, compressed)]
+        return names[:max_files] if max_files is not None else names
+    
+    def iter_archive(self, stream: BinaryIO, filename: str,
+                     max_files: Optional[int] = MAX_FILES_PER_UPLOAD) -> Iterator[Tuple[str, str]]:
+        """Yield ``(path, content)`` for valid members of a ZIP or tar(.gz) archive.
+        
+        Members are decoded one at a time. Oversized or suspiciously compressed
+        members are skipped from their headers before any decompression, and
+        the total decompressed size is capped at MAX_ARCHIVE_UNCOMPRESSED.
+        ``max_files`` counts the same members ``archive_names`` lists, whether
+        or not they could be read.
+        """
+        # Only time spent inside this generator counts as extraction time,
+        # not the time the consumer spends between members.
+        resumed = time.time()
+        spent = 0.0
+        try:
+            stream = self.spool(stream)
+            if self._is_zip(stream, filename):
+                members = self._iter_zip(stream)
+            else:
+                members = self._iter_tar(stream)
+            
+            count = 0
+            total_size = 0
+            for filepath, content in members:
+                count += 1
+                if content is None:
+                    if max_files is not None and count >= max_files:
+                        break
+                    continue
+                total_size += len(content)
+                if total_size > MAX_ARCHIVE_UNCOMPRESSED:
+                    logger.warning(f"Stopping extraction: archive exceeds {MAX_ARCHIVE_UNCOMPRESSED} bytes uncompressed")
+                    break
                 
-                logger.info(f"Extracted {len(files)} files from ZIP")
+                ARCHIVE_BYTES.inc(len(content))
+                ARCHIVE_FILES.inc()
+                text = content.decode('utf-8', errors='ignore')
+                spent += time.time() - resumed
+                resumed = None
+                yield filepath, text
+                resumed = time.time()
                 
+                if max_files is not None and count >= max_files:
+                    logger.warning(f"Limiting to first {max_files} files")
+                    break
+        finally:
+            if resumed is not None:
+                spent += time.time() - resumed
+            ARCHIVE_SECONDS.observe(spent)
+    
+    def directory_names(self, root: str) -> List[str]:
+        """Relative paths of the files ``iter_directory`` will yield, without reading them"""
+        return [filepath for filepath, _ in self._walk_directory(root)]
+    
+    def iter_directory(self, root: str, max_files: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """Yield ``(relative path, content)`` for the valid files under ``root``.
+        
+        Applies the same filters as archives, but reads files from disk one at
+        a time and, by default, without the per-upload file cap.
+        """
+        count = 0
+        for filepath, path in self._walk_directory(root):
+            try:
+                with open(path, 'rb') as f:
+                    content = self._read_bounded(f, filepath)
+            except OSError as e:
+                logger.error(f"Error reading {filepath}: {str(e)}")
+                continue
+            if content is None:
+                continue
+            
+            yield filepath, content.decode('utf-8', errors='ignore')
+            count += 1
+            if max_files is not None and count >= max_files:
+                logger.warning(f"Limiting to first {max_files} files")
+                break
+    
+    def _walk_directory(self, root: str) -> Iterator[Tuple[str, str]]:
+        """``(relative path, absolute path)`` of accepted files, in a stable order; symlinks are not followed"""
+        root = os.path.abspath(root)
+        for dirpath, dirnames, filenames in os.walk(root):
+            relative_dir = os.path.relpath(dirpath, root).replace(os.sep, '/')
+            prefix = '' if relative_dir == '.' else relative_dir + '/'
+            dirnames[:] = sorted(d for d in dirnames if not self._should_skip_file(prefix + d + '/'))
+            
+            for filename in sorted(filenames):
+                filepath = prefix + filename
+                path = os.path.join(dirpath, filename)
+                if os.path.islink(path) or not self._filter_valid_files([filepath]):
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if self._accept_member(filepath, size, None):
+                    yield filepath, path
+    
+    def _iter_zip(self, stream: BinaryIO) -> Iterator[Tuple[str, Optional[bytes]]]:
+        try:
+            archive = zipfile.ZipFile(stream)
         except zipfile.BadZipFile:
             logger.error("Invalid ZIP file")
             raise ValueError("Invalid ZIP file format")
-        except Exception as e:
-            logger.error(f"Error extracting ZIP: {str(e)}")
-            raise
         
-        return files
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir() or not self._filter_valid_files([info.filename]):
+                    continue
+                if not self._accept_member(info.filename, info.file_size, info.compress_size):
+                    continue
+                
+                try:
+                    with archive.open(info) as f:
+                        content = self._read_bounded(f, info.filename)
+                except Exception as e:
+                    logger.error(f"Error reading {info.filename}: {str(e)}")
+                    content = None
+                yield info.filename, content
+    
+    def _iter_tar(self, stream: BinaryIO) -> Iterator[Tuple[str, Optional[bytes]]]:
+        try:
+            archive = self._open_tar(stream)
+        except tarfile.TarError:
+            logger.error("Invalid tar archive")
+            raise ValueError("Invalid archive format")
+        
+        with archive:
+            try:
+                for info in archive:
+                    if not info.isfile() or not self._filter_valid_files([info.name]):
+                        continue
+                    if not self._accept_member(info.name, info.size, None):
+                        continue
+                    
+                    try:
+                        f = archive.extractfile(info)
+                        content = self._read_bounded(f, info.name) if f else None
+                    except ArchiveLimitExceeded:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Error reading {info.name}: {str(e)}")
+                        content = None
+                    yield info.name, content
+            except ArchiveLimitExceeded as e:
+                logger.warning(f"Stopping extraction: {str(e)}")
+    
+    def _open_tar(self, stream: BinaryIO) -> tarfile.TarFile:
+        """Open a possibly compressed tar stream for one pass, within the archive limits"""
+        return tarfile.open(fileobj=_BoundedReader(stream), mode='r|')
+    
+    def _accept_member(self, filepath: str, size: int, compressed_size: Optional[int]) -> bool:
+        if size > MAX_FILE_SIZE:
+            logger.warning(f"Skipping {filepath}: file too large")
+            return False
+        if compressed_size is not None and size > 0 and size / max(compressed_size, 1) > MAX_COMPRESSION_RATIO:
+            logger.warning(f"Skipping {filepath}: compression ratio exceeds {MAX_COMPRESSION_RATIO}")
+            return False
+        return True
+    
+    def _read_bounded(self, f: BinaryIO, filepath: str) -> Optional[bytes]:
+        """Read at most MAX_FILE_SIZE bytes, in case the header understated the size"""
+        content = f.read(MAX_FILE_SIZE + 1)
+        if len(content) > MAX_FILE_SIZE:
+            logger.warning(f"Skipping {filepath}: file too large")
+            return None
+        return content
+    
+    def _is_zip(self, stream: BinaryIO, filename: str) -> bool:
+        if filename.lower().endswith('.zip'):
+            return True
+        position = stream.tell()
+        magic = stream.read(4)
+        stream.seek(position)
+        return magic.startswith(b'PK')
     
     def _filter_valid_files(self, file_list: List[str]) -> List[str]:
         valid_files = []
@@ -125,44 +378,12 @@ class FileProcessor:
         
         return structure
     
-    def create_file_graph(self, files: Dict[str, str]) -> Dict[str, List[str]]:
-        graph = {}
-        
-        for filepath, content in files.items():
-            imports = self._extract_imports(content, filepath)
-            
-            dependencies = []
-            for import_name in imports:
-                for other_file in files.keys():
-                    if import_name in other_file:
-                        dependencies.append(other_file)
-            
-            graph[filepath] = dependencies
-        
-        return graph
+    def create_file_graph(self, files: Dict[str, str]) -> DependencyGraph:
+        return DependencyGraph.build(files)
     
     def _extract_imports(self, content: str, filepath: str) -> List[str]:
-        imports = []
-        ext = os.path.splitext(filepath)[1]
-        
-        lines = content.split('\n')
-        
-        if ext == '.py':
-            for line in lines:
-                line = line.strip()
-                if line.startswith('import ') or line.startswith('from '):
-                    parts = line.split()
-                    if len(parts) > 1:
-                        imports.append(parts[1].split('.')[0])
-        
-        elif ext in ['.js', '.ts']:
-            for line in lines:
-                line = line.strip()
-                if line.startswith('import ') or line.startswith('const ') and 'require(' in line:
-                    if 'from' in line:
-                        parts = line.split('from')
-                        if len(parts) > 1:
-                            module = parts[1].strip().strip(';').strip('"').strip("'")
-                            imports.append(module)
-        
-        return imports
+        if filepath.endswith(PYTHON_EXTENSIONS):
+            return ['.' * level + module for level, module, _ in python_imports(content)]
+        if filepath.endswith(SCRIPT_EXTENSIONS):
+            return script_imports(content)
+        return []
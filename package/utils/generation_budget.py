@@ -0,0 +1,85 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from .triage import SHORT
+from ..config import (
+    GENERATION_MAX_TOKENS, GENERATION_MIN_TOKENS, ADAPTIVE_GENERATION,
+    STRUCTURED_NUM_PREDICT, TRIAGE_SHORT_NUM_PREDICT
+)
+
+# (base tokens, tokens per line of code) per agent: security findings need
+# the most explanation, style findings the least
+AGENT_BUDGETS = {
+    "security": (160, 2.5),
+    "performance": (140, 2.0),
+    "style": (120, 1.5)
+}
+DEFAULT_BUDGET = (140, 2.0)
+
+# Budgets are rounded up to this many tokens so calls share LLM variants
+GRANULARITY = 64
+
+
+class GenerationBudget:
+    """Per-call ``num_predict`` from the code's size, its triage and the agent.
+
+    Each agent gets a base allowance plus some tokens per non-blank line of
+    the code it reviews, scaled by how strongly triage flagged the code for
+    that agent (0.75x with no signals, up to 1.25x). A fused call covers
+    several agents and gets the sum of their budgets. No call gets less than
+    ``min_tokens``, so small files still have room to finish their review.
+    Short reviews are capped at TRIAGE_SHORT_NUM_PREDICT and structured ones
+    at STRUCTURED_NUM_PREDICT; nothing exceeds ``max_tokens``.
+    """
+
+    def __init__(self, max_tokens: int = GENERATION_MAX_TOKENS, min_tokens: int = GENERATION_MIN_TOKENS,
+                 adaptive: bool = ADAPTIVE_GENERATION):
+        self.max_tokens = max_tokens
+        self.min_tokens = min(min_tokens, max_tokens)
+        self.adaptive = adaptive
+
+    def num_predict(self, agents: Iterable[str], code: str, triage: Optional[Dict[str, Any]] = None,
+                    depth: Optional[str] = None, structured: bool = False) -> int:
+        """Generation cap for one call reviewing ``code`` for ``agents``"""
+        cap = self.max_tokens
+        if structured:
+            cap = min(cap, STRUCTURED_NUM_PREDICT)
+        if depth == SHORT:
+            cap = min(cap, TRIAGE_SHORT_NUM_PREDICT)
+        if not self.adaptive:
+            return cap
+
+        lines = sum(1 for line in code.split('\n') if line.strip())
+        budget = 0.0
+        for agent_name in agents:
+            base, per_line = AGENT_BUDGETS.get(agent_name, DEFAULT_BUDGET)
+            budget += (base + per_line * lines) * self._signal_factor(agent_name, triage)
+        budget = -(-int(budget) // GRANULARITY) * GRANULARITY
+        return max(min(self.min_tokens, cap), min(cap, budget))
+
+    def summary(self, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Totals over the ``generation`` records of a file's LLM calls.
+
+        ``budget_saved`` is the budget a call left unused (``num_predict``
+        minus the tokens it generated), per call and in total over the calls
+        that reported their output; ``stopped`` calls ended by themselves (or
+        at the completion marker), ``truncated`` ones ran into their cap.
+        """
+        per_call = []
+        for call in calls:
+            tokens = call.get("output_tokens")
+            saved = max(0, call["num_predict"] - tokens) if tokens is not None else None
+            per_call.append(dict(call, budget_saved=saved))
+        return {
+            "calls": len(calls),
+            "per_call": per_call,
+            "budget": sum(call["num_predict"] for call in calls),
+            "output_tokens": sum(call.get("output_tokens") or 0 for call in calls),
+            "budget_saved": sum(call["budget_saved"] for call in per_call if call["budget_saved"] is not None),
+            "stopped": sum(1 for call in calls if call.get("stop_reason") == "stop"),
+            "truncated": sum(1 for call in calls if call.get("stop_reason") == "length")
+        }
+
+    def _signal_factor(self, agent_name: str, triage: Optional[Dict[str, Any]]) -> float:
+        if triage is None or agent_name not in triage["agents"]:
+            return 1.0
+        return 0.75 + 0.5 * min(1.0, triage["agents"][agent_name]["score"])
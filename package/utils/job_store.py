@@ -0,0 +1,244 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from ..config import JOB_STORE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class JobStore:
+    """SQLite-backed state for asynchronous repository review jobs.
+    
+    A job is run by whichever process claims it first. The claim is a lease
+    that the owner renews while it works; once it lapses (the process died),
+    another process may claim the job and resume it.
+    """
+    
+    def __init__(self, db_path: str = JOB_STORE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                total_files INTEGER NOT NULL,
+                error TEXT,
+                repository_summary TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                owner TEXT,
+                lease_until REAL,
+                client TEXT
+            );
+            CREATE TABLE IF NOT EXISTS job_files (
+                job_id TEXT NOT NULL,
+                filepath TEXT NOT NULL,
+                code TEXT NOT NULL,
+                result TEXT,
+                completed_at REAL,
+                PRIMARY KEY (job_id, filepath)
+            );
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_until", "REAL"), ("client", "TEXT")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.commit()
+    
+    def create_job(self, files: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+                   client: Optional[str] = None) -> str:
+        """Store a new job for ``client``; ``files`` may be a lazily decoded iterable of (path, code)"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        items = files.items() if isinstance(files, Mapping) else files
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, total_files, created_at, updated_at, client) "
+                "VALUES (?, ?, 0, ?, ?, ?)",
+                (job_id, "queued", now, now, client)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_files (job_id, filepath, code) VALUES (?, ?, ?)",
+                ((job_id, filepath, code) for filepath, code in items)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET total_files = (SELECT COUNT(*) FROM job_files WHERE job_id = ?) WHERE id = ?",
+                (job_id, job_id)
+            )
+            self._conn.commit()
+        return job_id
+    
+    def claim_job(self, job_id: str, owner: str, lease: float) -> bool:
+        """Mark an unfinished job running for ``owner`` unless another live owner holds it"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running') "
+                "AND (owner IS NULL OR owner = ? OR lease_until < ?)",
+                (owner, now + lease, now, job_id, owner, now)
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+    
+    def renew_lease(self, job_id: str, owner: str, lease: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ?",
+                (time.time() + lease, job_id, owner)
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+    
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """Record a job's status; a finished job gives up its owner"""
+        finished = status not in ("queued", "running")
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?, "
+                "owner = CASE WHEN ? THEN NULL ELSE owner END, "
+                "lease_until = CASE WHEN ? THEN NULL ELSE lease_until END WHERE id = ?",
+                (status, error, time.time(), finished, finished, job_id)
+            )
+            self._conn.commit()
+    
+    def save_file_result(self, job_id: str, filepath: str, result: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_files SET result = ?, completed_at = ? WHERE job_id = ? AND filepath = ?",
+                (json.dumps(result, default=str), now, job_id, filepath)
+            )
+            self._conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (now, job_id))
+            self._conn.commit()
+    
+    def save_summary(self, job_id: str, repository_summary: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET repository_summary = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(repository_summary, default=str), time.time(), job_id)
+            )
+            self._conn.commit()
+    
+    def get_files(self, job_id: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filepath, code FROM job_files WHERE job_id = ? ORDER BY rowid", (job_id,)
+            ).fetchall()
+        return {filepath: code for filepath, code in rows}
+    
+    def get_results(self, job_id: str) -> Dict[str, Any]:
+        """Per-file results completed so far"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filepath, result FROM job_files WHERE job_id = ? AND result IS NOT NULL ORDER BY rowid",
+                (job_id,)
+            ).fetchall()
+        return {filepath: json.loads(result) for filepath, result in rows}
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, total_files, error, repository_summary, created_at, updated_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        
+        results = self.get_results(job_id)
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "progress": {
+                "completed": len(results),
+                "total": row[2]
+            },
+            "error": row[3],
+            "results": results,
+            "repository_summary": json.loads(row[4]) if row[4] else None,
+            "created_at": row[5],
+            "updated_at": row[6]
+        }
+    
+    def get_client(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT client FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+    
+    def get_version(self, job_id: str) -> Optional[str]:
+        """Changes whenever the job's status or results do; None for an unknown job"""
+        with self._lock:
+            row = self._conn.execute("SELECT status, updated_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return f"{row[0]}:{row[1]!r}" if row else None
+    
+    def get_overview(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job's status and totals without any per-file results or code"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, total_files, error, repository_summary, created_at, updated_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            completed, issues = self._conn.execute(
+                "SELECT COUNT(result), COALESCE(SUM(json_extract(result, '$.summary.total_issues')), 0) "
+                "FROM job_files WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "progress": {
+                "completed": completed,
+                "total": row[2]
+            },
+            "total_issues": issues,
+            "error": row[3],
+            "repository_summary": json.loads(row[4]) if row[4] else None,
+            "created_at": row[5],
+            "updated_at": row[6]
+        }
+    
+    def list_files(self, job_id: str, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """One page of a job's files in upload order, each with its review summary once reviewed"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filepath, LENGTH(code), json_extract(result, '$.summary'), completed_at "
+                "FROM job_files WHERE job_id = ? ORDER BY rowid LIMIT ? OFFSET ?",
+                (job_id, limit, offset)
+            ).fetchall()
+        return [
+            {
+                "filepath": filepath,
+                "code_length": code_length,
+                "reviewed": completed_at is not None,
+                "summary": json.loads(summary) if summary else None
+            }
+            for filepath, code_length, summary, completed_at in rows
+        ]
+    
+    def get_file(self, job_id: str, filepath: str) -> Optional[Dict[str, Any]]:
+        """One file's code and, once reviewed, its result"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT code, result FROM job_files WHERE job_id = ? AND filepath = ?", (job_id, filepath)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"filepath": filepath, "code": row[0], "result": json.loads(row[1]) if row[1] else None}
+    
+    def unfinished_jobs(self) -> List[str]:
+        """Unfinished jobs that no live owner holds"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') "
+                "AND (owner IS NULL OR lease_until < ?) ORDER BY created_at",
+                (time.time(),)
+            ).fetchall()
+        return [row[0] for row in rows]
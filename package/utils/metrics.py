@@ -0,0 +1,188 @@
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0, 120.0, 300.0)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{self._format_labels(key)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # Per-bucket counts, then the overflow (+Inf) count, the sum and the total count
+            series = self._values.setdefault(key, [0.0] * (len(self.buckets) + 3))
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = {key: list(series) for key, series in self._values.items()}
+        for key, series in sorted(values.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{self._format_labels(key, ('le', _number(bound)))} {_number(cumulative)}"
+            yield f"{self.name}_bucket{self._format_labels(key, ('le', '+Inf'))} {_number(series[-1])}"
+            yield f"{self.name}_sum{self._format_labels(key)} {_number(series[-2])}"
+            yield f"{self.name}_count{self._format_labels(key)} {_number(series[-1])}"
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+AGENT_LATENCY = REGISTRY.histogram(
+    "review_agent_duration_seconds", "Time taken by one agent review call", ["agent"], LLM_BUCKETS)
+AGENT_ERRORS = REGISTRY.counter(
+    "review_agent_errors_total", "Agent reviews that failed with an error", ["agent"])
+AGENT_TIMEOUTS = REGISTRY.counter(
+    "review_agent_timeouts_total", "Agent reviews abandoned after AGENT_TIMEOUT", ["agent"])
+REVIEW_TIERS = REGISTRY.counter(
+    "review_model_tier_total", "Agent review passes per model tier (small first pass or large model)", ["agent", "tier"])
+CASCADE_ESCALATIONS = REGISTRY.counter(
+    "review_cascade_escalations_total", "First-pass reviews re-run on the large model", ["agent"])
+QUEUE_WAIT = REGISTRY.histogram(
+    "review_queue_wait_seconds", "Time from scheduling a review task until it holds a backend slot",
+    ["backend", "priority"])
+BACKEND_LIMIT = REGISTRY.gauge(
+    "review_backend_concurrency_limit", "Current adaptive concurrency limit per backend and model",
+    ["backend", "model"])
+REQUESTS_SHED = REGISTRY.counter(
+    "review_requests_shed_total", "Review requests rejected because the backlog exceeded the queue-time budget")
+LLM_INFLIGHT = REGISTRY.gauge(
+    "ollama_inflight_requests", "LLM calls currently in progress", ["backend"])
+LLM_PROMPT_TOKENS = REGISTRY.counter(
+    "ollama_prompt_eval_tokens_total", "Prompt tokens evaluated by Ollama (prompt_eval_count)", ["agent"])
+LLM_OUTPUT_TOKENS = REGISTRY.counter(
+    "ollama_eval_tokens_total", "Tokens generated by Ollama (eval_count)", ["agent"])
+LLM_PROMPT_SECONDS = REGISTRY.counter(
+    "ollama_prompt_eval_seconds_total", "Ollama prompt evaluation time (prompt_eval_duration)", ["agent"])
+LLM_OUTPUT_SECONDS = REGISTRY.counter(
+    "ollama_eval_seconds_total", "Ollama generation time (eval_duration)", ["agent"])
+LLM_LOAD_SECONDS = REGISTRY.counter(
+    "ollama_load_seconds_total", "Ollama model load time (load_duration)", ["agent"])
+LLM_DURATION = REGISTRY.histogram(
+    "ollama_request_duration_seconds", "Ollama total_duration per request", ["agent"], LLM_BUCKETS)
+ARCHIVE_SECONDS = REGISTRY.histogram(
+    "archive_extraction_seconds", "Time spent reading and decompressing an uploaded archive")
+ARCHIVE_BYTES = REGISTRY.counter(
+    "archive_extracted_bytes_total", "Decompressed bytes read from uploaded archives")
+ARCHIVE_FILES = REGISTRY.counter(
+    "archive_extracted_files_total", "Files extracted from uploaded archives")
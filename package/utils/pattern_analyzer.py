@@ -0,0 +1,280 @@
+import re
+import zlib
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from .dependency_graph import DependencyGraph
+from ..config import (
+    PATTERN_SIMILARITY_THRESHOLD, PATTERN_MAX_CLUSTERS, PATTERN_MIN_FILES, PATTERN_HASH_BITS
+)
+
+logger = logging.getLogger(__name__)
+
+# Numbered or bulleted items, the way agents are asked to list findings
+LIST_ITEM = re.compile(r'^\s*(?:\d+[.)]|[-*•])\s+(.*)$')
+HEADING = re.compile(r'^\s*(?:#+\s|\*\*[^*]+\*\*:?\s*$|[A-Z][A-Z /&]+:?\s*$)')
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+WORD = re.compile(r'[a-z][a-z0-9_]{2,}')
+LINE_NUMBERS = re.compile(r'\blines?\s+\d+(?:\s*(?:-|–|to)\s*\d+)?', re.IGNORECASE)
+NO_FINDINGS = re.compile(
+    r'\b(?:no (?:significant |major |obvious )?(?:issues?|problems?|vulnerabilit(?:y|ies)|concerns?)'
+    r'|nothing to report|looks? good|well[- ]written)\b',
+    re.IGNORECASE
+)
+ISSUE_INDICATORS = ('issue', 'problem', 'vulnerab', 'inefficient', 'violation', 'risk', 'missing',
+                    'should', 'consider', 'avoid', 'unsafe', 'slow', 'unused', 'inconsistent')
+STOP_WORDS = {
+    'the', 'and', 'for', 'this', 'that', 'with', 'from', 'are', 'was', 'were', 'can', 'could',
+    'should', 'would', 'may', 'might', 'will', 'not', 'but', 'its', 'it\'s', 'there', 'their',
+    'which', 'when', 'where', 'than', 'then', 'also', 'into', 'use', 'used', 'using', 'code',
+    'line', 'lines', 'function', 'file', 'potential', 'consider', 'instead', 'more', 'any', 'all'
+}
+
+MIN_WORDS = 3
+MAX_FINDINGS_PER_REVIEW = 25
+MAX_AFFECTED_FILES = 50
+COMMON_ISSUES_LIMIT = 15
+CONCERNS_PER_KIND = 10
+HUB_MIN_DEPENDENTS = 5
+HUB_SHARE = 0.05
+FAN_OUT_LIMIT = 15
+
+
+class PatternAnalyzer:
+    """Repository-wide patterns across per-file review results.
+
+    Files are offered one at a time with ``add`` as their reviews finish. Each
+    review's findings are vectorized as hashed TF-IDF over words and word
+    pairs and assigned to the most similar cluster (cosine similarity against
+    every cluster centroid in one matrix product), or start a new cluster when
+    none reaches ``threshold``. The cost of a file is linear in the number of
+    clusters, which ``max_clusters`` bounds, so large repositories never need
+    pairwise comparisons. ``summary`` reports the clusters that recur across
+    files, architectural concerns from the import graph, and how evenly the
+    findings are spread over the repository.
+    """
+
+    def __init__(self, threshold: float = PATTERN_SIMILARITY_THRESHOLD,
+                 max_clusters: int = PATTERN_MAX_CLUSTERS, min_files: int = PATTERN_MIN_FILES,
+                 hash_bits: int = PATTERN_HASH_BITS):
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self.min_files = min_files
+        self.dimensions = 1 << hash_bits
+
+        self._document_frequency = np.zeros(self.dimensions, dtype=np.float32)
+        self._documents = 0
+        self._centroids = np.zeros((64, self.dimensions), dtype=np.float32)
+        self._clusters: List[Dict[str, Any]] = []
+        self._terms: Dict[int, str] = {}
+        self._file_findings: Dict[str, int] = {}
+
+    def add(self, filepath: str, result: Dict[str, Any]) -> None:
+        """Cluster the findings of one file's reviews"""
+        if filepath in self._file_findings:
+            return
+
+        findings = [
+            (agent_name, finding)
+            for agent_name, review in result.get("reviews", {}).items()
+            if "error" not in review and not review.get("skipped")
+            for finding in review_findings(review)
+        ]
+        self._file_findings[filepath] = len(findings)
+        if not findings:
+            return
+
+        vectors = np.stack([self._vectorize(text) for _, text in findings])
+        # Document frequencies include this file's findings before weighting them
+        self._document_frequency += (vectors > 0).sum(axis=0)
+        self._documents += len(findings)
+        idf = np.log((1 + self._documents) / (1 + self._document_frequency)) + 1
+
+        weighted = _normalize(vectors * idf)
+        similarities = None
+        if self._clusters:
+            centroids = _normalize(self._centroids[:len(self._clusters)] * idf)
+            similarities = weighted @ centroids.T
+
+        for row, (agent_name, text) in enumerate(findings):
+            best, best_similarity = None, 0.0
+            if similarities is not None:
+                best = int(np.argmax(similarities[row]))
+                best_similarity = float(similarities[row, best])
+            # Findings of this file that opened clusters are not in the matrix yet
+            for index in range(0 if similarities is None else similarities.shape[1], len(self._clusters)):
+                similarity = float(weighted[row] @ _normalize(self._centroids[index] * idf))
+                if similarity > best_similarity:
+                    best, best_similarity = index, similarity
+
+            if best is None or (best_similarity < self.threshold and len(self._clusters) < self.max_clusters):
+                best = self._new_cluster(text)
+            cluster = self._clusters[best]
+            self._centroids[best] += vectors[row]
+            cluster["count"] += 1
+            cluster["agents"][agent_name] += 1
+            cluster["files"].add(filepath)
+
+    def summary(self, graph: Optional[DependencyGraph] = None) -> Dict[str, Any]:
+        return {
+            "common_issues": self.common_issues(),
+            "architectural_concerns": self.architectural_concerns(graph) if graph is not None else [],
+            "consistency_score": self.consistency_score(),
+            "findings": int(sum(self._file_findings.values())),
+            "finding_clusters": len(self._clusters)
+        }
+
+    def common_issues(self, limit: int = COMMON_ISSUES_LIMIT) -> List[Dict[str, Any]]:
+        """Clusters found in at least ``min_files`` files, most widespread first"""
+        recurring = [
+            (index, cluster) for index, cluster in enumerate(self._clusters)
+            if len(cluster["files"]) >= self.min_files
+        ]
+        recurring.sort(key=lambda item: (-len(item[1]["files"]), -item[1]["count"]))
+
+        issues = []
+        for index, cluster in recurring[:limit]:
+            files = sorted(cluster["files"])
+            issues.append({
+                "issue": cluster["example"],
+                "keywords": self._keywords(index),
+                "agents": [agent for agent, _ in cluster["agents"].most_common()],
+                "count": cluster["count"],
+                "file_count": len(files),
+                "files": files[:MAX_AFFECTED_FILES]
+            })
+        return issues
+
+    def architectural_concerns(self, graph: DependencyGraph) -> List[Dict[str, Any]]:
+        """Import cycles, heavily depended-on files and files with very many internal imports"""
+        concerns = []
+
+        cycles = sorted(graph.cycles(), key=len, reverse=True)
+        for cycle in cycles[:CONCERNS_PER_KIND]:
+            concerns.append({
+                "type": "circular_dependency",
+                "files": cycle,
+                "description": f"{len(cycle)} files import each other in a cycle"
+            })
+
+        hub_threshold = max(HUB_MIN_DEPENDENTS, int(len(graph) * HUB_SHARE))
+        hubs = [(filepath, len(graph.dependents(filepath))) for filepath in graph]
+        hubs = [(filepath, count) for filepath, count in hubs if count >= hub_threshold]
+        # Hubs with findings come first: their problems reach every dependent
+        hubs.sort(key=lambda item: (-item[1] * (1 + self._file_findings.get(item[0], 0)), item[0]))
+        for filepath, count in hubs[:CONCERNS_PER_KIND]:
+            findings = self._file_findings.get(filepath, 0)
+            concerns.append({
+                "type": "hub",
+                "files": [filepath],
+                "dependents": count,
+                "findings": findings,
+                "description": f"{filepath} is imported by {count} files"
+                               + (f" and has {findings} findings" if findings else "")
+            })
+
+        fan_out = [(filepath, len(graph.dependencies(filepath))) for filepath in graph]
+        fan_out = sorted(((f, c) for f, c in fan_out if c >= FAN_OUT_LIMIT), key=lambda item: (-item[1], item[0]))
+        for filepath, count in fan_out[:CONCERNS_PER_KIND]:
+            concerns.append({
+                "type": "high_fan_out",
+                "files": [filepath],
+                "dependencies": count,
+                "description": f"{filepath} imports {count} other files of the repository"
+            })
+
+        return concerns
+
+    def consistency_score(self) -> float:
+        """1 minus the Gini coefficient of findings per file.
+
+        1.0 when every file has the same number of findings (including none),
+        approaching 0.0 when they are concentrated in a few files.
+        """
+        counts = np.sort(np.fromiter(self._file_findings.values(), dtype=np.float64))
+        if len(counts) == 0 or counts.sum() == 0:
+            return 1.0
+        ranks = np.arange(1, len(counts) + 1)
+        gini = (2 * np.sum(ranks * counts)) / (len(counts) * counts.sum()) - (len(counts) + 1) / len(counts)
+        return round(float(1 - gini), 3)
+
+    def _new_cluster(self, text: str) -> int:
+        index = len(self._clusters)
+        if index == len(self._centroids):
+            self._centroids = np.vstack([self._centroids, np.zeros_like(self._centroids)])
+        self._clusters.append({"example": text, "count": 0, "agents": Counter(), "files": set()})
+        return index
+
+    def _vectorize(self, text: str) -> np.ndarray:
+        words = [word for word in WORD.findall(LINE_NUMBERS.sub(' ', text.lower())) if word not in STOP_WORDS]
+        terms = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for term in terms:
+            bucket = zlib.crc32(term.encode('utf-8')) & (self.dimensions - 1)
+            self._terms.setdefault(bucket, term)
+            vector[bucket] += 1
+        return vector
+
+    def _keywords(self, index: int, count: int = 5) -> List[str]:
+        idf = np.log((1 + self._documents) / (1 + self._document_frequency)) + 1
+        weights = self._centroids[index] * idf
+        keywords = []
+        for bucket in np.argsort(weights)[::-1][:count * 2]:
+            term = self._terms.get(int(bucket))
+            if weights[bucket] <= 0 or term is None:
+                break
+            if ' ' not in term and term not in keywords:
+                keywords.append(term)
+            if len(keywords) == count:
+                break
+        return keywords
+
+
+def review_findings(review: Dict[str, Any]) -> List[str]:
+    """One review's findings: its structured findings, or those found in its text"""
+    if "findings" in review:
+        return [f"{finding['category']}: {finding['message']}" for finding in review["findings"]]
+    return extract_findings(review.get("raw_feedback", ""))
+
+
+def extract_findings(feedback: str) -> List[str]:
+    """Individual findings in an agent's free-text review.
+
+    List items (with their continuation lines) when the review has any,
+    otherwise sentences that read like a finding. Headings and "no issues"
+    statements are dropped.
+    """
+    items: List[str] = []
+    current: Optional[List[str]] = None
+    for line in feedback.split('\n'):
+        match = LIST_ITEM.match(line)
+        if match:
+            current = [match.group(1).strip()]
+            items.append(current)
+        elif not line.strip() or HEADING.match(line):
+            current = None
+        elif current is not None:
+            current.append(line.strip())
+    candidates = [' '.join(item) for item in items]
+
+    if not candidates:
+        sentences = SENTENCE_END.split(' '.join(line.strip() for line in feedback.split('\n') if not HEADING.match(line)))
+        candidates = [s for s in sentences if any(indicator in s.lower() for indicator in ISSUE_INDICATORS)]
+
+    findings = []
+    seen: Set[str] = set()
+    for text in candidates:
+        text = text.strip().strip('*').strip()
+        if len(WORD.findall(text.lower())) < MIN_WORDS or NO_FINDINGS.search(text) or text in seen:
+            continue
+        seen.add(text)
+        findings.append(text)
+    return findings[:MAX_FINDINGS_PER_REVIEW]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
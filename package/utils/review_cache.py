@@ -0,0 +1,235 @@
+import copy
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config import (
+    REVIEW_CACHE_MAX_ENTRIES,
+    REVIEW_CACHE_MEMORY_ITEMS,
+    REVIEW_CACHE_PATH,
+    REVIEW_CACHE_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewCache:
+    """Content-addressed cache for agent reviews.
+
+    Lookups go through an in-memory LRU tier first, then a SQLite tier that
+    survives restarts. Concurrent misses on the same key share one computation.
+    """
+
+    def __init__(self,
+                 db_path: Optional[str] = REVIEW_CACHE_PATH,
+                 memory_items: int = REVIEW_CACHE_MEMORY_ITEMS,
+                 max_entries: int = REVIEW_CACHE_MAX_ENTRIES,
+                 ttl: float = REVIEW_CACHE_TTL):
+        self.memory_items = memory_items
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+        self._db_lock = threading.Lock()
+        self._conn = self._open_db(db_path) if db_path else None
+
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "coalesced": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(code: str,
+                 context: Optional[Dict[str, Any]],
+                 prompt_template: str,
+                 model: str,
+                 temperature: Optional[float],
+                 num_predict: Optional[int] = None) -> str:
+        """Key for a review; ``num_predict`` is part of it since a smaller budget can cut the review short"""
+        payload = json.dumps(
+            {
+                "code": code,
+                "context": context,
+                "prompt": prompt_template,
+                "model": model,
+                "temperature": temperature,
+                "num_predict": num_predict,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._memory_get(key)
+        if value is None:
+            value = self._disk_get(key)
+            if value is not None:
+                self._memory_put(key, value)
+        return copy.deepcopy(value) if value is not None else None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        self._memory_put(key, value)
+        self._disk_put(key, value)
+
+    def get_or_compute(self, key: str,
+                       compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+        """Return ``(value, status)`` where status is memory, disk, coalesced or miss.
+
+        Concurrent calls for the same key wait for the first one's result.
+        They only share it if it is cacheable: when the first call failed, ran
+        out of time or was cancelled, each waiter computes its own (with its
+        own deadline) instead.
+        """
+        while True:
+            with self._lock:
+                value = self._memory_get(key)
+                if value is not None:
+                    self.stats["memory_hits"] += 1
+                    return copy.deepcopy(value), "memory"
+
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    break
+
+            try:
+                value = future.result()
+            except BaseException:
+                continue
+            if self._is_cacheable(value):
+                self._count("coalesced")
+                return copy.deepcopy(value), "coalesced"
+
+        try:
+            value = self._disk_get(key)
+            if value is not None:
+                status = "disk"
+                self._memory_put(key, value)
+            else:
+                status = "miss"
+                value = compute()
+                if self._is_cacheable(value):
+                    self.put(key, value)
+            self._count("disk_hits" if status == "disk" else "misses")
+        except BaseException as e:
+            self._release(key)
+            future.set_exception(e)
+            raise
+        # Released before waking the waiters, so a retrying waiter can lead
+        self._release(key)
+        future.set_result(value)
+
+        return copy.deepcopy(value), status
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.execute("DELETE FROM reviews")
+                self._conn.commit()
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _is_cacheable(self, value: Dict[str, Any]) -> bool:
+        return isinstance(value, dict) and "error" not in value and not value.get("cancelled")
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = (time.time() + self.ttl, copy.deepcopy(value))
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _open_db(self, db_path: str) -> Optional[sqlite3.Connection]:
+        try:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS reviews (
+                       key TEXT PRIMARY KEY,
+                       value TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       accessed_at REAL NOT NULL
+                   )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_reviews_accessed ON reviews(accessed_at)")
+            conn.commit()
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"Review cache disk tier disabled: {str(e)}")
+            return None
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._conn is None:
+            return None
+
+        now = time.time()
+        try:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM reviews WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] + self.ttl < now:
+                    self._conn.execute("DELETE FROM reviews WHERE key = ?", (key,))
+                    self._conn.commit()
+                    return None
+                self._conn.execute("UPDATE reviews SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Review cache read failed: {str(e)}")
+            return None
+
+    def _disk_put(self, key: str, value: Dict[str, Any]) -> None:
+        if self._conn is None:
+            return
+
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO reviews (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, default=str), now, now)
+                )
+                self._evict(now)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Review cache write failed: {str(e)}")
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM reviews WHERE created_at < ?", (now - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM reviews WHERE key IN "
+                "(SELECT key FROM reviews ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
@@ -0,0 +1,305 @@
+import ast
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SKIP = "skip"
+SHORT = "short"
+FULL = "full"
+
+# A score at or above FULL_SCORE always gets a full review, even for files
+# that would otherwise be skipped as generated, minified or trivial.
+FULL_SCORE = 1.0
+
+GENERATED_MARKERS = re.compile(
+    r'@generated|do not edit|auto-?generated|generated by|code generator',
+    re.IGNORECASE
+)
+GENERATED_FILENAMES = re.compile(r'(_pb2(_grpc)?\.py|\.pb\.go|\.min\.js|\.generated\.\w+|\.g\.dart)$')
+
+SECURITY_SIGNALS = [
+    ("hardcoded secret", 1.0, re.compile(
+        r'(?i)(password|passwd|secret|api[_-]?key|auth[_-]?token|access[_-]?key|private[_-]?key)\w*["\']?\s*[:=]\s*["\'][^"\'\s]{6,}["\']'
+        r'|AKIA[0-9A-Z]{16}|-----BEGIN (?:RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----|gh[pousr]_[A-Za-z0-9]{30,}'
+    )),
+    ("SQL built from strings", 1.0, re.compile(
+        r'(?i)(?:execute|executemany|query|raw)\s*\(\s*(?:f["\']|["\'][^"\']*["\']\s*(?:%|\+|\.format\b))'
+        r'|f["\']\s*(?:select|insert\s+into|update|delete\s+from)\b[^"\']*\{'
+        r'|["\']\s*(?:select\s[^"\']*\sfrom|insert\s+into|update\s+\w+\s+set|delete\s+from)\b[^"\']*["\']\s*(?:\+|%\s*[\w(])'
+        r'|`\s*(?:select|insert\s+into|update|delete\s+from)\b[^`]*\$\{'
+    )),
+    ("dangerous call", 1.0, re.compile(
+        r'\b(?:eval|exec)\s*\(|pickle\.loads?\(|yaml\.load\((?![^)]*Loader\s*=\s*yaml\.SafeLoader)'
+        r'|shell\s*=\s*True|os\.system\(|os\.popen\(|child_process|Runtime\.getRuntime\(\)\.exec'
+        r'|\.innerHTML\s*=|dangerouslySetInnerHTML|document\.write\(|\bunserialize\('
+    )),
+    ("weak cryptography or TLS", 0.6, re.compile(
+        r'(?i)\b(?:md5|sha1)\s*\(|hashlib\.(?:md5|sha1)\b|\bDES\b|verify\s*=\s*False|rejectUnauthorized\s*:\s*false'
+    )),
+    ("external input", 0.5, re.compile(
+        r'request\.(?:args|form|json|get_json|files|data|values|cookies|headers)|req\.(?:body|query|params|cookies)'
+        r'|\binput\s*\(|sys\.argv|\$_(?:GET|POST|REQUEST|COOKIE)|getParameter\('
+    )),
+    ("filesystem or network access", 0.3, re.compile(
+        r'\bopen\s*\(|send_file\(|readFile|writeFile|urlopen\(|requests\.(?:get|post|put|delete)\(|socket\.'
+    )),
+]
+
+LOOP_LINE = re.compile(r'^\s*(?:for|while|do)\b|\.(?:forEach|map|filter|reduce)\s*\(')
+IO_CALL = re.compile(
+    r'\.(?:execute|query|fetch\w*|get|post|save|commit|find\w*|select|filter|read|write|send)\s*\('
+    r'|\brequests\.|\bfetch\s*\(|\bawait\b|\bopen\s*\(|objects\.'
+)
+CONCAT_IN_LOOP = re.compile(r'\w\s*\+=\s*(?:f?["\']|str\(|\w+\s*\+\s*["\'])')
+COMMENT_LINE = re.compile(r'^\s*(?:#|//|/\*|\*|\*/|--|<!--)')
+FUNCTION_LINE = re.compile(
+    r'^\s*(?:async\s+)?def\s|\bfunction\b|=>|^\s*(?:public|private|protected|static|func|fn)\s'
+)
+
+
+class StaticTriage:
+    """Local pre-analysis that decides, per agent, whether a file needs an LLM review.
+
+    Each agent gets a score from AST metrics and regex detectors. A file is
+    reviewed in full when the score reaches FULL_SCORE, gets a short review
+    when there is something worth a look, and is skipped otherwise.
+    Empty, generated, minified and constants-only files are skipped unless a
+    detector scores them for a full review.
+    """
+
+    def __init__(self, short_min_lines: int = 10, style_full_lines: int = 80,
+                 long_function_lines: int = 60):
+        self.short_min_lines = short_min_lines
+        self.style_full_lines = style_full_lines
+        self.long_function_lines = long_function_lines
+
+    def assess(self, code: str, filepath: Optional[str] = None) -> Dict[str, Any]:
+        metrics = self._line_metrics(code)
+        structure = None
+        if (filepath or '').endswith('.py') or filepath is None:
+            structure = self._python_metrics(code)
+        if structure is None:
+            structure = self._generic_metrics(code)
+        metrics.update(structure)
+
+        kind = self._classify(code, filepath, metrics)
+        agents = {
+            "security": self._decide(*self._security_score(code), kind, metrics),
+            "performance": self._decide(*self._performance_score(metrics), kind, metrics),
+            "style": self._decide(*self._style_score(metrics), kind, metrics)
+        }
+
+        return {
+            "kind": kind,
+            "decisions": {name: agent["decision"] for name, agent in agents.items()},
+            "agents": agents,
+            "metrics": metrics
+        }
+
+    def _decide(self, score: float, reasons: List[str], kind: Optional[str],
+                metrics: Dict[str, Any]) -> Dict[str, Any]:
+        if score >= FULL_SCORE:
+            decision = FULL
+        elif kind is not None:
+            decision = SKIP
+            reasons = reasons + [f"{kind} file"]
+        elif score > 0 or metrics["code_lines"] >= self.short_min_lines:
+            decision = SHORT
+        else:
+            decision = SKIP
+            reasons = reasons + ["nothing to review"]
+        return {"decision": decision, "score": round(score, 2), "reasons": reasons}
+
+    def _classify(self, code: str, filepath: Optional[str], metrics: Dict[str, Any]) -> Optional[str]:
+        """``empty``, ``generated``, ``minified`` or ``trivial`` for files not worth a review by default"""
+        if metrics["code_lines"] == 0:
+            return "empty"
+        head = '\n'.join(code.split('\n', 10)[:10])
+        if GENERATED_MARKERS.search(head) or GENERATED_FILENAMES.search(filepath or ''):
+            return "generated"
+        if metrics["max_line_length"] > 1000 or (metrics["lines"] > 1 and metrics["avg_line_length"] > 200):
+            return "minified"
+        if metrics.get("constants_only") or (metrics["functions"] == 0 and metrics["loops"] == 0
+                                             and metrics["code_lines"] < self.short_min_lines):
+            return "trivial"
+        return None
+
+    def _security_score(self, code: str) -> Tuple[float, List[str]]:
+        score = 0.0
+        reasons = []
+        for reason, weight, pattern in SECURITY_SIGNALS:
+            if pattern.search(code):
+                score += weight
+                reasons.append(reason)
+        return score, reasons
+
+    def _performance_score(self, metrics: Dict[str, Any]) -> Tuple[float, List[str]]:
+        score = 0.0
+        reasons = []
+        if metrics["max_loop_depth"] >= 2:
+            score += 1.0
+            reasons.append(f"nested loops (depth {metrics['max_loop_depth']})")
+        elif metrics["loops"]:
+            score += 0.3
+            reasons.append("loops")
+        if metrics["io_in_loop"]:
+            score += 1.0
+            reasons.append("I/O or queries inside a loop")
+        if metrics["concat_in_loop"]:
+            score += 0.5
+            reasons.append("string concatenation inside a loop")
+        if metrics["branches"] > 25:
+            score += 0.5
+            reasons.append(f"{metrics['branches']} branches")
+        return score, reasons
+
+    def _style_score(self, metrics: Dict[str, Any]) -> Tuple[float, List[str]]:
+        score = 0.0
+        reasons = []
+        if metrics["code_lines"] >= self.style_full_lines:
+            score += 1.0
+            reasons.append(f"{metrics['code_lines']} lines of code")
+        elif metrics["functions"] or metrics["classes"]:
+            score += 0.3
+            reasons.append("defines functions or classes")
+        if metrics["max_function_lines"] > self.long_function_lines:
+            score += 0.5
+            reasons.append(f"function of {metrics['max_function_lines']} lines")
+        if metrics["max_line_length"] > 120:
+            score += 0.2
+            reasons.append("long lines")
+        return score, reasons
+
+    def _line_metrics(self, code: str) -> Dict[str, Any]:
+        lines = code.split('\n')
+        code_lines = [line for line in lines if line.strip() and not COMMENT_LINE.match(line)]
+        return {
+            "lines": len(lines),
+            "code_lines": len(code_lines),
+            "max_line_length": max((len(line) for line in lines), default=0),
+            "avg_line_length": round(sum(len(line) for line in code_lines) / len(code_lines), 1) if code_lines else 0.0
+        }
+
+    def _python_metrics(self, code: str) -> Optional[Dict[str, Any]]:
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            return None
+
+        metrics = {
+            "functions": 0,
+            "classes": 0,
+            "loops": 0,
+            "branches": 0,
+            "max_loop_depth": 0,
+            "max_function_lines": 0,
+            "io_in_loop": False,
+            "concat_in_loop": False,
+            "constants_only": all(self._is_constant_statement(node) for node in tree.body)
+        }
+        self._visit(tree, 0, metrics)
+        return metrics
+
+    def _visit(self, node: ast.AST, loop_depth: int, metrics: Dict[str, Any]) -> None:
+        for child in ast.iter_child_nodes(node):
+            depth = loop_depth
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                metrics["functions"] += 1
+                if not isinstance(child, ast.Lambda):
+                    length = (getattr(child, "end_lineno", None) or child.lineno) - child.lineno + 1
+                    metrics["max_function_lines"] = max(metrics["max_function_lines"], length)
+                depth = 0
+            elif isinstance(child, ast.ClassDef):
+                metrics["classes"] += 1
+            elif isinstance(child, (ast.For, ast.AsyncFor, ast.While, ast.comprehension)):
+                metrics["loops"] += 1
+                depth = loop_depth + 1
+                metrics["max_loop_depth"] = max(metrics["max_loop_depth"], depth)
+            elif isinstance(child, (ast.If, ast.IfExp, ast.Try, ast.BoolOp, ast.ExceptHandler)):
+                metrics["branches"] += 1
+
+            if loop_depth:
+                if isinstance(child, ast.Call) and self._is_io_call(child.func):
+                    metrics["io_in_loop"] = True
+                elif isinstance(child, ast.Await):
+                    metrics["io_in_loop"] = True
+                elif isinstance(child, ast.AugAssign) and isinstance(child.op, ast.Add) and (
+                        isinstance(child.value, ast.JoinedStr)
+                        or (isinstance(child.value, ast.Constant) and isinstance(child.value.value, str))):
+                    metrics["concat_in_loop"] = True
+
+            self._visit(child, depth, metrics)
+
+    def _is_io_call(self, func: ast.AST) -> bool:
+        if isinstance(func, ast.Attribute):
+            if isinstance(func.value, ast.Name) and func.value.id in ("requests", "session", "cursor", "db", "conn"):
+                return True
+            return func.attr in ("execute", "executemany", "query", "fetchone", "fetchall", "save",
+                                 "commit", "urlopen", "get_object_or_404", "filter", "all", "first")
+        return isinstance(func, ast.Name) and func.id in ("open", "urlopen")
+
+    def _is_constant_statement(self, node: ast.AST) -> bool:
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.Pass)):
+            return True
+        if isinstance(node, ast.Expr):
+            return isinstance(node.value, ast.Constant)
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            value = node.value
+            if value is None:
+                return True
+            return not any(isinstance(n, (ast.Call, ast.Lambda, ast.ListComp, ast.DictComp,
+                                          ast.SetComp, ast.GeneratorExp))
+                           for n in ast.walk(value))
+        return False
+
+    def _generic_metrics(self, code: str) -> Dict[str, Any]:
+        """Indentation-based estimate of the same metrics for non-Python sources"""
+        metrics = {
+            "functions": 0,
+            "classes": 0,
+            "loops": 0,
+            "branches": 0,
+            "max_loop_depth": 0,
+            "max_function_lines": 0,
+            "io_in_loop": False,
+            "concat_in_loop": False,
+            "constants_only": False
+        }
+
+        loop_indents = []
+        function_start = None
+        function_indent = 0
+        for number, line in enumerate(code.split('\n'), 1):
+            stripped = line.strip()
+            if not stripped or COMMENT_LINE.match(line):
+                continue
+            indent = len(line) - len(line.lstrip())
+
+            while loop_indents and indent <= loop_indents[-1] and not stripped.startswith(('}', ')')):
+                loop_indents.pop()
+            if function_start is not None and indent <= function_indent and stripped.startswith('}'):
+                metrics["max_function_lines"] = max(metrics["max_function_lines"], number - function_start + 1)
+                function_start = None
+
+            if loop_indents:
+                if IO_CALL.search(line):
+                    metrics["io_in_loop"] = True
+                if CONCAT_IN_LOOP.search(line):
+                    metrics["concat_in_loop"] = True
+
+            if LOOP_LINE.search(line):
+                metrics["loops"] += 1
+                loop_indents.append(indent)
+                metrics["max_loop_depth"] = max(metrics["max_loop_depth"], len(loop_indents))
+            if FUNCTION_LINE.search(line):
+                metrics["functions"] += 1
+                if function_start is None:
+                    function_start, function_indent = number, indent
+            if re.match(r'\s*(?:export\s+)?(?:abstract\s+)?(?:class|struct|interface)\s', line):
+                metrics["classes"] += 1
+            metrics["branches"] += len(re.findall(r'\b(?:if|case|catch)\b|&&|\|\||\?', stripped))
+
+        return metrics
+
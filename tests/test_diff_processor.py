@@ -0,0 +1,51 @@
+import shutil
+import subprocess
+
+import pytest
+
+from package.utils.diff_processor import DiffProcessor
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+CASES = {
+    "no trailing newline": ("a\nb\nc", "a\nB\nc"),
+    "append to file without trailing newline": ("a\nb\nc", "a\nb\nc\nd\n"),
+    "drop trailing newline": ("a\nb\nc\n", "a\nb\nc"),
+    "blank context lines": ("def f():\n\n    return 1\n\n\ndef g():\n    pass\n",
+                            "def f():\n\n    return 2\n\n\ndef g():\n    pass\n"),
+    "several hunks": ("\n".join(f"line {n}" for n in range(1, 40)) + "\n",
+                      "\n".join(f"line {n}" if n not in (3, 30) else f"changed {n}"
+                                for n in range(1, 40)) + "\nextra\n"),
+    "insert at start": ("x = 1\n", "import os\nx = 1\n"),
+    "from empty": ("", "x = 1\n"),
+}
+
+
+def git_diff(tmp_path, base: str, head: str) -> str:
+    """``git diff`` of mod.py from ``base`` to ``head`` in a scratch repository"""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=tmp_path, capture_output=True, text=True, check=True).stdout
+
+    git("init", "-q")
+    (tmp_path / "mod.py").write_text(base)
+    git("add", "mod.py")
+    git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "base")
+    (tmp_path / "mod.py").write_text(head)
+    return git("diff", "--no-color", "--no-ext-diff", "mod.py")
+
+
+@pytest.mark.parametrize("base, head", list(CASES.values()), ids=list(CASES))
+def test_git_diff_applies_to_base(tmp_path, base, head):
+    processor = DiffProcessor()
+    patches = processor.parse_unified_diff(git_diff(tmp_path, base, head))
+
+    assert list(patches) == ["mod.py"]
+    assert processor.apply_patch(base, patches["mod.py"]) == head
+
+
+def test_hunk_stops_at_its_line_counts(tmp_path):
+    diff = git_diff(tmp_path, "a\nb\nc", "a\nB\nc")
+    hunk = DiffProcessor().parse_unified_diff(diff + "\n\n")["mod.py"][0]
+
+    assert len([line for line in hunk["lines"] if line[:1] != "+"]) == hunk["old_count"]
+    assert len([line for line in hunk["lines"] if line[:1] != "-"]) == hunk["new_count"]
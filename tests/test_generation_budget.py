@@ -0,0 +1,64 @@
+import pytest
+
+from package.agents.base import COMPLETION_MARKER
+from package.config import TRIAGE_SHORT_NUM_PREDICT
+from package.utils.context_builder import CHARS_PER_TOKEN
+from package.utils.generation_budget import AGENT_BUDGETS, GenerationBudget
+
+SNIPPET = """def load_user(db, user_id):
+    query = "SELECT * FROM users WHERE id = " + user_id
+    rows = db.execute(query).fetchall()
+    for row in rows:
+        if row[0] == user_id:
+            return row
+"""
+
+# A typical review of SNIPPET in the numbered format the agent prompts ask for
+REVIEW = """1. SQL injection on line 2: the query is built by concatenating user_id
+into the SQL string, so a crafted id such as "1 OR 1=1" changes the query and
+can read or modify every row in the users table.
+   Impact: an attacker can dump user records, including password hashes.
+   Fix: pass the value as a parameter and let the driver quote it:
+       rows = db.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchall()
+
+2. Unbounded fetch on line 3: fetchall() loads every matching row into memory
+before the loop looks at them, and SELECT * pulls columns that are never used.
+   Impact: slow responses and high memory use once the table grows.
+   Fix: select only the needed columns and use fetchone(), since id is unique.
+
+3. Redundant comparison on line 5: the WHERE clause already filters on id,
+and row[0] depends on the column order of the table.
+   Impact: the function silently returns None if a column is added first.
+   Fix: drop the loop and return the single row, or access the column by name
+   with a row factory such as sqlite3.Row.
+"""
+
+
+def estimated_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@pytest.mark.parametrize("agent_name", sorted(AGENT_BUDGETS))
+def test_small_review_fits_its_budget(agent_name):
+    budget = GenerationBudget(max_tokens=1000, adaptive=True)
+    # Triage found nothing for this agent, so it gets its smallest budget
+    triage = {"agents": {agent_name: {"score": 0.0}}}
+    needed = estimated_tokens(REVIEW + COMPLETION_MARKER)
+    assert budget.num_predict([agent_name], SNIPPET, triage) >= needed
+
+
+def test_floor_respects_short_cap():
+    budget = GenerationBudget(max_tokens=1000, min_tokens=TRIAGE_SHORT_NUM_PREDICT + 100, adaptive=True)
+    assert budget.num_predict(["style"], SNIPPET, depth="short") == TRIAGE_SHORT_NUM_PREDICT
+
+
+def test_budget_saved_counts_unused_tokens():
+    budget = GenerationBudget(max_tokens=1000)
+    summary = budget.summary([
+        {"num_predict": 384, "output_tokens": 300, "stop_reason": "stop"},
+        {"num_predict": 384, "output_tokens": 384, "stop_reason": "length"},
+        {"num_predict": 448, "output_tokens": None, "stop_reason": None},
+    ])
+    assert [call["budget_saved"] for call in summary["per_call"]] == [84, 0, None]
+    assert summary["budget_saved"] == 84
+    assert summary["stopped"] == 1 and summary["truncated"] == 1